@@ -2,9 +2,18 @@ import time
 import warnings
 import undetected_chromedriver as uc
 
-from datetime import datetime
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 from pymongo import MongoClient
+from snapshot_writer import SnapshotWriter
+from wait_scheduler import waiter_for
+from page_recorder import recorder_for
+import metrics
+import odds_stream
+from logs import configure, get_logger
+from albbet_page_parser import parse_match_page, parse_goals_tab, parse_btts_tab, build_match_doc
+from fixture_schedule import FixtureSchedule, parse_kickoff
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
@@ -13,45 +22,79 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException
 
 warnings.filterwarnings("ignore", category=ResourceWarning)
+log = get_logger("albbet_football_scraper")
+
 # Replace this with your actual connection string (keep it secure!)
 # TODO
 MONGO_URI = ""
 
-class AlbbetFootballScraper:
-    def __init__(self, driver: webdriver.Chrome):
-
-        self.mongo_client = MongoClient(MONGO_URI)
-        self.db = self.mongo_client["arbitrage_db"]
-        self.odds_collection = self.db["football_odds_albbet"]
+SOCCER_URL = "https://albbet.org/?Key=4_0_0_0_0_0_0_"
+USE_HTML_PARSER = True  # Parse one page_source per tab instead of per-element WebDriver calls
+CRAWL_WORKERS = 1  # > 1 splits the country list across that many Chrome processes
+USE_FIXTURE_SCHEDULE = True  # Only re-open the match pages of fixtures due by their kickoff cadence
 
-        self.odds_collection.delete_many({})
-        print("🧹 Cleared football_odds_albbet collection before run.")
+# Elements whose presence means a click has rendered its view
+MATCH_LIST = (By.CLASS_NAME, "nde-podHeaderRow")
+FULL_TIME_RESULT = (By.XPATH, "//div[@class='nd-h1' and contains(text(), 'Full Time Result')]")
+GOALS_ODDS = (By.CLASS_NAME, "nd-Col13")
+BTTS_SECTION = (By.XPATH, "//div[@class='nd-h1' and contains(text(), 'Both Teams To Score')]")
+GOALS_TAB = (By.XPATH, "//div[contains(@class, 'nd-enhancedTab') and contains(text(), 'Goals')]")
+BTTS_TAB = (By.XPATH, "//div[contains(@class, 'nd-enhancedTab') and contains(text(), 'Both Teams to Score')]")
 
+class AlbbetFootballScraper:
+    def __init__(self, driver: webdriver.Chrome, save_to_mongo=True, schedule_fixtures=None):
+
+        # Matches are staged under a new run ID and swapped in by save_snapshot(),
+        # so the scanner keeps reading the previous full crawl meanwhile.
+        # Parallel crawl workers only collect matches and leave saving to the parent.
+        self.snapshot = None
+        if save_to_mongo:
+            self.mongo_client = MongoClient(MONGO_URI)
+            self.db = self.mongo_client["arbitrage_db"]
+            self.odds_collection = self.db["football_odds_albbet"]
+            self.snapshot = SnapshotWriter(self.odds_collection)
+        self.scraped_matches = []
+
+        # Fixtures read recently enough for their kickoff are kept from the live collection
+        self.schedule = None
+        if USE_FIXTURE_SCHEDULE and (save_to_mongo if schedule_fixtures is None else schedule_fixtures):
+            collection = MongoClient(MONGO_URI)["arbitrage_db"]["football_odds_albbet"]
+            self.schedule = FixtureSchedule(collection, "fixture_key")
 
         # Reduced the default wait from 10 to 5 seconds for speed
         self.driver = driver
         self.wait = WebDriverWait(driver, 5)
-        self.today_str = datetime.today().strftime("%A %d %B")
+        self.waiter = waiter_for(driver, "albbet")
+        self.recorder = recorder_for("albbet")  # Saves every parsed page when PAGE_RECORD_DIR is set
+        self.today = datetime.today().date()
+        self.today_str = self.today.strftime("%A %d %B")  # Date header of today's matches
 
-    def _short_sleep(self, duration=0.3):
-        """Minimal sleep to prevent click intercept or stale DOM issues."""
-        time.sleep(duration)
+    def _settle(self, name, max_wait=0.3):
+        """Waits until the DOM stops changing (at most 'max_wait' s) to prevent click intercept or stale DOM issues."""
+        self.waiter.settle(name, max_wait)
 
     def set_language_to_english(self):
         try:
-            print("🌐 Setting language to English...")
+            log.info("🌐 Setting language to English...")
             lang_dropdown = self.wait.until(
                 EC.element_to_be_clickable((By.CLASS_NAME, "hpf-select"))
             )
             select = Select(lang_dropdown)
             select.select_by_visible_text("English")
-            self._short_sleep(0.3)
-            print("✅ Language set to English.")
+            self._settle("language")
+            log.info("✅ Language set to English.")
         except TimeoutException:
-            print("❌ Language dropdown not found.")
+            log.error("❌ Language dropdown not found.")
             self.driver.save_screenshot("language_fail.png")
             raise
 
+    def _page_source(self, kind, match=None):
+        """page_source of the current page, also saved as a replay fixture when recording."""
+        page_source = self.driver.page_source
+        if self.recorder:
+            self.recorder.record(kind, page_source, self.driver.current_url, match)
+        return page_source
+
     def _page_has_leagues_fast(self, timeout=1):
         """
         Quickly checks if the page has 'spo-h1' within 'timeout' seconds.
@@ -79,60 +122,71 @@ class AlbbetFootballScraper:
         except TimeoutException:
             return False
 
-    def _safe_click(self, element):
+    def _safe_click(self, element, until=None, name="click", max_wait=5):
         """
         Safely clicks 'element' using a triple fallback approach:
           1) Normal click
           2) ActionChains click
           3) JavaScript click
+        Then waits for the 'until' locator of the view the click opens (as wait
+        'name'), or for the DOM to settle when the view has no element of its own.
+        Returns False when 'until' did not show up in time.
         """
         # Scroll the element into view center
         self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-        self._short_sleep(0.2)
+        self._settle("scroll", 0.2)
 
         try:
             element.click()
         except (ElementClickInterceptedException, Exception) as e_click:
-            print(f"⚠️ Normal click failed: {e_click}. Trying ActionChains...")
+            log.warning("⚠️ Normal click failed: %s. Trying ActionChains...", e_click)
+            metrics.CLICK_RETRIES.inc(site="albbet", method="action_chains")
             try:
                 actions = ActionChains(self.driver)
                 actions.move_to_element(element).click().perform()
             except Exception as e_actions:
-                print(f"⚠️ ActionChains failed too: {e_actions}. Using JS click...")
+                log.warning("⚠️ ActionChains failed too: %s. Using JS click...", e_actions)
+                metrics.CLICK_RETRIES.inc(site="albbet", method="js")
                 self.driver.execute_script("arguments[0].click();", element)
 
-        self._short_sleep(0.2)
+        if until is None:
+            self._settle("click", 0.5)
+            return True
+        if self.waiter.wait_for(EC.presence_of_element_located(until), name, max_wait) is None:
+            log.warning("⚠️ %s did not appear after the click.", name)
+            return False
+        return True
 
-    def iterate_countries(self):
-        for i in range(100):
+    def iterate_countries(self, start=0, step=1):
+        """Visits countries start, start + step, ... so parallel workers can split the list."""
+        for i in range(start, 100, step):
             try:
                 countries = self.driver.find_elements(By.CLASS_NAME, "spo-h1")
                 if i >= len(countries):
-                    print(f"✅ Done after {i} countries.")
+                    log.info("✅ Done after %d countries.", i)
                     break
 
-                print(f"📍 Now checking country {i + 1}/{len(countries)}")
+                log.info("📍 Now checking country %d/%d", i + 1, len(countries))
                 target = countries[i]
 
                 # Use safe_click to handle intercept issues
                 self._safe_click(target)
-                self._short_sleep(0.2)
 
                 # FAST check for leagues
                 if self._page_has_leagues_fast(timeout=1):
                     self.iterate_leagues()
                     self.go_back("country")
                 elif self._page_has_matches():
-                    print(f"🧠 Looking for matches on: '{self.today_str}'")
+                    log.debug("🧠 Looking for matches on: '%s'", self.today_str)
                     self.process_matches_for_today()
                     self.go_back("league")
                 else:
-                    print("⚠️ Unknown page structure after clicking country.")
+                    log.warning("⚠️ Unknown page structure after clicking country.")
                     self.driver.save_screenshot(f"unexpected_page_after_country_{i + 1}.png")
                     self.go_back("country")
 
             except Exception as e:
-                print(f"❌ Failed at country {i + 1}: {e}")
+                log.error("❌ Failed at country %d: %s", i + 1, e)
                 self.driver.save_screenshot(f"fail_country_{i + 1}.png")
                 self.go_back("country")
                 continue
@@ -141,17 +195,17 @@ class AlbbetFootballScraper:
         leagues = self.wait.until(EC.presence_of_all_elements_located((By.CLASS_NAME, "spo-h1")))
         for i in range(len(leagues)):
             leagues = self.driver.find_elements(By.CLASS_NAME, "spo-h1")
-            self._short_sleep(0.2)
-            self._safe_click(leagues[i])  # use safe_click here too
-            self._short_sleep(0.2)
+            self._safe_click(leagues[i], MATCH_LIST, "match_list")
 
-            print(f"🧠 Looking for matches on: '{self.today_str}'")
+            log.debug("🧠 Looking for matches on: '%s'", self.today_str)
             self.process_matches_for_today()
             self.go_back("league")
 
     def process_matches_for_today(self):
         try:
-            print(f"🪣 Collecting wrappers for '{self.today_str}'...")
+            log.debug("🪣 Collecting wrappers for '%s'...", self.today_str)
+            if self.recorder:
+                self.recorder.record_driver(self.driver, "list")
             all_wrappers = self.driver.find_elements(By.CSS_SELECTOR, 'div[role="wrapper"]')
             today_wrappers = []
             current_date = None
@@ -172,10 +226,10 @@ class AlbbetFootballScraper:
                         today_wrappers.append(w)
 
             if not today_wrappers:
-                print(f"📭 No matches found for today: {self.today_str}")
+                log.info("📭 No matches found for today: %s", self.today_str)
                 return
 
-            print(f"✅ Found {len(today_wrappers)} wrapper(s) for today's date: {self.today_str}")
+            log.info("✅ Found %d wrapper(s) for today's date: %s", len(today_wrappers), self.today_str)
 
             # Second pass in a while-loop
             match_idx = 0
@@ -202,176 +256,219 @@ class AlbbetFootballScraper:
                 today_wrappers = temp_today_wrappers
 
                 if match_idx >= len(today_wrappers):
-                    print("📦 No more matches left to open.")
+                    log.info("📦 No more matches left to open.")
                     break
 
                 w = today_wrappers[match_idx]
                 match_els = w.find_elements(By.CLASS_NAME, "nde-Market_GameDetail_Rez")
                 if not match_els:
-                    print(f"⚠️ Wrapper {match_idx+1} has no match elements. Skipping.")
+                    log.warning("⚠️ Wrapper %d has no match elements. Skipping.", match_idx + 1)
                     match_idx += 1
                     continue
 
                 match = match_els[0]
-                print(f"⚽ Opening match {match_idx+1}/{len(today_wrappers)} for today: {self.today_str}")
+                # Today's date header + the time shown with the match
+                kickoff = parse_kickoff(w.text, day=self.today)
+                fixture_key = " ".join(match.text.split()) or None
+                carried = self.schedule.carry(fixture_key, kickoff) if self.schedule and fixture_key else None
+                if carried:
+                    self._add_match(carried)  # Not due yet: keeps its last match page odds
+                    match_idx += 1
+                    continue
 
-                self._safe_click(match)
-                self._short_sleep(0.3)
+                log.debug("⚽ Opening match %d/%d for today: %s", match_idx + 1, len(today_wrappers), self.today_str)
 
-                self.scrape_match_odds()
+                self._safe_click(match, FULL_TIME_RESULT, "match_page")
+
+                self.scrape_match_odds(kickoff, fixture_key)
                 self.go_back("match")
 
                 match_idx += 1
 
-            print("✅ Done opening all matches for today.")
+            log.info("✅ Done opening all matches for today.")
 
         except Exception as e:
-            print(f"❌ process_matches_for_today error: {e}")
+            log.error("❌ process_matches_for_today error: %s", e)
+
 
+    def _add_match(self, doc):
+        self.scraped_matches.append(doc)
+        if self.snapshot:
+            self.snapshot.add(doc)
+            log.debug("💾 Queued match for MongoDB snapshot.")
 
-    def scrape_match_odds(self):
-        print("🔍 Scraping odds...")
+    def scrape_match_odds(self, kickoff=None, fixture_key=None):
+        log.debug("🔍 Scraping odds...")
 
         try:
-            odds = {
-                "teams": {},
-                "league": "",
-                "1X2": {},
-                "DoubleChance": {},
-                "OverUnder2_5": {},
-                "BTTS": {}
-            }
-
-            # 🏷 Extract team names from banner
-            try:
-                banner_names = self.driver.find_elements(By.CLASS_NAME, "nd-banner-name")
-                if len(banner_names) >= 2:
-                    home_team = banner_names[0].text.strip()
-                    away_team = banner_names[1].text.strip()
-                else:
-                    home_team, away_team = "Unknown", "Unknown"
-                    print("⚠️ Less than 2 team names found in banner.")
-                odds["teams"] = {"home": home_team, "away": away_team}
-                print(f"🏟️ Match: {home_team} vs {away_team}")
-            except Exception as e:
-                print(f"⚠️ Could not extract team names: {e}")
-                odds["teams"] = {"home": "Unknown", "away": "Unknown"}
+            if USE_HTML_PARSER:
+                odds = self._extract_odds_from_html()
+            else:
+                odds = self._extract_odds_with_webdriver()
 
-            # 🏆 Extract league name from breadcrumb
+            # 💾 Save to MongoDB in flattened structure
             try:
-                breadcrumb = self.driver.find_element(By.CLASS_NAME, "nd-HeaderNavigation_BreadcrumbLevel2")
-                breadcrumb_text = breadcrumb.text.strip()
-                league_name = breadcrumb_text.split(" / ")[0] if " / " in breadcrumb_text else breadcrumb_text
-                odds["league"] = league_name
-                print(f"🏆 League: {league_name}")
+                doc = build_match_doc(odds)
+                doc["kickoff"] = kickoff
+                doc["fixture_key"] = fixture_key  # The match link text, to find this fixture in the next crawl
+                doc["updated_at"] = datetime.now(timezone.utc)
+
+                odds_stream.publish("albbet", doc)
+                metrics.MATCHES_SCRAPED.inc(site="albbet", sport="football")
+                self._add_match(doc)
             except Exception as e:
-                print(f"⚠️ Could not extract league name: {e}")
-                odds["league"] = "Unknown"
-
-            # 1X2 odds
-            full_time_result_section = self.driver.find_element(
-                By.XPATH, "//div[@class='nd-h1' and contains(text(), 'Full Time Result')]/following-sibling::div")
-            odds_1x2_elements = full_time_result_section.find_elements(By.CLASS_NAME, "nd-priceColumnOdd")
-
-            if len(odds_1x2_elements) >= 3:
-                for el in odds_1x2_elements:
-                    label = el.find_element(By.CLASS_NAME, "nd-opp").text.strip()
-                    value = el.find_elements(By.TAG_NAME, "span")[1].text.strip()
-                    odds["1X2"][label] = value
-                print("✅ 1X2 odds:", odds["1X2"])
+                log.error("❌ Failed to save match to MongoDB: %s", e)
+
+            # 🔙 Go back to main match list
+            self.go_back("match")
+            self.go_back("match")
+
+        except Exception as e:
+            log.error("❌ Error while scraping odds: %s", e)
+            metrics.MATCH_ERRORS.inc(site="albbet", sport="football")
+
+
+    def _extract_odds_from_html(self):
+        """
+        Reads each tab state with one page_source fetch and parses it locally,
+        instead of dozens of WebDriver calls per match.
+        """
+        match = self.recorder.next_match() if self.recorder else None
+        odds = parse_match_page(self._page_source("match", match))
+        log.debug("🏟️ Match: %s vs %s", odds["teams"]["home"], odds["teams"]["away"])
+        log.debug("🏆 League: %s", odds["league"])
+        log.debug("✅ 1X2 odds: %s", odds["1X2"])
+        log.debug("✅ Double Chance odds: %s", odds["DoubleChance"])
+
+        # Navigate to Goals tab → Over/Under 2.5
+        try:
+            self._safe_click(self.driver.find_element(*GOALS_TAB), GOALS_ODDS, "goals_tab")
+            odds["OverUnder2_5"] = parse_goals_tab(self._page_source("goals", match))
+            log.debug("✅ Over/Under 2.5 odds: %s", odds["OverUnder2_5"])
+        except Exception as e:
+            log.warning("⚠️ Could not extract Over/Under 2.5 odds: %s", e)
+
+        # Navigate to BTTS tab
+        try:
+            self._safe_click(self.driver.find_element(*BTTS_TAB), BTTS_SECTION, "btts_tab")
+            odds["BTTS"] = parse_btts_tab(self._page_source("btts", match))
+            log.debug("✅ BTTS odds: %s", odds["BTTS"])
+        except Exception as e:
+            log.warning("⚠️ Could not extract BTTS odds: %s", e)
+
+        return odds
+
+    def _extract_odds_with_webdriver(self):
+        """One WebDriver call per element; kept as a fallback for the page_source parser."""
+        odds = {
+            "teams": {},
+            "league": "",
+            "1X2": {},
+            "DoubleChance": {},
+            "OverUnder2_5": {},
+            "BTTS": {}
+        }
+
+        # 🏷 Extract team names from banner
+        try:
+            banner_names = self.driver.find_elements(By.CLASS_NAME, "nd-banner-name")
+            if len(banner_names) >= 2:
+                home_team = banner_names[0].text.strip()
+                away_team = banner_names[1].text.strip()
             else:
-                print("⚠️ Less than 3 elements found for 1X2")
+                home_team, away_team = "Unknown", "Unknown"
+                log.warning("⚠️ Less than 2 team names found in banner.")
+            odds["teams"] = {"home": home_team, "away": away_team}
+            log.debug("🏟️ Match: %s vs %s", home_team, away_team)
+        except Exception as e:
+            log.warning("⚠️ Could not extract team names: %s", e)
+            odds["teams"] = {"home": "Unknown", "away": "Unknown"}
 
-            # Double Chance odds (same page)
-            try:
-                double_chance_section = self.driver.find_element(
-                    By.XPATH, "//div[@class='nd-h1' and contains(text(), 'Double Chance')]/following-sibling::div")
-                dc_odd_elements = double_chance_section.find_elements(By.CLASS_NAME, "nd-priceColumnOdd")
-                for el in dc_odd_elements:
-                    label = el.find_element(By.CLASS_NAME, "nd-opp").text.strip()
-                    value = el.find_elements(By.TAG_NAME, "span")[1].text.strip()
-                    odds["DoubleChance"][label] = value
-                print("✅ Double Chance odds:", odds["DoubleChance"])
-            except Exception as e:
-                print(f"⚠️ Could not parse Double Chance odds: {e}")
+        # 🏆 Extract league name from breadcrumb
+        try:
+            breadcrumb = self.driver.find_element(By.CLASS_NAME, "nd-HeaderNavigation_BreadcrumbLevel2")
+            breadcrumb_text = breadcrumb.text.strip()
+            league_name = breadcrumb_text.split(" / ")[0] if " / " in breadcrumb_text else breadcrumb_text
+            odds["league"] = league_name
+            log.debug("🏆 League: %s", league_name)
+        except Exception as e:
+            log.warning("⚠️ Could not extract league name: %s", e)
+            odds["league"] = "Unknown"
+
+        # 1X2 odds
+        full_time_result_section = self.driver.find_element(
+            By.XPATH, "//div[@class='nd-h1' and contains(text(), 'Full Time Result')]/following-sibling::div")
+        odds_1x2_elements = full_time_result_section.find_elements(By.CLASS_NAME, "nd-priceColumnOdd")
+
+        if len(odds_1x2_elements) >= 3:
+            for el in odds_1x2_elements:
+                label = el.find_element(By.CLASS_NAME, "nd-opp").text.strip()
+                value = el.find_elements(By.TAG_NAME, "span")[1].text.strip()
+                odds["1X2"][label] = value
+            log.debug("✅ 1X2 odds: %s", odds["1X2"])
+        else:
+            log.warning("⚠️ Less than 3 elements found for 1X2")
+
+        # Double Chance odds (same page)
+        try:
+            double_chance_section = self.driver.find_element(
+                By.XPATH, "//div[@class='nd-h1' and contains(text(), 'Double Chance')]/following-sibling::div")
+            dc_odd_elements = double_chance_section.find_elements(By.CLASS_NAME, "nd-priceColumnOdd")
+            for el in dc_odd_elements:
+                label = el.find_element(By.CLASS_NAME, "nd-opp").text.strip()
+                value = el.find_elements(By.TAG_NAME, "span")[1].text.strip()
+                odds["DoubleChance"][label] = value
+            log.debug("✅ Double Chance odds: %s", odds["DoubleChance"])
+        except Exception as e:
+            log.warning("⚠️ Could not parse Double Chance odds: %s", e)
 
-            # Navigate to Goals tab → Over/Under 2.5
-            try:
-                goals_tab = self.driver.find_element(
-                    By.XPATH, "//div[contains(@class, 'nd-enhancedTab') and contains(text(), 'Goals')]")
-                self._safe_click(goals_tab)
-                self._short_sleep(0.3)
-
-                columns = self.driver.find_elements(By.CLASS_NAME, "nd-Col13")
-                if len(columns) >= 3:
-                    over_col = columns[1].find_elements(By.CLASS_NAME, "nd-priceColumnOdd")
-                    under_col = columns[2].find_elements(By.CLASS_NAME, "nd-priceColumnOdd")
-
-                    if len(over_col) >= 2 and len(under_col) >= 2:
-                        odds["OverUnder2_5"] = {
-                            "Over 2.5": over_col[1].text.strip(),
-                            "Under 2.5": under_col[1].text.strip()
-                        }
-                        print("✅ Over/Under 2.5 odds:", odds["OverUnder2_5"])
-                    else:
-                        print("⚠️ Not enough odds found in Over/Under columns")
-                else:
-                    print("⚠️ Could not find sufficient nd-Col13 columns")
-            except Exception as e:
-                print(f"⚠️ Could not extract Over/Under 2.5 odds: {e}")
+        # Navigate to Goals tab → Over/Under 2.5
+        try:
+            self._safe_click(self.driver.find_element(*GOALS_TAB), GOALS_ODDS, "goals_tab")
 
-            # Navigate to BTTS tab
-            try:
-                btts_tab = self.driver.find_element(
-                    By.XPATH, "//div[contains(@class, 'nd-enhancedTab') and contains(text(), 'Both Teams to Score')]")
-                self._safe_click(btts_tab)
-                self._short_sleep(0.3)
-
-                btts_rows = self.driver.find_elements(
-                    By.XPATH, "//div[@class='nd-h1' and contains(text(), 'Both Teams To Score')]/following-sibling::div")
-                for row in btts_rows:
-                    all_spans = row.find_elements(By.CLASS_NAME, "nd-priceColumnOdd")
-                    if len(all_spans) >= 2:
-                        yes = all_spans[0].find_elements(By.TAG_NAME, "span")[1].text.strip()
-                        no = all_spans[1].find_elements(By.TAG_NAME, "span")[1].text.strip()
-                        odds["BTTS"] = {"Yes": yes, "No": no}
-                        print("✅ BTTS odds:", odds["BTTS"])
-                        break
-            except Exception as e:
-                print(f"⚠️ Could not extract BTTS odds: {e}")
+            columns = self.driver.find_elements(By.CLASS_NAME, "nd-Col13")
+            if len(columns) >= 3:
+                over_col = columns[1].find_elements(By.CLASS_NAME, "nd-priceColumnOdd")
+                under_col = columns[2].find_elements(By.CLASS_NAME, "nd-priceColumnOdd")
 
-            # 💾 Save to MongoDB in flattened structure
-            try:
-                doc = {
-                    "home": odds["teams"]["home"],
-                    "away": odds["teams"]["away"],
-                    "league": odds["league"],
-                    "odds": {
-                        "1": odds["1X2"].get("1", ""),
-                        "X": odds["1X2"].get("X", ""),
-                        "2": odds["1X2"].get("2", ""),
-                        "DC_1X": odds["DoubleChance"].get("1X", ""),
-                        "DC_12": odds["DoubleChance"].get("12", ""),
-                        "DC_X2": odds["DoubleChance"].get("X2", ""),
-                        "BTTS_Yes": odds["BTTS"].get("Yes", ""),
-                        "BTTS_No": odds["BTTS"].get("No", ""),
-                        "Over_2.5": odds["OverUnder2_5"].get("Over 2.5", ""),
-                        "Under_2.5": odds["OverUnder2_5"].get("Under 2.5", "")
+                if len(over_col) >= 2 and len(under_col) >= 2:
+                    odds["OverUnder2_5"] = {
+                        "Over 2.5": over_col[1].text.strip(),
+                        "Under 2.5": under_col[1].text.strip()
                     }
-                }
+                    log.debug("✅ Over/Under 2.5 odds: %s", odds["OverUnder2_5"])
+                else:
+                    log.warning("⚠️ Not enough odds found in Over/Under columns")
+            else:
+                log.warning("⚠️ Could not find sufficient nd-Col13 columns")
+        except Exception as e:
+            log.warning("⚠️ Could not extract Over/Under 2.5 odds: %s", e)
 
-                self.odds_collection.insert_one(doc)
-                print("💾 Saved match to MongoDB.")
-            except Exception as e:
-                print(f"❌ Failed to save match to MongoDB: {e}")
+        # Navigate to BTTS tab
+        try:
+            self._safe_click(self.driver.find_element(*BTTS_TAB), BTTS_SECTION, "btts_tab")
+
+            btts_rows = self.driver.find_elements(
+                By.XPATH, "//div[@class='nd-h1' and contains(text(), 'Both Teams To Score')]/following-sibling::div")
+            for row in btts_rows:
+                all_spans = row.find_elements(By.CLASS_NAME, "nd-priceColumnOdd")
+                if len(all_spans) >= 2:
+                    yes = all_spans[0].find_elements(By.TAG_NAME, "span")[1].text.strip()
+                    no = all_spans[1].find_elements(By.TAG_NAME, "span")[1].text.strip()
+                    odds["BTTS"] = {"Yes": yes, "No": no}
+                    log.debug("✅ BTTS odds: %s", odds["BTTS"])
+                    break
+        except Exception as e:
+            log.warning("⚠️ Could not extract BTTS odds: %s", e)
 
-            # 🔙 Go back to main match list
-            self.go_back("match")
-            self.go_back("match")
+        return odds
 
+    def save_snapshot(self):
+        """Writes the remaining matches and swaps this crawl in as football_odds_albbet."""
+        try:
+            self.snapshot.commit()
         except Exception as e:
-            print(f"❌ Error while scraping odds: {e}")
-
+            log.error("❌ Failed to save snapshot to MongoDB: %s", e)
 
     def go_back(self, level):
         back_classes = {
@@ -395,46 +492,112 @@ class AlbbetFootballScraper:
             wait_time = 0.5 if level == "match" else 2
             short_wait = WebDriverWait(self.driver, wait_time)
 
-            print(f"🔙 Locating back button for {level}...")
+            log.debug("🔙 Locating back button for %s...", level)
             back_btn = short_wait.until(EC.presence_of_element_located((By.CLASS_NAME, back_class)))
-            print(f"✅ Back button for {level} found, clicking...")
+            log.debug("✅ Back button for %s found, clicking...", level)
 
             self.driver.execute_script("arguments[0].scrollIntoView(true);", back_btn)
             self.driver.execute_script("arguments[0].click();", back_btn)
-            self._short_sleep(0.2)
+            self._settle("back", 0.5)
 
-            print(f"⏳ Waiting for target element after back ({wait_for})...")
+            log.debug("⏳ Waiting for target element after back (%s)...", wait_for)
             short_wait.until(EC.presence_of_element_located((By.CLASS_NAME, wait_for)))
-            self._short_sleep(0.15)
-            print(f"✅ Successfully returned to {level} level.")
+            log.debug("✅ Successfully returned to %s level.", level)
         except TimeoutException:
-            print(f"❌ Could not navigate back to {level} (Timeout while waiting for next view)")
+            log.error("❌ Could not navigate back to %s (Timeout while waiting for next view)", level)
+            metrics.GO_BACK_FAILURES.inc(site="albbet", level=level)
             self.driver.save_screenshot(f"back_fail_{level}.png")
         except Exception as e:
-            print(f"❌ Unexpected error during go_back({level}): {e}")
+            log.error("❌ Unexpected error during go_back(%s): %s", level, e)
+            metrics.GO_BACK_FAILURES.inc(site="albbet", level=level)
             self.driver.save_screenshot(f"back_fail_{level}_exception.png")
 
 
-if __name__ == "__main__":
+def start_driver(headless=False, multi_procs=False):
+    """Opens Chrome on the Soccer page, waits out the CAPTCHA and switches to English."""
     options = uc.ChromeOptions()
     options.add_argument("--disable-blink-features=AutomationControlled")
 
-    driver = uc.Chrome(options=options, headless=False)
-
-    print("🌍 Navigating to Soccer page initially...")
-    driver.get("https://albbet.org/?Key=4_0_0_0_0_0_0_")
-
-    print("🤖 Waiting for CAPTCHA to auto-solve...")
-    time.sleep(4)  # Adjust this if you need more or less time for the captcha
-
-    scraper = AlbbetFootballScraper(driver)
-    scraper.set_language_to_english()
+    driver = uc.Chrome(options=options, headless=headless, user_multi_procs=multi_procs)
+
+    log.info("🌍 Navigating to Soccer page initially...")
+    driver.get(SOCCER_URL)
+
+    log.info("🤖 Waiting for CAPTCHA to auto-solve...")
+    waiter = waiter_for(driver, "albbet")
+    waiter.wait_for(EC.presence_of_element_located((By.CLASS_NAME, "hpf-select")), "captcha", max_wait=30)
+
+    AlbbetFootballScraper(driver, save_to_mongo=False).set_language_to_english()
+
+    log.info("🔁 Reloading Soccer page after language change...")
+    driver.get(SOCCER_URL)
+    waiter.wait_for(EC.presence_of_element_located((By.CLASS_NAME, "spo-h1")), "soccer_page")
+    return driver
+
+
+def crawl_worker(worker_id, workers, headless=False):
+    """Runs in its own process with its own Chrome; crawls every 'workers'-th country."""
+    configure()  # Entry point of the worker process
+    started = time.time()
+    driver = start_driver(headless=headless, multi_procs=True)
+    try:
+        scraper = AlbbetFootballScraper(driver, save_to_mongo=False, schedule_fixtures=True)
+        scraper.iterate_countries(start=worker_id, step=workers)
+        scraper.waiter.report()
+        metrics.dump(f"albbet_worker{worker_id}")
+        return worker_id, scraper.scraped_matches, time.time() - started
+    finally:
+        driver.quit()
+
+
+def parallel_crawl(workers=CRAWL_WORKERS, headless=False):
+    """
+    Splits the country list across 'workers' processes, merges their matches
+    into one football_odds_albbet snapshot and reports wall time and
+    per-worker throughput, to size the pool against the box's CPU and RAM.
+    """
+    started = time.time()
+    mongo_client = MongoClient(MONGO_URI)
+    snapshot = SnapshotWriter(mongo_client["arbitrage_db"]["football_odds_albbet"])
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(crawl_worker, worker_id, workers, headless) for worker_id in range(workers)]
+        for future in as_completed(futures):
+            try:
+                worker_id, matches, elapsed = future.result()
+            except Exception as e:
+                log.error("❌ Crawl worker failed: %s", e)
+                continue
+            snapshot.add_many(matches)
+            log.info("👷 Worker %d: %d matches in %.1fs (%.1f matches/min)",
+                     worker_id, len(matches), elapsed, len(matches) / elapsed * 60)
 
-    print("🔁 Reloading Soccer page after language change...")
-    driver.get("https://albbet.org/?Key=4_0_0_0_0_0_0_")
-    time.sleep(1)
+    snapshot.commit()
+    wall_time = time.time() - started
+    metrics.MATCHES_SCRAPED.inc(snapshot.written, site="albbet", sport="football")
+    metrics.record_crawl("albbet", "football", snapshot.written, wall_time)
+    log.info("⏱️ Parallel crawl with %d workers: %d matches in %.1fs (%.1f matches/min overall)",
+             workers, snapshot.written, wall_time, snapshot.written / wall_time * 60)
 
-    # Start scraping
-    scraper.iterate_countries()
 
-    driver.quit()
+if __name__ == "__main__":
+    configure()
+    metrics.start_http_server()
+    started = time.time()
+    if CRAWL_WORKERS > 1:
+        parallel_crawl()
+    else:
+        driver = start_driver()
+
+        # Start scraping
+        scraper = AlbbetFootballScraper(driver)
+        scraper.iterate_countries()
+        if scraper.schedule:
+            scraper.schedule.report("albbet football")
+        scraper.save_snapshot()
+        scraper.waiter.report()
+        scraper.waiter.save_stats()
+        metrics.record_crawl("albbet", "football", len(scraper.scraped_matches), time.time() - started)
+
+        driver.quit()
+    log.info("📈 Metrics written to %s", metrics.dump("albbet_football"))
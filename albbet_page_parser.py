@@ -0,0 +1,114 @@
+"""
+Parses albbet match pages from a single page_source snapshot instead of one
+WebDriver round-trip per element. Selectors mirror the ones used by
+AlbbetFootballScraper (nd-* classes), and the functions only take HTML
+strings, so they can be run against saved pages.
+"""
+from lxml import html as lxml_html
+
+from markets import normalize_odds
+
+
+def _cls(name):
+    """XPath predicate matching one CSS class token, like By.CLASS_NAME."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _text(el):
+    return " ".join(el.text_content().split())
+
+
+def _section(tree, title):
+    """Rows following the 'nd-h1' header that contains 'title'."""
+    return tree.xpath(f"//div[@class='nd-h1' and contains(text(), '{title}')]/following-sibling::div")
+
+
+def _labelled_prices(section):
+    """{label: price} for every nd-priceColumnOdd cell ('nd-opp' label, second span = price)."""
+    prices = {}
+    for cell in section.xpath(f".//*[{_cls('nd-priceColumnOdd')}]"):
+        labels = cell.xpath(f".//*[{_cls('nd-opp')}]")
+        spans = cell.xpath(".//span")
+        if labels and len(spans) >= 2:
+            prices[_text(labels[0])] = _text(spans[1])
+    return prices
+
+
+def parse_match_page(page_source):
+    """Teams, league, 1X2 and Double Chance from the default match tab."""
+    tree = lxml_html.fromstring(page_source)
+    odds = {
+        "teams": {"home": "Unknown", "away": "Unknown"},
+        "league": "Unknown",
+        "1X2": {},
+        "DoubleChance": {},
+        "OverUnder2_5": {},
+        "BTTS": {}
+    }
+
+    banner_names = tree.xpath(f"//*[{_cls('nd-banner-name')}]")
+    if len(banner_names) >= 2:
+        odds["teams"] = {"home": _text(banner_names[0]), "away": _text(banner_names[1])}
+
+    breadcrumb = tree.xpath(f"//*[{_cls('nd-HeaderNavigation_BreadcrumbLevel2')}]")
+    if breadcrumb:
+        odds["league"] = _text(breadcrumb[0]).split(" / ")[0]
+
+    full_time_result = _section(tree, "Full Time Result")
+    if not full_time_result:
+        raise ValueError("Full Time Result section not found")
+    result = _labelled_prices(full_time_result[0])
+    if len(result) >= 3:
+        odds["1X2"] = result
+
+    double_chance = _section(tree, "Double Chance")
+    if double_chance:
+        odds["DoubleChance"] = _labelled_prices(double_chance[0])
+
+    return odds
+
+
+def parse_goals_tab(page_source):
+    """Over/Under 2.5 from the Goals tab (second row of the Over and Under columns)."""
+    tree = lxml_html.fromstring(page_source)
+    columns = tree.xpath(f"//*[{_cls('nd-Col13')}]")
+    if len(columns) < 3:
+        return {}
+    over_col = columns[1].xpath(f".//*[{_cls('nd-priceColumnOdd')}]")
+    under_col = columns[2].xpath(f".//*[{_cls('nd-priceColumnOdd')}]")
+    if len(over_col) < 2 or len(under_col) < 2:
+        return {}
+    return {"Over 2.5": _text(over_col[1]), "Under 2.5": _text(under_col[1])}
+
+
+def parse_btts_tab(page_source):
+    """Yes/No prices from the Both Teams to Score tab."""
+    tree = lxml_html.fromstring(page_source)
+    for row in _section(tree, "Both Teams To Score"):
+        cells = row.xpath(f".//*[{_cls('nd-priceColumnOdd')}]")
+        if len(cells) >= 2:
+            yes, no = cells[0].xpath(".//span"), cells[1].xpath(".//span")
+            if len(yes) >= 2 and len(no) >= 2:
+                return {"Yes": _text(yes[1]), "No": _text(no[1])}
+    return {}
+
+
+def build_match_doc(odds):
+    """Flattens parsed odds into the football_odds_albbet document layout, with prices as floats."""
+    return {
+        "home": odds["teams"]["home"],
+        "away": odds["teams"]["away"],
+        "league": odds["league"],
+        "odds": normalize_odds({
+            "1": odds["1X2"].get("1", ""),
+            "X": odds["1X2"].get("X", ""),
+            "2": odds["1X2"].get("2", ""),
+            "DC_1X": odds["DoubleChance"].get("1X", ""),
+            "DC_12": odds["DoubleChance"].get("12", ""),
+            "DC_X2": odds["DoubleChance"].get("X2", ""),
+            "BTTS_Yes": odds["BTTS"].get("Yes", ""),
+            "BTTS_No": odds["BTTS"].get("No", ""),
+            "Over_2.5": odds["OverUnder2_5"].get("Over 2.5", ""),
+            "Under_2.5": odds["OverUnder2_5"].get("Under 2.5", "")
+        })
+    }
@@ -0,0 +1,167 @@
+import hashlib
+import math
+import sqlite3
+import threading
+import time
+from datetime import timezone
+
+# An alert is identified by its event, market and odds rounded to this step,
+# so a tick of a few cents on one price does not count as a new opportunity.
+ODDS_STEP = 0.05
+DEFAULT_TTL_SECONDS = 12 * 3600  # Used when the event has no kickoff time
+MIN_IMPROVEMENT = 0.25  # Profit percentage points an open opportunity must gain to be re-sent
+BLOOM_ERROR_RATE = 0.01
+
+
+def alert_key(arb, step=ODDS_STEP):
+    """Stable digest of (event, market, rounded odds vector)."""
+    odds = ",".join(f"{k}={round(v / step) * step:.2f}" for k, v in sorted(arb["odds"].items()))
+    return hashlib.sha1(f"{arb['match']}|{arb['market']}|{odds}".encode()).hexdigest()
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over hex digests; no false negatives, ~error_rate false positives."""
+
+    def __init__(self, capacity, error_rate=BLOOM_ERROR_RATE):
+        capacity = max(capacity, 1000)
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, digest):
+        h1, h2 = int(digest[:16], 16), int(digest[16:32], 16)
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, digest):
+        for pos in self._positions(digest):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, digest):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(digest))
+
+
+class AlertStore:
+    """
+    Persistent record of the arbitrage alerts already sent, stored in a local
+    SQLite file (WAL journal, so a crash mid-write never loses earlier rows).
+
+    filter() keeps only opportunities that are new or have materially
+    improved: an exact (event, market, rounded odds) repeat is dropped, and so
+    is a different price on an open (event, market) that does not beat the
+    best profit already sent by MIN_IMPROVEMENT points. Entries expire at the
+    event's kickoff when it is known, otherwise after ttl_seconds; alerts of
+    events that have already kicked off are dropped, since their entries
+    could no longer suppress the next scan's repeat.
+
+    What filter() returns is only pending: it is recorded as sent once
+    acknowledge() reports it delivered (the AlertDispatcher calls it after the
+    e-mail went out), and released for the next scan when delivery failed.
+
+    The best profit per open (event, market) is kept in memory, and an
+    optional Bloom filter answers most "never seen" lookups without a query.
+    """
+
+    def __init__(self, path, ttl_seconds=DEFAULT_TTL_SECONDS, min_improvement=MIN_IMPROVEMENT, use_bloom=True):
+        self.conn = sqlite3.connect(path, check_same_thread=False)  # Acknowledged from the dispatcher thread
+        self.lock = threading.Lock()
+        self.ttl_seconds = ttl_seconds
+        self.min_improvement = min_improvement
+        self.conn.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS alerts (
+                key TEXT PRIMARY KEY, event TEXT NOT NULL, market TEXT NOT NULL,
+                profit REAL NOT NULL, sent INTEGER NOT NULL, seen_at REAL NOT NULL, expires_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS alerts_expires_at ON alerts (expires_at);
+        """)
+        self.best = {}  # (event, market) -> (best profit sent, expires_at)
+        self.pending = {}  # key -> row of an alert handed out by filter() and not acknowledged yet
+        self.evict()
+
+        rows = self.conn.execute("SELECT key, event, market, profit, sent, expires_at FROM alerts").fetchall()
+        self.bloom = BloomFilter(len(rows) * 2) if use_bloom else None
+        for row in rows:
+            self._remember(*row)
+
+    def _remember(self, key, event, market, profit, sent, expires_at):
+        best = self.best.get((event, market))
+        if sent and (best is None or profit > best[0]):
+            self.best[(event, market)] = (profit, expires_at)
+        if self.bloom is not None:
+            self.bloom.add(key)
+
+    def _seen(self, key, now):
+        if self.bloom is not None and key not in self.bloom:
+            return False
+        row = self.conn.execute("SELECT expires_at FROM alerts WHERE key = ?", (key,)).fetchone()
+        return row is not None and row[0] > now
+
+    def _expires_at(self, arb, now):
+        kickoff = arb.get("kickoff")
+        if kickoff is None:
+            return now + self.ttl_seconds
+        if hasattr(kickoff, "timestamp"):
+            if kickoff.tzinfo is None:
+                kickoff = kickoff.replace(tzinfo=timezone.utc)  # Mongo returns naive UTC datetimes
+            return kickoff.timestamp()
+        return float(kickoff)
+
+    def _best(self, event, market, now):
+        """Best profit already sent or waiting to be sent for an open (event, market)."""
+        best = self.best.get((event, market))
+        profits = [best[0]] if best is not None and best[1] > now else []
+        profits += [row[3] for row in self.pending.values() if row[1] == event and row[2] == market]
+        return max(profits, default=None)
+
+    def filter(self, results):
+        """
+        Returns the results worth notifying and holds them as pending until
+        acknowledge(); suppressed repricings are recorded as seen right away.
+        Events past their kickoff are never notified.
+        """
+        now = time.time()
+        fresh = []
+        rows = []
+        with self.lock:
+            for arb in results:
+                key = alert_key(arb)
+                if key in self.pending or self._seen(key, now):
+                    continue
+                expires_at = self._expires_at(arb, now)
+                if expires_at <= now:
+                    continue  # Started: no longer a pre-match opportunity
+                event, market, profit = arb["match"], arb["market"], arb["profit_percent"]
+                best = self._best(event, market, now)
+                row = (key, event, market, profit, 1, now, expires_at)
+                if best is None or profit >= best + self.min_improvement:
+                    fresh.append(arb)
+                    self.pending[key] = row
+                else:
+                    rows.append(row[:4] + (0,) + row[5:])
+                    self._remember(key, event, market, profit, False, expires_at)
+
+            self.conn.executemany("INSERT OR REPLACE INTO alerts VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self.conn.commit()
+        return fresh
+
+    def acknowledge(self, alerts, delivered):
+        """Records pending alerts as sent once delivered; undelivered ones are released to be sent again."""
+        with self.lock:
+            rows = [self.pending.pop(key) for key in map(alert_key, alerts) if key in self.pending]
+            if not delivered or not rows:
+                return
+            self.conn.executemany("INSERT OR REPLACE INTO alerts VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self.conn.commit()
+            for key, event, market, profit, sent, _, expires_at in rows:
+                self._remember(key, event, market, profit, sent, expires_at)
+
+    def evict(self):
+        """Drops entries whose event has started or whose TTL has run out."""
+        now = time.time()
+        with self.lock:
+            self.conn.execute("DELETE FROM alerts WHERE expires_at <= ?", (now,))
+            self.conn.commit()
+            self.best = {k: v for k, v in self.best.items() if v[1] > now}
+
+    def close(self):
+        self.conn.close()
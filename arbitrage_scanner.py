@@ -1,52 +1,65 @@
-import smtplib
-import ssl
 from pymongo import MongoClient
-from email.message import EmailMessage
 from dotenv import load_dotenv
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
+from identity_cache import EventIdentityCache, IDENTITY_CACHE_PATH
+from alert_store import AlertStore
+from candidate_join import LEAGUE_WORDS, blocking_keys, candidate_pairs
+import email_alert
+import metrics
+from logs import configure, get_logger, sampled_logger
+from markets import (MARKETS, MARKET_KEYS, MARKET_INDEX, ALL_COMBOS, COMBO_MASK, SPORT_INDEX, DEFAULT_SPORT,
+                     odds_matrix, normalize_odds)
+from collections import defaultdict
+from datetime import datetime, timezone
+import numpy as np
+import hashlib
+import pickle
+import json
 import os
+import logging
+
+log = get_logger("arbitrage_scanner")
+pair_log = sampled_logger("arbitrage_scanner.pairs")  # Per-pair messages, sampled and DEBUG only
 
 # Load environment variables
 load_dotenv()
-EMAIL_USER = os.getenv("GMAIL_USER")
-EMAIL_PASS = os.getenv("GMAIL_PASS")
 
 # MongoDB setup
-# TODO : Add MongoDB Connection String
-client = MongoClient("")
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+client = MongoClient(MONGO_URI)  # Connects lazily, so importing the scanner needs no server
 db = client["arbitrage_db"]
-albbet_collection = db["football_odds_albbet"]
-vox_collection = db["football_odds_vox"]
+
+# One entry per bookmaker; adding a scraper only needs a new line here.
+# Order matters: earlier books provide the event label and win price ties.
+BOOK_COLLECTIONS = {
+    "albbet": db["football_odds_albbet"],
+    "vox": db["football_odds_vox"],
+}
+
+# Collections per sport (see markets.SPORTS for their outcome sets). Every
+# sport with at least two books is loaded, paired and evaluated in the same
+# scan; only books listed under the same sport are paired with each other.
+# Sports with a single book are skipped (see scanned_sports) until a second
+# book is added, since a cross-book arbitrage needs two.
+SPORT_COLLECTIONS = {
+    "football": BOOK_COLLECTIONS,
+    "basketball": {"vox": db["basketball_odds_vox"]},
+    "tennis": {"vox": db["tennis_odds_vox"]},
+}
 
 # Settings
 FUZZY_MATCH_THRESHOLD = 70
 ARBITRAGE_RESULTS = []
 STAKE = 100  # Base stake for bet sizing
-
-# Market groups
-MARKETS = [
-    ("1", "1"),
-    ("X", "X"),
-    ("2", "2"),
-    ("DC_1X", "DC_1X"),
-    ("DC_12", "DC_12"),
-    ("DC_X2", "DC_X2"),
-    ("BTTS_Yes", "BTTS_Yes"),
-    ("BTTS_No", "BTTS_No"),
-    ("Over_2.5", "Over_2.5"),
-    ("Under_2.5", "Under_2.5"),
-]
-
-TWO_WAY_COMBOS = [
-    ("DC_1X", "2"),
-    ("DC_12", "X"),
-    ("DC_X2", "1"),
-    ("BTTS_Yes", "BTTS_No"),
-    ("Over_2.5", "Under_2.5")
-]
-
-def debug_log(msg):
-    print(f"[DEBUG] {msg}")
+BATCH_MATCHING = True  # Score the blocked candidates with one rapidfuzz cpdist call instead of is_potential_match per pair
+MATCH_WORKERS = -1  # cpdist worker threads (-1 = all cores)
+USE_IDENTITY_CACHE = True  # Join on cached event/team IDs before fuzzy matching
+USE_MONGO_JOIN = False  # Let a Mongo aggregation pick candidate pairs (needs MongoDB 5.0+), see candidate_join
+INCREMENTAL_SCAN = False  # Only re-pair and re-evaluate documents changed since the last tick
+SCAN_STATE_PATH = "scan_state.pkl"
+SCAN_STATE_VERSION = 2  # Bumped when the state layout changes; older files are discarded
+USE_ALERT_STORE = True  # Only e-mail opportunities that are new or have improved since the last alert
+ALERT_STORE_PATH = "alert_store.sqlite"
 
 def is_potential_match(match1, match2, threshold=FUZZY_MATCH_THRESHOLD):
     def clean(val):
@@ -59,11 +72,96 @@ def is_potential_match(match1, match2, threshold=FUZZY_MATCH_THRESHOLD):
     away_sim = fuzz.token_set_ratio(away1, away2)
     league_sim = fuzz.token_set_ratio(league1, league2)
 
-    debug_log(f"Checking: {match1['home']} vs {match1['away']} <=> {match2['home']} vs {match2['away']}")
-    debug_log(f"Similarities - Home: {home_sim}, Away: {away_sim}, League: {league_sim}")
+    if pair_log.isEnabledFor(logging.DEBUG):
+        pair_log.debug("Checking: %s vs %s <=> %s vs %s - Home: %s, Away: %s, League: %s",
+                       match1["home"], match1["away"], match2["home"], match2["away"],
+                       home_sim, away_sim, league_sim)
 
     return min(home_sim, away_sim, league_sim) >= threshold
 
+def pair_score(match1, match2):
+    """
+    Summed home/away/league token_sort_ratio, to rank matches that all pass
+    is_potential_match. Unlike token_set_ratio it penalizes extra tokens, so
+    'Ajax' scores higher against 'Ajax' than against 'Ajax U21'.
+    """
+    return sum(fuzz.token_sort_ratio(match1[field].strip().lower(), match2[field].strip().lower())
+               for field in ("home", "away", "league"))
+
+def _league_keys(doc):
+    return blocking_keys(doc.get("league"), LEAGUE_WORDS)
+
+def build_blocking_index(docs):
+    """Inverted index: (field, key) -> set of positions in 'docs'."""
+    index = defaultdict(set)
+    for pos, doc in enumerate(docs):
+        for field in ("home", "away"):
+            for key in blocking_keys(doc[field]):
+                index[(field, key)].add(pos)
+        for key in _league_keys(doc):
+            index[("league", key)].add(pos)
+    return index
+
+def _hits(index, field, keys):
+    hits = set()
+    for key in keys:
+        hits |= index.get((field, key), set())
+    return hits
+
+def candidate_positions(alb_docs, vox_docs):
+    """
+    Yields (alb position, vox position) for pairs that share a blocking key on
+    the home AND the away team, or a league key and a key on either team.
+    Blocking is a recall heuristic: the keys include short tokens, whole names
+    and transliteration skeletons so 'AZ Alkmaar'/'AZ' or 'Dynamo Kyiv'/
+    'Dinamo Kiev' still meet, but a pair sharing no key at all is never scored.
+    """
+    index = build_blocking_index(vox_docs)
+    for i, alb_doc in enumerate(alb_docs):
+        home_hits = _hits(index, "home", blocking_keys(alb_doc["home"]))
+        away_hits = _hits(index, "away", blocking_keys(alb_doc["away"]))
+        league_hits = _hits(index, "league", _league_keys(alb_doc))
+        for pos in sorted((home_hits & away_hits) | (league_hits & (home_hits | away_hits))):
+            yield i, pos
+
+def generate_candidates(alb_docs, vox_docs):
+    """Yields the (alb_doc, vox_doc) pairs of candidate_positions."""
+    for i, j in candidate_positions(alb_docs, vox_docs):
+        yield alb_docs[i], vox_docs[j]
+
+def _pair_similarity(names1, names2, threshold):
+    """token_set_ratio of names1[k] vs names2[k] for every k; scores below 'threshold' come back as 0."""
+    return process.cpdist(
+        names1, names2,
+        scorer=fuzz.token_set_ratio,
+        score_cutoff=threshold,
+        dtype=np.uint8,
+        workers=MATCH_WORKERS,
+    )
+
+def match_pairs_batch(alb_docs, vox_docs, threshold=FUZZY_MATCH_THRESHOLD):
+    """
+    Same result as running is_potential_match over the blocked candidates,
+    but names are cleaned once per document and the three similarity
+    vectors are computed in one multi-core cpdist call each, instead of one
+    Python call per pair. Returns (pairs, number of candidates scored).
+    """
+    positions = np.array(list(candidate_positions(alb_docs, vox_docs)), dtype=np.intp).reshape(-1, 2)
+    if not len(positions):
+        return [], 0
+
+    def clean(docs, field, rows):
+        names = [doc[field].strip().lower() for doc in docs]
+        return [names[row] for row in rows]
+
+    alb_rows, vox_rows = positions[:, 0], positions[:, 1]
+    sims = [
+        _pair_similarity(clean(alb_docs, field, alb_rows), clean(vox_docs, field, vox_rows), threshold)
+        for field in ("home", "away", "league")
+    ]
+    matched = np.minimum.reduce(sims) >= threshold
+    return [(alb_docs[i], vox_docs[j]) for i, j in positions[matched]], len(positions)
+
 def find_best_odds(alb_odds, vox_odds, label=""):
     best = {}
     for key, _ in MARKETS:
@@ -74,8 +172,8 @@ def find_best_odds(alb_odds, vox_odds, label=""):
                 best_odd = max(alb_odd, vox_odd)
                 best[key] = best_odd
         except Exception as e:
-            debug_log(f"Error parsing odds for {key}: {e}")
-    debug_log(f"Best odds for {label}: {best}")
+            pair_log.debug("Error parsing odds for %s: %s", key, e)
+    pair_log.debug("Best odds for %s: %s", label, best)
     return best
 
 def compute_arbitrage(odds_dict, label, combo_keys):
@@ -98,86 +196,456 @@ def compute_arbitrage(odds_dict, label, combo_keys):
                 "stake_split": stake_split
             }
     except Exception as e:
-        debug_log(f"Error computing arbitrage: {e}")
+        pair_log.debug("Error computing arbitrage: %s", e)
     return None
 
+def build_best_odds(events, books):
+    """
+    Reduces the odds of every book in each event cluster to the best price per
+    market. Returns (best, best_book): one row per event, one column per market,
+    and the index into 'books' each best price comes from.
+    """
+    odds = [event[book]["odds"] if book in event else None for event in events for book in books]
+    try:
+        rows = odds_matrix(odds)  # One conversion for the whole stack
+    except (TypeError, ValueError):
+        rows = odds_matrix([None if o is None else normalize_odds(o) for o in odds])  # Untyped documents
+    stack = rows.reshape(len(events), len(books), len(MARKET_KEYS))
+    stack[~(stack > 1)] = np.nan  # odds of 1 or less can never be part of an arbitrage
+
+    best_book = np.where(np.isnan(stack), -np.inf, stack).argmax(axis=1)
+    best = np.take_along_axis(stack, best_book[:, None, :], axis=1)[:, 0, :]
+    return best, best_book
+
+def evaluate_arbitrage_batch(labels, best, best_book, books, sports=None):
+    """
+    Evaluates every combo in ALL_COMBOS for all rows of 'best' at once, keeps
+    the ones that apply to each row's sport ('sports', default football) and
+    returns the passing ones in the same dict shape as compute_arbitrage,
+    plus the book to place each leg with.
+    """
+    results = []
+    if not len(best):
+        return results
+    sports = sports or [DEFAULT_SPORT] * len(best)
+
+    inverse = 1 / best
+    totals = np.column_stack([
+        inverse[:, [MARKET_INDEX[k] for k in combo]].sum(axis=1)
+        for combo in ALL_COMBOS
+    ])  # NaN (missing leg) never compares < 1
+    profits = np.round((1 - totals) * 100, 2)
+    applies = COMBO_MASK[[SPORT_INDEX[sport] for sport in sports]]
+
+    for row, c in np.argwhere((totals < 1) & applies):
+        combo = ALL_COMBOS[c]
+        cols = [MARKET_INDEX[k] for k in combo]
+        stakes = np.round(inverse[row, cols] / totals[row, c] * STAKE, 2)
+        results.append({
+            "match": labels[row],
+            "sport": sports[row],
+            "market": "+".join(combo),
+            "profit_percent": float(profits[row, c]),
+            "odds": {k: float(best[row, col]) for k, col in zip(combo, cols)},
+            "stake_split": {k: float(v) for k, v in zip(combo, stakes)},
+            "books": {k: books[best_book[row, col]] for k, col in zip(combo, cols)}
+        })
+    return results
+
+def match_docs(docs1, docs2):
+    """Fuzzy-matches two document lists. Returns (pairs, number of pairs checked)."""
+    if BATCH_MATCHING:
+        return match_pairs_batch(docs1, docs2)
+
+    pairs = []
+    checked = 0
+    for doc1, doc2 in generate_candidates(docs1, docs2):
+        checked += 1
+        if is_potential_match(doc1, doc2):
+            pairs.append((doc1, doc2))
+    return pairs, checked
+
+def add_book_to_clusters(clusters, book, docs, cache=None):
+    """
+    Matches 'docs' of one book against one representative (first doc) of every
+    cluster that has no doc from that book yet, and adds them in place. Every
+    matching cluster is scored and each doc goes to its best one, with at most
+    one doc per book per cluster. Docs that match nothing start their own cluster.
+    Returns (clusters that gained a doc, number of fuzzy pairs checked).
+    """
+    rep_clusters = {}  # id(rep_doc) -> cluster
+    rep_books = {}  # id(rep_doc) -> book of rep_doc
+    reps_by_book = defaultdict(list)
+    for cluster in clusters:
+        if book in cluster or not cluster:
+            continue
+        rep_book, rep_doc = next(iter(cluster.items()))
+        rep_clusters[id(rep_doc)] = cluster
+        rep_books[id(rep_doc)] = rep_book
+        reps_by_book[rep_book].append(rep_doc)
+
+    # Events already known from earlier runs are joined on their cached IDs
+    known_pairs = []
+    unresolved_reps = []
+    remaining = docs
+    for rep_book, rep_docs in reps_by_book.items():
+        if cache:
+            pairs, rep_docs, remaining = cache.join(rep_docs, rep_book, remaining, book)
+            known_pairs += pairs
+        unresolved_reps += rep_docs
+    if cache and reps_by_book:
+        log.info("Identity cache: %d known %s pairs, %d %s matches left to fuzzy-match.",
+                 len(known_pairs), book, len(remaining), book)
+
+    new_pairs = []
+    checked = 0
+    if unresolved_reps and remaining:
+        new_pairs, checked = match_docs(unresolved_reps, remaining)
+
+    # Best pairs first (cached identities before any fuzzy score), so a doc
+    # matching several clusters goes to its closest one; one doc per book per event
+    ranked = [(float("inf"), rep_doc, doc) for rep_doc, doc in known_pairs]
+    ranked += [(pair_score(rep_doc, doc), rep_doc, doc) for rep_doc, doc in new_pairs]
+    ranked.sort(key=lambda item: item[0], reverse=True)
+
+    touched = []
+    placed = set()
+    assigned = defaultdict(list)  # rep book -> newly matched (rep_doc, doc) pairs that were kept
+    for score, rep_doc, doc in ranked:
+        cluster = rep_clusters[id(rep_doc)]
+        if book in cluster or id(doc) in placed:
+            continue
+        cluster[book] = doc
+        placed.add(id(doc))
+        touched.append(cluster)
+        if score != float("inf"):
+            assigned[rep_books[id(rep_doc)]].append((rep_doc, doc))
+
+    if cache:
+        for rep_book, pairs in assigned.items():
+            cache.remember_pairs(pairs, rep_book, book)
+
+    new_clusters = [{book: doc} for doc in docs if id(doc) not in placed]
+    clusters += new_clusters
+    return touched + new_clusters, checked
+
+def cluster_events(book_docs, cache=None):
+    """
+    Groups the same event across any number of books into clusters ({book: doc}).
+
+    Books are added one at a time, so every extra book costs one more matching
+    pass against the existing clusters rather than another nested loop.
+    Returns (clusters, number of fuzzy pairs checked).
+    """
+    clusters = []
+    checked = 0
+    for book, docs in book_docs.items():
+        _, pairs_checked = add_book_to_clusters(clusters, book, docs, cache)
+        checked += pairs_checked
+    return clusters, checked
+
+def cluster_events_mongo(collections):
+    """
+    Pairs every other book with the first one through candidate_join: Mongo
+    returns the projected pairs that share blocking keys within the time
+    window, and only those are fuzzy-scored here. Events the first book does
+    not list stay unpaired, and the identity cache is not used. The keys and
+    indexes come from write time (SnapshotWriter) or candidate_join setup.
+    Returns (events offered by at least two books, number of pairs scored).
+    """
+    books = list(collections)
+
+    anchor = books[0]
+    clusters = {}  # _id of the first book's doc -> cluster
+    checked = 0
+    for book in books[1:]:
+        pairs = candidate_pairs(collections[anchor], collections[book])
+        log.info("Mongo join: %d %s/%s candidate pairs.", len(pairs), anchor, book)
+        checked += len(pairs)
+        matched = [(pair_score(doc, other), doc, other) for doc, other in pairs if is_potential_match(doc, other)]
+        matched.sort(key=lambda item: item[0], reverse=True)
+        placed = set()
+        for _, doc, other in matched:
+            cluster = clusters.setdefault(doc["_id"], {anchor: doc})
+            if book in cluster or other["_id"] in placed:
+                continue  # best pair first, one doc per book per event
+            cluster[book] = other
+            placed.add(other["_id"])
+    return [cluster for cluster in clusters.values() if len(cluster) >= 2], checked
+
+def evaluate_events(events, books, sports=None):
+    """Evaluates all matched events (of any mix of sports) in one vectorized pass and returns the arbitrage results."""
+    labels = []
+    kickoffs = {}
+    for event in events:
+        doc = next(iter(event.values()))
+        label = f"{doc['home']} vs {doc['away']} ({doc['league']})"
+        log.debug("✅ Match FOUND: %s on %s", label, ", ".join(event))
+        labels.append(label)
+        kickoff = next((d["kickoff"] for d in event.values() if d.get("kickoff")), None)
+        if kickoff:
+            kickoffs[label] = kickoff
+
+    best, best_book = build_best_odds(events, books)
+    results = evaluate_arbitrage_batch(labels, best, best_book, books, sports)
+    for arb in results:
+        if arb["match"] in kickoffs:
+            arb["kickoff"] = kickoffs[arb["match"]]  # Lets the alert store expire it at kickoff
+        log.info("🎯 Arbitrage (%s) found for %s", arb["market"], arb["match"])
+    return results
+
+def scanned_sports():
+    """The sports of SPORT_COLLECTIONS with at least two books; a single book has nothing to pair."""
+    return {sport: collections for sport, collections in SPORT_COLLECTIONS.items() if len(collections) >= 2}
+
+def report_skipped_sports():
+    for sport, collections in SPORT_COLLECTIONS.items():
+        if len(collections) < 2:
+            log.info("⏭️ Skipping %s: only %s is scraped, no second book to pair with.", sport, ", ".join(collections))
+
+def scan_books():
+    """Every book of every scanned sport, in SPORT_COLLECTIONS order (the column order of the best-odds stack)."""
+    return list(dict.fromkeys(book for collections in scanned_sports().values() for book in collections))
+
 def find_arbitrage_bets():
+    """
+    Scans every sport of scanned_sports() in one pass: all collections are
+    loaded in one stage, each sport is paired with the same clustering code,
+    and the events of all sports are evaluated in a single vectorized call.
+    """
+    report_skipped_sports()
+    events = []
+    sports = []
     matches_checked = 0
-    matches_matched = 0
+    if USE_MONGO_JOIN:
+        with metrics.SCAN_STAGE_SECONDS.time(stage="pairing"):
+            for sport, collections in scanned_sports().items():
+                sport_events, checked = cluster_events_mongo(collections)
+                events += sport_events
+                sports += [sport] * len(sport_events)
+                matches_checked += checked
+        report_events(events, sports, matches_checked)
+        return
+
+    # Load each book once
+    with metrics.SCAN_STAGE_SECONDS.time(stage="load"):
+        sport_docs = {
+            sport: {book: list(collection.find()) for book, collection in collections.items()}
+            for sport, collections in scanned_sports().items()
+        }
+    for sport, book_docs in sport_docs.items():
+        for book, docs in book_docs.items():
+            log.info("Loaded %d %s %s matches.", len(docs), book, sport)
 
-    for alb_doc in albbet_collection.find():
-        for vox_doc in vox_collection.find():
-            matches_checked += 1
+    with metrics.SCAN_STAGE_SECONDS.time(stage="pairing"):
+        cache = EventIdentityCache(IDENTITY_CACHE_PATH) if USE_IDENTITY_CACHE else None
+        for sport, book_docs in sport_docs.items():
+            clusters, checked = cluster_events(book_docs, cache)
+            matches_checked += checked
+            # Only events offered by at least two books can be arbitraged
+            sport_events = [cluster for cluster in clusters if len(cluster) >= 2]
+            events += sport_events
+            sports += [sport] * len(sport_events)
+        if cache:
+            cache.evict()
+            cache.close()
 
-            if is_potential_match(alb_doc, vox_doc):
-                matches_matched += 1
-                label = f"{alb_doc['home']} vs {alb_doc['away']} ({alb_doc['league']})"
-                debug_log(f"✅ Match FOUND: {label}")
+    report_events(events, sports, matches_checked)
 
-                best_odds = find_best_odds(alb_doc["odds"], vox_doc["odds"], label=label)
+def report_events(events, sports, matches_checked):
+    with metrics.SCAN_STAGE_SECONDS.time(stage="evaluate"):
+        results = evaluate_events(events, scan_books(), sports)
+    ARBITRAGE_RESULTS.extend(results)
+    metrics.SCAN_PAIRS_CHECKED.set(matches_checked)
+    metrics.SCAN_EVENTS.set(len(events))
+    metrics.SCAN_ARBITRAGES.set(len(results))
 
-                # Check 3-way arbitrage: 1X2
-                arb = compute_arbitrage(best_odds, label, ["1", "X", "2"])
-                if arb:
-                    debug_log(f"🎯 Arbitrage (1X2) found for {label}")
-                    ARBITRAGE_RESULTS.append(arb)
+    log.info("Matches checked: %d, Matches matched: %d", matches_checked, len(events))
 
-                # Check 3-way arbitrage: Double Chance
-                arb = compute_arbitrage(best_odds, label, ["DC_1X", "DC_12", "DC_X2"])
-                if arb:
-                    debug_log(f"🎯 Arbitrage (DC_1X+DC_12+DC_X2) found for {label}")
-                    ARBITRAGE_RESULTS.append(arb)
+def doc_key(doc):
+    """Scrapers re-insert every match on each crawl, so a document is identified by its names."""
+    return doc["home"], doc["away"], doc["league"]
 
-                # Check all 2-way combos
-                for k1, k2 in TWO_WAY_COMBOS:
-                    arb = compute_arbitrage(best_odds, label, [k1, k2])
-                    if arb:
-                        debug_log(f"🎯 Arbitrage ({k1} + {k2}) found for {label}")
-                        ARBITRAGE_RESULTS.append(arb)
+def odds_hash(doc):
+    return hashlib.sha1(json.dumps(doc["odds"], sort_keys=True, default=str).encode()).hexdigest()
+
+def event_key(event):
+    return frozenset((book, doc_key(doc)) for book, doc in event.items())
+
+def find_changed_docs(collection, query, unseen_keys, chunk_size=500):
+    """
+    Documents matching 'query', then any live fixture in 'unseen_keys' the
+    query did not return (e.g. written before the collection had
+    'written_at', or missed by an earlier tick).
+    """
+    for doc in collection.find(query):
+        unseen_keys.discard(doc_key(doc))
+        yield doc
+    unseen = list(unseen_keys)
+    for start in range(0, len(unseen), chunk_size):
+        names = [{"home": home, "away": away, "league": league}
+                 for home, away, league in unseen[start:start + chunk_size]]
+        yield from collection.find({"$or": names})
+
+def load_scan_state():
+    try:
+        with open(SCAN_STATE_PATH, "rb") as f:
+            state = pickle.load(f)
+        if state.get("version") == SCAN_STATE_VERSION:
+            return state
+        log.info("Scan state has an older layout, re-pairing from scratch.")
+    except FileNotFoundError:
+        pass
+    # docs: (sport, book) -> {doc_key: doc}, clusters: sport -> [cluster], best: (sport, event_key) -> row
+    return {"version": SCAN_STATE_VERSION, "last_tick": None, "docs": {}, "clusters": {}, "best": {}}
+
+def save_scan_state(state):
+    tmp_path = SCAN_STATE_PATH + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(state, f)
+    os.replace(tmp_path, SCAN_STATE_PATH)
+
+def find_arbitrage_bets_incremental():
+    """
+    Same checks as find_arbitrage_bets, but only for what changed since the
+    previous tick. Matched clusters, the last seen document per book and the
+    last best-odds vector per event are kept in SCAN_STATE_PATH, per sport.
+
+    Each tick pulls only documents committed since the previous tick
+    ('written_at', stamped by SnapshotWriter.commit; 'updated_at' is when the
+    scraper read the match, which can be long before the crawl is written),
+    plus the name fields of every document to notice removals and fixtures
+    never seen before. It drops documents whose odds hash is unchanged,
+    re-pairs only unseen fixtures and re-evaluates only events whose
+    best-odds vector moved.
+    """
+    state = load_scan_state()
+    tick = datetime.now(timezone.utc)
+    cache = EventIdentityCache(IDENTITY_CACHE_PATH) if USE_IDENTITY_CACHE else None
+    dirty = {}  # id(cluster) -> (sport, cluster)
+    matches_checked = 0
 
-    debug_log(f"Matches checked: {matches_checked}, Matches matched: {matches_matched}")
+    report_skipped_sports()
+    for sport, collections in scanned_sports().items():
+        clusters = state["clusters"].setdefault(sport, [])
+        doc_clusters = {}  # (book, doc_key) -> cluster
+        for cluster in clusters:
+            for book, doc in cluster.items():
+                doc_clusters[(book, doc_key(doc))] = cluster
+
+        for book, collection in collections.items():
+            known = state["docs"].setdefault((sport, book), {})
+
+            # Fixtures that disappeared from the book leave their event
+            live_keys = {doc_key(doc) for doc in collection.find({}, {"home": 1, "away": 1, "league": 1})}
+            unseen_keys = live_keys - set(known)
+            for key in set(known) - live_keys:
+                del known[key]
+                cluster = doc_clusters.pop((book, key), None)
+                if cluster is not None:
+                    del cluster[book]
+                    dirty[id(cluster)] = (sport, cluster)
+
+            query = {"written_at": {"$gte": state["last_tick"]}} if state["last_tick"] else {}
+            new_docs = []
+            changed = 0
+            for doc in find_changed_docs(collection, query, unseen_keys):
+                key = doc_key(doc)
+                if key in known and odds_hash(known[key]) == odds_hash(doc):
+                    continue
+                changed += 1
+                known[key] = doc
+                cluster = doc_clusters.get((book, key))
+                if cluster is not None:
+                    cluster[book] = doc  # odds moved, pairing stays
+                    dirty[id(cluster)] = (sport, cluster)
+                else:
+                    new_docs.append(doc)
+            log.info("%s %s: %d changed matches, %d new.", book, sport, changed, len(new_docs))
+
+            touched, pairs_checked = add_book_to_clusters(clusters, book, new_docs, cache)
+            matches_checked += pairs_checked
+            for cluster in touched:
+                dirty[id(cluster)] = (sport, cluster)
+                for member_book, doc in cluster.items():
+                    doc_clusters[(member_book, doc_key(doc))] = cluster
+
+        state["clusters"][sport] = [cluster for cluster in clusters if cluster]
+
+    if cache:
+        cache.evict()
+        cache.close()
+
+    live_events = {(sport, event_key(cluster)) for sport, clusters in state["clusters"].items() for cluster in clusters}
+    state["best"] = {key: row for key, row in state["best"].items() if key in live_events}
+
+    # Re-evaluate only events whose best-odds vector actually moved
+    books = scan_books()
+    candidates = [(sport, cluster) for sport, cluster in dirty.values() if len(cluster) >= 2]
+    with metrics.SCAN_STAGE_SECONDS.time(stage="evaluate"):
+        best, _ = build_best_odds([cluster for _, cluster in candidates], books)
+        moved = []
+        sports = []
+        for (sport, event), row in zip(candidates, best):
+            key = (sport, event_key(event))
+            last = state["best"].get(key)
+            if last is None or not np.array_equal(last, row, equal_nan=True):
+                state["best"][key] = row
+                moved.append(event)
+                sports.append(sport)
+
+        results = evaluate_events(moved, books, sports)
+    ARBITRAGE_RESULTS.extend(results)
+    metrics.SCAN_PAIRS_CHECKED.set(matches_checked)
+    metrics.SCAN_EVENTS.set(len(moved))
+    metrics.SCAN_ARBITRAGES.set(len(results))
+
+    state["last_tick"] = tick
+    save_scan_state(state)
+    log.info("Matches checked: %d, Events re-evaluated: %d", matches_checked, len(moved))
 
 def send_email_report():
+    """Hands the results to the e-mail dispatcher; batching, retries and rate limits happen there."""
     if not ARBITRAGE_RESULTS:
-        print("❌ No arbitrage opportunities found.")
+        log.info("❌ No arbitrage opportunities found.")
         return
+    alerts = ARBITRAGE_RESULTS
+    store = get_alert_store()
+    if store is not None:
+        alerts = store.filter(ARBITRAGE_RESULTS)
+        log.info("🔁 %d of %d opportunities were already notified.",
+                 len(ARBITRAGE_RESULTS) - len(alerts), len(ARBITRAGE_RESULTS))
+    # The store records alerts as sent only when the dispatcher acknowledges their delivery
+    queued = email_alert.get_dispatcher().submit_many(alerts, ack=store.acknowledge if store else None)
+    log.info("📧 Queued %d/%d alerts for e-mail.", queued, len(alerts))
 
-    msg = EmailMessage()
-    msg["Subject"] = "⚽ Arbitrage Opportunities Report"
-    msg["From"] = EMAIL_USER
-    msg["To"] = EMAIL_USER
-
-    body = "🔥 Arbitrage Bets Found:\n\n"
-    for arb in ARBITRAGE_RESULTS:
-        body += f"Match: {arb['match']}\n"
-        body += f"Market: {arb['market']}\n"
-        body += f"Profit: {arb['profit_percent']}%\n"
-        body += "Best Odds:\n"
-        for market, odd in arb["odds"].items():
-            body += f"  {market}: {odd}\n"
-        body += "Suggested Stakes (for 100€):\n"
-        for market, stake in arb["stake_split"].items():
-            body += f"  {market}: {stake}€\n"
-        body += "-" * 40 + "\n\n"
-
-    msg.set_content(body)
-
-    # 💬 Print the email to console
-    print("📧 Email content:\n")
-    print(body)
 
-    try:
-        context = ssl.create_default_context()
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465, context=context) as server:
-            server.login(EMAIL_USER, EMAIL_PASS)
-            server.send_message(msg)
-        print("✅ Email sent successfully.")
-    except Exception as e:
-        print(f"❌ Failed to send email: {e}")
+_alert_store = None
+
+
+def get_alert_store():
+    """The process-wide AlertStore, or None when USE_ALERT_STORE is off."""
+    global _alert_store
+    if _alert_store is None and USE_ALERT_STORE:
+        _alert_store = AlertStore(ALERT_STORE_PATH)
+    return _alert_store
 
 
 # === RUN MODULE ===
-debug_log("Starting arbitrage scan...")
-find_arbitrage_bets()
-send_email_report()
-debug_log("Finished.")
+if __name__ == "__main__":
+    configure()
+    metrics.start_http_server()
+    log.info("Starting arbitrage scan...")
+    with metrics.SCAN_STAGE_SECONDS.time(stage="total"):
+        if INCREMENTAL_SCAN:
+            find_arbitrage_bets_incremental()
+        else:
+            find_arbitrage_bets()
+    with metrics.SCAN_STAGE_SECONDS.time(stage="report"):
+        send_email_report()
+    email_alert.get_dispatcher().close()  # Waits for delivery, so the alert store is acknowledged before it closes
+    if _alert_store is not None:
+        _alert_store.close()
+    log.info("Metrics written to %s", metrics.dump("scanner"))
+    log.info("Finished.")
+
@@ -0,0 +1,368 @@
+"""
+Synthetic-data benchmark for the arbitrage scanner.
+
+Generates albbet/vox-style documents for N events with realistic name noise
+(accents, "FC" prefixes, reserve-team suffixes, abbreviations) and a fixed
+share of injected arbitrage, then times every scanner stage separately at
+several scales: pairing, best odds and combo evaluation, for both the current
+engine and the original per-pair functions (pairing as the original nested
+loop over every albbet x vox pair), plus a full find_arbitrage_bets run
+against an in-memory stand-in for Mongo.
+
+The baseline stores each stage's time as a ratio to the legacy stages timed
+in the same run (REFERENCES), not in seconds, so it holds on any machine.
+
+    python benchmark.py                      # compare against BASELINE_PATH
+    python benchmark.py --update-baseline    # store this run as the new baseline
+
+Exits with 1 when a stage's ratio grew by more than the tolerance, or when
+matching quality / detected arbitrage dropped.
+"""
+import argparse
+import json
+import logging
+import math
+import random
+import sys
+import time
+import unicodedata
+from datetime import datetime, timezone
+
+import arbitrage_scanner as scanner
+from logs import configure
+from markets import ARBITRAGE_COMBOS
+
+BASELINE_PATH = "benchmark_baseline.json"
+SCALES = [100, 500, 2000]  # Events per run
+ARBITRAGE_RATE = 0.05  # Share of events with an injected cross-book 1X2 arbitrage
+BOTH_BOOKS_RATE = 0.85  # Share of events offered by both books
+REPEATS = 3  # Best of REPEATS timings per stage
+LEGACY_PAIRING_REPEATS = 1  # The full cross product takes tens of seconds at 2000 events
+TOLERANCE = 0.25  # Allowed growth of a stage's ratio against the baseline
+MIN_REGRESSION = 0.02  # Slowdowns below this many seconds are timer noise
+SEED = 1234
+
+SYLLABLES = ["vel", "or", "an", "dra", "mo", "kas", "ti", "ber", "lu", "zen", "ar", "go",
+             "sta", "ri", "nov", "el", "pol", "cas", "ta", "mir", "rés", "san", "té", "lo"]
+CLUB_SUFFIXES = ["United", "City", "Athletic", "Sporting", "Rovers", "Wanderers", "Town", "Albion", ""]
+ABBREVIATIONS = {"United": "Utd", "Athletic": "Ath.", "Sporting": "Sp.", "Wanderers": "Wand.", "City": "C."}
+RESERVE_SUFFIXES = {" II": [" II", " 2", " B"], " U21": [" U21", " U-21"], " Reserves": [" Res.", " II"]}
+LEAGUE_NAMES = ["Premier League", "First Division", "Super League", "Championship", "Cup"]
+TEAMS_PER_LEAGUE = 20
+
+
+# === FIXTURES ===
+
+def _place(rng):
+    name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3)))
+    return name.capitalize()
+
+
+def _strip_accents(val):
+    return "".join(c for c in unicodedata.normalize("NFKD", val) if not unicodedata.combining(c))
+
+
+def _team(rng):
+    name = _place(rng)
+    suffix = rng.choice(CLUB_SUFFIXES)
+    if suffix:
+        name = f"{name} {suffix}"
+    if rng.random() < 0.3:
+        name = "FC " + name
+    if rng.random() < 0.1:
+        name += rng.choice(list(RESERVE_SUFFIXES))
+    return name
+
+
+def _vox_team(name, rng):
+    """How the other book spells the same team."""
+    if rng.random() < 0.5:
+        name = _strip_accents(name)
+    if name.startswith("FC ") and rng.random() < 0.5:
+        name = name[3:]
+    elif rng.random() < 0.1:
+        name = "FC " + name
+    for full, short in ABBREVIATIONS.items():
+        if full in name.split() and rng.random() < 0.5:
+            name = name.replace(full, short)
+    for suffix, variants in RESERVE_SUFFIXES.items():
+        if name.endswith(suffix):
+            name = name[:-len(suffix)] + rng.choice(variants)
+    return name
+
+
+def _vox_league(name, rng):
+    country, _, competition = name.partition(" ")
+    return rng.choice([name, f"{country} - {competition}", f"{country}. {competition}", name.upper()])
+
+
+def _book_odds(probs, margin, rng):
+    return {key: round(1 / (p * margin * rng.uniform(0.99, 1.01)), 2) for key, p in probs.items()}
+
+
+def _event_odds(rng, arbitrage):
+    """Odds of one event for both books; with 'arbitrage', albbet's home price and vox's X/2 beat the market."""
+    home = rng.uniform(0.2, 0.6)
+    draw = rng.uniform(0.2, 0.3)
+    probs = {"1": home, "X": draw, "2": 1 - home - draw}
+    goals = rng.uniform(0.35, 0.65)
+    btts = rng.uniform(0.4, 0.6)
+    probs.update({
+        "DC_1X": probs["1"] + probs["X"], "DC_12": probs["1"] + probs["2"], "DC_X2": probs["X"] + probs["2"],
+        "BTTS_Yes": btts, "BTTS_No": 1 - btts, "Over_2.5": goals, "Under_2.5": 1 - goals,
+    })
+    alb = _book_odds(probs, 1.06, rng)
+    vox = _book_odds(probs, 1.06, rng)
+    if arbitrage:
+        alb["1"] = round(1 / (probs["1"] * 0.9), 2)
+        vox["X"] = round(1 / (probs["X"] * 0.97), 2)
+        vox["2"] = round(1 / (probs["2"] * 0.97), 2)
+    return alb, vox
+
+
+def generate_fixtures(n_events, seed=SEED, arbitrage_rate=ARBITRAGE_RATE, both_books_rate=BOTH_BOOKS_RATE):
+    """
+    Returns (albbet docs, vox docs, truth): 'truth' maps the position of every
+    albbet doc to the position of the same event's vox doc, and 'arbitrage' is
+    the set of albbet positions with an injected 1X2 arbitrage.
+    """
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    alb_docs, vox_docs, truth, arbitrage = [], [], {}, set()
+
+    n_leagues = math.ceil(n_events / (TEAMS_PER_LEAGUE // 2))
+    for _ in range(n_leagues):
+        league = f"{_place(rng)} {rng.choice(LEAGUE_NAMES)}"
+        vox_league = _vox_league(league, rng)
+        teams = list(dict.fromkeys(_team(rng) for _ in range(TEAMS_PER_LEAGUE)))  # Deduplicated, in a stable order
+        rng.shuffle(teams)
+        for home, away in zip(teams[::2], teams[1::2]):
+            if len(alb_docs) == n_events:
+                break
+            injected = rng.random() < arbitrage_rate
+            alb_odds, vox_odds = _event_odds(rng, injected)
+            if injected:
+                arbitrage.add(len(alb_docs))
+            alb_docs.append({"home": home, "away": away, "league": league, "odds": alb_odds, "updated_at": now})
+            if rng.random() < both_books_rate or injected:
+                truth[len(alb_docs) - 1] = len(vox_docs)
+                vox_docs.append({"home": _vox_team(home, rng), "away": _vox_team(away, rng),
+                                 "league": vox_league, "odds": vox_odds, "updated_at": now})
+
+    order = list(range(len(vox_docs)))
+    rng.shuffle(order)  # The books list their matches in different orders
+    position = {old: new for new, old in enumerate(order)}
+    vox_docs = [vox_docs[old] for old in order]
+    truth = {alb: position[vox] for alb, vox in truth.items()}
+    return alb_docs, vox_docs, {"pairs": truth, "arbitrage": arbitrage}
+
+
+class InMemoryCollection:
+    """Just enough of a pymongo collection for the scanner: find() with $gte filters and projections."""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query=None, projection=None):
+        for doc in self.docs:
+            if all(doc.get(field) is not None and doc[field] >= cond["$gte"] for field, cond in (query or {}).items()):
+                if projection:
+                    yield {field: doc[field] for field in projection if field in doc}
+                else:
+                    yield dict(doc)  # Mongo hands out fresh documents on every query
+
+
+# === STAGES ===
+
+def _timed(func, repeats=REPEATS):
+    best, result = None, None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _pairing_quality(pairs, alb_docs, vox_docs, truth):
+    alb_pos = {id(doc): i for i, doc in enumerate(alb_docs)}
+    vox_pos = {id(doc): i for i, doc in enumerate(vox_docs)}
+    found = {(alb_pos[id(a)], vox_pos[id(v)]) for a, v in pairs}
+    expected = set(truth["pairs"].items())
+    correct = len(found & expected)
+    return {
+        "pairs": len(found),
+        "precision": round(correct / len(found), 4) if found else 1.0,
+        "recall": round(correct / len(expected), 4) if expected else 1.0,
+    }
+
+
+def legacy_pairing(alb_docs, vox_docs):
+    """The original O(N x M) pairing: is_potential_match on every albbet x vox pair, no blocking."""
+    return [(a, v) for a in alb_docs for v in vox_docs if scanner.is_potential_match(a, v)]
+
+
+def legacy_best_odds(pairs):
+    return [scanner.find_best_odds(a["odds"], v["odds"]) for a, v in pairs]
+
+
+def legacy_combos(best_odds):
+    results = []
+    for best in best_odds:
+        for combo in ARBITRAGE_COMBOS:
+            arb = scanner.compute_arbitrage(best, "", combo)
+            if arb:
+                results.append(arb)
+    return results
+
+
+def run_scale(n_events):
+    alb_docs, vox_docs, truth = generate_fixtures(n_events)
+    books = ["albbet", "vox"]
+    stages = {}
+
+    seconds, pairs = _timed(lambda: scanner.match_docs(alb_docs, vox_docs)[0])
+    stages["pairing"] = {"seconds": seconds, **_pairing_quality(pairs, alb_docs, vox_docs, truth)}
+    seconds, legacy_pairs = _timed(lambda: legacy_pairing(alb_docs, vox_docs), LEGACY_PAIRING_REPEATS)
+    stages["pairing_legacy"] = {"seconds": seconds, **_pairing_quality(legacy_pairs, alb_docs, vox_docs, truth)}
+
+    events = [{"albbet": a, "vox": v} for a, v in pairs]
+    labels = [f"{a['home']} vs {a['away']} ({a['league']})" for a, _ in pairs]
+    seconds, (best, best_book) = _timed(lambda: scanner.build_best_odds(events, books))
+    stages["best_odds"] = {"seconds": seconds}
+    seconds, legacy_best = _timed(lambda: legacy_best_odds(pairs))
+    stages["best_odds_legacy"] = {"seconds": seconds}
+
+    seconds, results = _timed(lambda: scanner.evaluate_arbitrage_batch(labels, best, best_book, books))
+    stages["combos"] = {"seconds": seconds, "arbitrages": len(results)}
+    seconds, legacy_results = _timed(lambda: legacy_combos(legacy_best))
+    stages["combos_legacy"] = {"seconds": seconds, "arbitrages": len(legacy_results)}
+
+    # Share of the injected 1X2 arbitrages that were actually reported
+    injected = {id(alb_docs[i]) for i in truth["arbitrage"]}
+    label_docs = dict(zip(labels, (a for a, _ in pairs)))
+    detected = {id(label_docs[arb["match"]]) for arb in results if arb["market"] == "+".join(ARBITRAGE_COMBOS[0])}
+    stages["combos"]["injected_found"] = round(len(injected & detected) / len(injected), 4) if injected else 1.0
+
+    def full_scan():
+        scanner.ARBITRAGE_RESULTS.clear()
+        scanner.find_arbitrage_bets()
+        return len(scanner.ARBITRAGE_RESULTS)
+
+    scanner.SPORT_COLLECTIONS = {
+        "football": {"albbet": InMemoryCollection(alb_docs), "vox": InMemoryCollection(vox_docs)},
+    }
+    seconds, found = _timed(full_scan)
+    stages["scan"] = {"seconds": seconds, "arbitrages": found}
+    add_ratios(stages)
+    return stages
+
+
+# === BASELINE ===
+
+# Stage -> the legacy stages of the same run its time is divided by
+REFERENCES = {
+    "pairing": ["pairing_legacy"],
+    "best_odds": ["best_odds_legacy"],
+    "combos": ["combos_legacy"],
+    "scan": ["pairing_legacy", "best_odds_legacy", "combos_legacy"],
+}
+# Quality figures that must not drop below the baseline
+QUALITY_KEYS = ["precision", "recall", "injected_found"]
+
+
+def add_ratios(stages):
+    for stage, references in REFERENCES.items():
+        reference = sum(stages[name]["seconds"] for name in references)
+        stages[stage]["ratio"] = round(stages[stage]["seconds"] / reference, 5) if reference else None
+
+
+def _reference_seconds(stages, stage):
+    return sum(stages[name]["seconds"] for name in REFERENCES[stage])
+
+
+def baseline_of(current):
+    """What the baseline keeps of a run: ratios and quality figures, no machine-dependent seconds."""
+    return {
+        scale: {stage: {k: v for k, v in stats.items() if k != "seconds"} for stage, stats in stages.items()}
+        for scale, stages in current.items()
+    }
+
+
+def compare(current, baseline, tolerance=TOLERANCE):
+    """Returns a list of regression messages (empty when nothing regressed)."""
+    failures = []
+    for scale, stages in current.items():
+        for stage, stats in stages.items():
+            base = baseline.get(scale, {}).get(stage)
+            if not base:
+                continue
+            if base.get("ratio") and stats.get("ratio"):
+                limit = base["ratio"] * (1 + tolerance)
+                # Slowdowns of less than MIN_REGRESSION seconds on this machine are timer noise
+                extra = stats["seconds"] - base["ratio"] * _reference_seconds(stages, stage)
+                if stats["ratio"] > limit and extra > MIN_REGRESSION:
+                    failures.append(f"{scale} events / {stage}: ratio {stats['ratio']:.5f} "
+                                    f"(baseline {base['ratio']:.5f}, limit {limit:.5f})")
+            for key in QUALITY_KEYS:
+                if key in base and stats.get(key, 0) < base[key]:
+                    failures.append(f"{scale} events / {stage}: {key} {stats.get(key)} (baseline {base[key]})")
+    return failures
+
+
+def print_report(current, baseline):
+    for scale, stages in current.items():
+        print(f"📊 {scale} events")
+        for stage, stats in stages.items():
+            base = baseline.get(scale, {}).get(stage)
+            change = ""
+            if base and base.get("ratio") and stats.get("ratio"):
+                change = f" ({(stats['ratio'] / base['ratio'] - 1) * 100:+.0f}%)"
+            extra = ", ".join(f"{k}={v}" for k, v in stats.items() if k != "seconds")
+            print(f"    {stage:<17} {stats['seconds'] * 1000:9.2f} ms{change}  {extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--scales", type=int, nargs="+", default=SCALES)
+    args = parser.parse_args()
+
+    logging.getLogger("arbitrage_scanner").setLevel(logging.WARNING)  # Keep the report readable
+    scanner.USE_IDENTITY_CACHE = False  # Every run must pair from scratch
+
+    current = {}
+    for n_events in args.scales:
+        current[str(n_events)] = run_scale(n_events)
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        baseline = {}
+
+    print_report(current, baseline)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(baseline_of(current), f, indent=2)
+        print(f"💾 Baseline written to {args.baseline}")
+        return 0
+
+    if not baseline:
+        print(f"⚠️ No baseline at {args.baseline}; run with --update-baseline first.")
+        return 0
+
+    failures = compare(current, baseline, args.tolerance)
+    for failure in failures:
+        print(f"❌ Regression: {failure}")
+    if not failures:
+        print("✅ No regressions against the baseline.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    configure()
+    sys.exit(main())
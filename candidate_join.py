@@ -0,0 +1,200 @@
+"""
+Mongo-side candidate pairing for the scanner.
+
+Every odds document carries normalized match keys (home_keys/away_keys/
+league_keys: the blocking keys of blocking_keys(), league_key: the normalized
+league), added by SnapshotWriter when the document is written. With those
+indexed, coarse pairing runs inside MongoDB: one aggregation per pair of
+books $matches the current time window, $lookups the other book on a shared
+home key (keeping candidates that also share an away key) and on a shared
+league key (keeping candidates that share a key on either team), and projects
+only home/away/league/odds. Python then only fuzzy-scores the survivors.
+
+    python candidate_join.py     # create indexes and backfill keys on existing collections
+
+SnapshotWriter keys and indexes every new snapshot, and the orchestrator
+runs prepare_collections() once at startup; the scan itself never writes.
+
+The $lookup combines localField/foreignField with a sub-pipeline, which needs
+MongoDB 5.0 or newer.
+"""
+import os
+import re
+import unicodedata
+from datetime import datetime, timezone, timedelta
+
+from pymongo import ASCENDING, MongoClient, UpdateOne
+
+from logs import configure, get_logger
+
+log = get_logger("candidate_join")
+
+BLOCKING_PREFIX_LEN = 3  # Token prefix length used as blocking key
+KEYS_VERSION = 2  # Stored with the keys; documents with older keys are backfilled
+# Club-type and filler tokens shared by too many names to be useful as keys
+TEAM_AFFIXES = {"fc", "afc", "sc", "cf", "ac", "fk", "sk", "nk", "cd", "ud", "sd", "if", "bk", "club", "de", "the"}
+LEAGUE_WORDS = {"league", "liga", "ligue", "lig", "division", "cup", "serie", "super", "premier", "first", "second"}
+# Spelling variants of transliterated names (Dynamo/Dinamo, Kyiv/Kiev, Crvena/Tsrvena)
+TRANSLITERATIONS = (("ph", "f"), ("ts", "c"), ("ck", "k"), ("q", "k"), ("c", "k"), ("w", "v"), ("y", "i"), ("j", "i"))
+CANDIDATE_WINDOW = timedelta(hours=6)  # Only documents written this recently are paired
+PAIR_FIELDS = ("home", "away", "league", "odds", "kickoff")
+ODDS_COLLECTION_RE = re.compile(r"^[a-z]+_odds_[a-z0-9]+$")  # football_odds_vox, tennis_odds_vox, ...
+
+INDEXES = (
+    [("home_keys", ASCENDING)],  # $lookup foreignField
+    [("away_keys", ASCENDING)],
+    [("league_keys", ASCENDING)],  # $lookup foreignField
+    [("league_key", ASCENDING)],
+    [("keys_version", ASCENDING)],  # Backfill
+    [("kickoff", ASCENDING)],  # Orchestrator cadence and the time window
+    [("updated_at", ASCENDING)],  # Time window
+    [("written_at", ASCENDING)],  # Incremental scans (commit time of the snapshot)
+)
+
+
+def normalize_name(val):
+    """Lowercase, strip accents and punctuation so both books tokenize the same way."""
+    val = unicodedata.normalize("NFKD", val or "")
+    val = "".join(c for c in val if not unicodedata.combining(c))
+    return re.sub(r"[^a-z0-9]+", " ", val.lower()).strip()
+
+
+def _skeleton(token):
+    """Transliteration-insensitive form of a token: 'dynamo'/'dinamo' -> 'dnm', 'kyiv'/'kiev' -> 'kv'."""
+    for spelling, sound in TRANSLITERATIONS:
+        token = token.replace(spelling, sound)
+    token = token[0] + re.sub(r"[aeiou]", "", token[1:])
+    return re.sub(r"(.)\1+", r"\1", token)[:BLOCKING_PREFIX_LEN]
+
+
+def blocking_keys(name, ignore=TEAM_AFFIXES):
+    """
+    Blocking keys of a name: the prefix of every token ('Man Utd' -> 'man',
+    'utd'), short tokens as they are ('AZ Alkmaar' and 'AZ' share 'az'), the
+    transliteration skeleton of every longer token ('~dnm' for Dynamo and
+    Dinamo) and the whole normalized name ('=azalkmaar'). Tokens in 'ignore'
+    only count when a name has nothing else.
+    """
+    tokens = normalize_name(name).split()
+    if not tokens:
+        return set()
+    meaningful = [t for t in tokens if t not in ignore] or tokens
+    keys = {"=" + "".join(tokens)}
+    for token in meaningful:
+        if len(token) < BLOCKING_PREFIX_LEN or token.isdigit():
+            keys.add(token)
+        else:
+            keys.add(token[:BLOCKING_PREFIX_LEN])
+            keys.add("~" + _skeleton(token))
+    return keys
+
+
+def match_keys(doc):
+    """The normalized key fields stored on every odds document."""
+    return {
+        "home_keys": sorted(blocking_keys(doc.get("home"))),
+        "away_keys": sorted(blocking_keys(doc.get("away"))),
+        "league_keys": sorted(blocking_keys(doc.get("league"), LEAGUE_WORDS)),
+        "league_key": normalize_name(doc.get("league")),
+        "keys_version": KEYS_VERSION,
+    }
+
+
+def add_match_keys(doc):
+    doc.update(match_keys(doc))
+    return doc
+
+
+def ensure_indexes(collection):
+    """Creates the pairing indexes on 'collection' (a no-op for the ones that exist)."""
+    for keys in INDEXES:
+        collection.create_index(keys)
+
+
+def backfill_match_keys(collection, batch_size=1000):
+    """(Re)computes the key fields of documents written before KEYS_VERSION. Returns how many were updated."""
+    updates = []
+    updated = 0
+    for doc in collection.find({"keys_version": {"$ne": KEYS_VERSION}}, {"home": 1, "away": 1, "league": 1}):
+        updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": match_keys(doc)}))
+        if len(updates) >= batch_size:
+            updated += collection.bulk_write(updates, ordered=False).modified_count
+            updates = []
+    if updates:
+        updated += collection.bulk_write(updates, ordered=False).modified_count
+    return updated
+
+
+def _window_filter(now, window):
+    """Recently written documents whose match has not started (or has no kickoff time)."""
+    return {
+        "updated_at": {"$gte": now - window},
+        "$or": [{"kickoff": None}, {"kickoff": {"$gte": now}}],
+    }
+
+
+def _shares(field, variable):
+    """$expr: the candidate's 'field' array shares an element with the local '$$variable'."""
+    return {"$gt": [{"$size": {"$setIntersection": [{"$ifNull": [f"${field}", []]}, f"$${variable}"]}}, 0]}
+
+
+def candidate_pipeline(other_name, now=None, window=CANDIDATE_WINDOW):
+    """
+    Aggregation on one book's collection that attaches the other book's
+    candidate documents: those sharing a home and an away key, plus those
+    sharing a league key and a key on either team.
+    """
+    now = now or datetime.now(timezone.utc)
+    projection = {field: 1 for field in PAIR_FIELDS}
+    let = {name: {"$ifNull": [f"${name}", []]} for name in ("home_keys", "away_keys")}
+
+    def lookup(local_field, condition, name):
+        return {"$lookup": {
+            "from": other_name,
+            "localField": local_field,
+            "foreignField": local_field,
+            "let": let,
+            "pipeline": [
+                {"$match": _window_filter(now, window)},
+                {"$match": {"$expr": condition}},
+                {"$project": projection},
+            ],
+            "as": name,
+        }}
+
+    return [
+        {"$match": _window_filter(now, window)},
+        {"$project": {**projection, "home_keys": 1, "away_keys": 1, "league_keys": 1}},
+        lookup("home_keys", _shares("away_keys", "away_keys"), "team_candidates"),
+        lookup("league_keys", {"$or": [_shares("home_keys", "home_keys"), _shares("away_keys", "away_keys")]},
+               "league_candidates"),
+        {"$project": {**projection, "candidates": {"$setUnion": ["$team_candidates", "$league_candidates"]}}},
+        {"$match": {"candidates.0": {"$exists": True}}},
+    ]
+
+
+def candidate_pairs(collection, other, now=None, window=CANDIDATE_WINDOW):
+    """
+    (doc, other_doc) pairs of two book collections that share a home and an
+    away blocking key, or a league key and a key on either team, both
+    written within 'window' and not yet started.
+    """
+    pairs = []
+    for doc in collection.aggregate(candidate_pipeline(other.name, now, window), allowDiskUse=True):
+        for candidate in doc.pop("candidates"):
+            pairs.append((doc, candidate))
+    return pairs
+
+
+def prepare_collections(db):
+    """Indexes every odds collection of 'db' and backfills keys on documents written before them (setup, not per scan)."""
+    for name in db.list_collection_names():
+        if not ODDS_COLLECTION_RE.match(name):
+            continue
+        ensure_indexes(db[name])
+        log.info("🗂️ %s: indexes ready, %d documents backfilled with match keys.", name, backfill_match_keys(db[name]))
+
+
+if __name__ == "__main__":
+    configure()
+    prepare_collections(MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017"))["arbitrage_db"])
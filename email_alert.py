@@ -0,0 +1,321 @@
+"""
+Batched e-mail alerts, sent from a background thread so the scanner never
+waits on SMTP.
+
+submit() only puts alerts on a bounded queue. The dispatcher thread keeps one
+SMTP connection open, coalesces everything that arrives within BATCH_WINDOW
+seconds into a single e-mail (at most MAX_BATCH alerts each), sends no more
+than MAX_EMAILS_PER_MINUTE and retries failed sends with exponential backoff
+while new alerts keep queueing. When the queue is full new alerts are
+dropped and counted instead of blocking the caller.
+
+Callers that need to know what was delivered (AlertStore) pass an 'ack'
+callable with the alerts; it is called as ack(alerts, delivered) once their
+e-mail went out, failed for good or the alerts were dropped.
+
+Any SMTP server works, so the whole path can be tried against a local one:
+
+    python -m aiosmtpd -n -l localhost:8025
+    SMTP_HOST=localhost SMTP_PORT=8025 SMTP_SECURITY=none python email_alert.py 25
+"""
+import os
+import queue
+import smtplib
+import ssl
+import sys
+import threading
+import time
+from email.message import EmailMessage
+
+from dotenv import load_dotenv
+
+import metrics
+from logs import configure, get_logger
+
+log = get_logger("email_alert")
+
+load_dotenv()
+EMAIL_USER = os.getenv("GMAIL_USER")
+EMAIL_PASS = os.getenv("GMAIL_PASS")
+ALERT_TO = os.getenv("ALERT_TO") or EMAIL_USER
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "465"))
+SMTP_SECURITY = os.getenv("SMTP_SECURITY", "ssl")  # "ssl", "starttls" or "none"
+SMTP_TIMEOUT = 30
+
+BATCH_WINDOW = float(os.getenv("ALERT_BATCH_WINDOW", "30"))  # Seconds alerts are coalesced into one e-mail
+MAX_BATCH = 50  # Alerts per e-mail
+MAX_EMAILS_PER_MINUTE = 10
+QUEUE_SIZE = 1000  # Alerts waiting to be sent; beyond this new ones are dropped
+MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 2  # Seconds, doubled after every failed attempt
+IDLE_TIMEOUT = 120  # Close the pooled connection after this long without e-mails
+
+_STOP = object()
+
+
+def format_alert(arb):
+    """Text block of one arbitrage opportunity."""
+    lines = [
+        f"Match: {arb['match']}",
+        f"Sport: {arb.get('sport', 'football')}",
+        f"Market: {arb['market']}",
+        f"Profit: {arb['profit_percent']}%",
+        "Best Odds:",
+    ]
+    lines += [f"  {market}: {odd} @ {arb['books'][market]}" for market, odd in arb["odds"].items()]
+    lines.append("Suggested Stakes (for 100€):")
+    lines += [f"  {market}: {stake}€" for market, stake in arb["stake_split"].items()]
+    lines.append("-" * 40)
+    return "\n".join(lines)
+
+
+def build_message(alerts, sender=EMAIL_USER, recipient=ALERT_TO):
+    """One e-mail for a batch of alerts, best profit first."""
+    alerts = sorted(alerts, key=lambda arb: arb["profit_percent"], reverse=True)
+    msg = EmailMessage()
+    msg["Subject"] = f"⚽ Arbitrage Opportunities Report ({len(alerts)})"
+    msg["From"] = sender or "arbitrage-scanner@localhost"
+    msg["To"] = recipient or msg["From"]
+    msg.set_content("🔥 Arbitrage Bets Found:\n\n" + "\n\n".join(format_alert(arb) for arb in alerts) + "\n")
+    return msg
+
+
+class RateLimiter:
+    """Token bucket: 'rate' sends per 'per' seconds, bursts up to 'rate'."""
+
+    def __init__(self, rate=MAX_EMAILS_PER_MINUTE, per=60.0):
+        self.capacity = max(1, rate)
+        self.fill_rate = self.capacity / per
+        self.tokens = float(self.capacity)
+        self.last = time.monotonic()
+
+    def wait_time(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.fill_rate)
+        self.last = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.fill_rate
+
+    def take(self):
+        self.wait_time()
+        self.tokens -= 1
+
+
+class AlertDispatcher:
+    """
+    Queue + background sender for arbitrage alerts (the dicts the scanner
+    produces). start() is implicit on the first submit(); close() sends what
+    is still queued and waits up to 'timeout' seconds for it.
+    """
+
+    def __init__(self, host=SMTP_HOST, port=SMTP_PORT, security=SMTP_SECURITY, user=EMAIL_USER,
+                 password=EMAIL_PASS, recipient=ALERT_TO, batch_window=BATCH_WINDOW, max_batch=MAX_BATCH,
+                 emails_per_minute=MAX_EMAILS_PER_MINUTE, queue_size=QUEUE_SIZE):
+        self.host = host
+        self.port = port
+        self.security = security
+        self.user = user
+        self.password = password
+        self.recipient = recipient
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.limiter = RateLimiter(emails_per_minute)
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.server = None
+        self.last_used = 0.0
+        self.closing = threading.Event()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    # --- caller side (scanner) ---
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="email-alerts", daemon=True)
+                self.thread.start()
+        return self
+
+    def submit(self, arb, ack=None):
+        """Queues one alert without blocking; returns False when it was dropped."""
+        if self.closing.is_set():
+            _acknowledge([(arb, ack)], False)
+            return False
+        self.start()
+        try:
+            self.queue.put_nowait((arb, ack))
+        except queue.Full:
+            metrics.ALERTS_DROPPED.inc()
+            log.warning("⚠️ Alert queue full (%d), dropped alert for %s", self.queue.maxsize, arb.get("match"))
+            _acknowledge([(arb, ack)], False)
+            return False
+        metrics.ALERTS_QUEUED.inc()
+        metrics.ALERT_QUEUE_DEPTH.set(self.queue.qsize())
+        return True
+
+    def submit_many(self, alerts, ack=None):
+        return sum(self.submit(arb, ack) for arb in alerts)
+
+    def close(self, timeout=120):
+        """Sends the remaining alerts (no batch window wait) and stops the thread."""
+        if self.thread is None:
+            return
+        self.closing.set()
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self.thread.join(timeout)
+        if self.thread.is_alive():
+            log.warning("⚠️ Alert dispatcher did not finish within %ss, %d alerts unsent", timeout, self.queue.qsize())
+
+    # --- dispatcher thread ---
+
+    def _collect(self):
+        """Blocks for the first alert, then gathers more until the window closes or the batch is full."""
+        batch = []
+        stop = False
+        while not batch:
+            try:
+                item = self.queue.get(timeout=1 if self.closing.is_set() else IDLE_TIMEOUT / 4)
+            except queue.Empty:
+                if self.closing.is_set():
+                    return batch, True
+                self._close_idle()
+                continue
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = 0 if self.closing.is_set() else deadline - time.monotonic()
+            try:
+                item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop = True
+                break
+            batch.append(item)
+        metrics.ALERT_QUEUE_DEPTH.set(self.queue.qsize())
+        return batch, stop
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch, stop = self._collect()
+            if batch:
+                self._throttle()
+                _acknowledge(batch, self._send_with_retries([arb for arb, _ in batch]))
+            if stop and not self.queue.empty():
+                stop = False  # Alerts that raced close() are still queued; sent before stopping
+        self._disconnect()
+
+    def _throttle(self):
+        wait = self.limiter.wait_time()
+        if wait > 0:
+            log.info("⏳ E-mail rate limit reached, waiting %.1fs", wait)
+            time.sleep(wait)
+        self.limiter.take()
+
+    def _send_with_retries(self, batch):
+        msg = build_message(batch, self.user, self.recipient)
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                started = time.perf_counter()
+                self._connection().send_message(msg)
+                self.last_used = time.monotonic()
+                metrics.ALERT_EMAILS.inc(status="sent")
+                metrics.ALERTS_SENT.inc(len(batch))
+                log.info("✅ Email with %d alerts sent in %.2fs.", len(batch), time.perf_counter() - started)
+                log.debug("📧 Email content:\n\n%s", msg.get_content())
+                return True
+            except (smtplib.SMTPException, OSError) as e:
+                self._disconnect()
+                if attempt == MAX_ATTEMPTS:
+                    break
+                delay = RETRY_BASE_DELAY * 2 ** (attempt - 1)
+                metrics.ALERT_EMAILS.inc(status="retried")
+                log.warning("⚠️ Email attempt %d/%d failed (%s), retrying in %ss", attempt, MAX_ATTEMPTS, e, delay)
+                time.sleep(delay)
+        metrics.ALERT_EMAILS.inc(status="failed")
+        log.error("❌ Failed to send email with %d alerts after %d attempts.", len(batch), MAX_ATTEMPTS)
+        return False
+
+    def _connection(self):
+        """The pooled SMTP connection, (re)opened when missing or dead."""
+        if self.server is not None:
+            try:
+                if self.server.noop()[0] == 250:
+                    return self.server
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._disconnect()
+
+        if self.security == "ssl":
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=SMTP_TIMEOUT,
+                                      context=ssl.create_default_context())
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT)
+            if self.security == "starttls":
+                server.starttls(context=ssl.create_default_context())
+        if self.user and self.password:
+            server.login(self.user, self.password)
+        self.server = server
+        log.debug("Connected to %s:%s", self.host, self.port)
+        return server
+
+    def _close_idle(self):
+        if self.server is not None and time.monotonic() - self.last_used > IDLE_TIMEOUT:
+            self._disconnect()
+
+    def _disconnect(self):
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            self.server.close()
+        self.server = None
+
+
+def _acknowledge(items, delivered):
+    """Calls each distinct ack of (alert, ack) items once with its alerts."""
+    by_ack = {}
+    for arb, ack in items:
+        if ack is not None:
+            by_ack.setdefault(ack, []).append(arb)
+    for ack, alerts in by_ack.items():
+        try:
+            ack(alerts, delivered)
+        except Exception as e:
+            log.warning("⚠️ Alert acknowledgement failed: %s", e)
+
+
+_dispatcher = None
+
+
+def get_dispatcher():
+    """The process-wide dispatcher, configured from the environment."""
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = AlertDispatcher()
+    return _dispatcher
+
+
+if __name__ == "__main__":
+    configure()
+    # Smoke test: sends N synthetic alerts through the configured SMTP server
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    dispatcher = AlertDispatcher(batch_window=1)
+    for i in range(count):
+        dispatcher.submit({
+            "match": f"Test Home {i} vs Test Away {i}",
+            "market": "1X2",
+            "profit_percent": round(1 + i / 10, 2),
+            "odds": {"1": 2.1, "X": 3.6, "2": 4.2},
+            "books": {"1": "albbet", "X": "vox", "2": "vox"},
+            "stake_split": {"1": 48.5, "X": 28.3, "2": 23.2},
+        })
+    dispatcher.close()
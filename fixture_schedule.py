@@ -0,0 +1,142 @@
+"""
+Kickoff times and per-fixture refresh cadence.
+
+Both books show kickoffs in Albanian local time: vox as "21:00" or
+"18/10 21:00" on every list row, albbet as a time on each match under a
+date header. parse_kickoff() turns those into UTC datetimes, stored as
+'kickoff' on every odds document.
+
+A fixture's match page is re-read once its last read is older than
+refresh_interval(kickoff): every quarter of the base interval in the last
+hour, half of it within 6 hours, the base interval within a day and twice
+it for fixtures further away. FixtureSchedule applies that inside a crawl,
+so the orchestrator can rerun a book often for its next kickoffs while the
+fixtures days away are not re-opened on every run.
+"""
+import os
+import re
+from datetime import datetime, date, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from logs import get_logger
+
+log = get_logger("fixture_schedule")
+
+SITE_TIMEZONE = ZoneInfo(os.getenv("SITE_TIMEZONE", "Europe/Tirane"))
+BASE_INTERVAL = int(os.getenv("FIXTURE_BASE_INTERVAL", "600"))  # Seconds; the orchestrator passes its job interval
+STARTED_GRACE = timedelta(hours=3)  # A time-only kickoff this far in the past is read as tomorrow's
+
+# (minutes to kickoff, multiplier on the base interval); further away = 2x
+KICKOFF_CADENCE = [
+    (60, 0.25),
+    (6 * 60, 0.5),
+    (24 * 60, 1.0),
+]
+
+# "21:00", "18/10 21:00", "18.10.2026 21:00"
+KICKOFF_TEXT_RE = re.compile(r"(?:(\d{1,2})[./](\d{1,2})(?:[./](\d{2,4}))?\s+)?(\d{1,2}):(\d{2})")
+
+
+def parse_kickoff(text, day=None, now=None):
+    """
+    UTC kickoff from a site's local "HH:MM" text, optionally preceded by a
+    "dd/mm[/yyyy]" date; 'day' (a date, e.g. from a date header) wins over
+    the text's own date. None when the text holds no time.
+    """
+    match = KICKOFF_TEXT_RE.search(text or "")
+    if not match:
+        return None
+    local_now = (now or datetime.now(timezone.utc)).astimezone(SITE_TIMEZONE)
+    dd, mm, yyyy, hour, minute = match.groups()
+    try:
+        clock = time(int(hour), int(minute))
+        if day is not None:
+            kickoff = datetime.combine(day, clock, tzinfo=SITE_TIMEZONE)
+        elif dd:
+            year = int(yyyy) if yyyy else local_now.year
+            year += 2000 if year < 100 else 0
+            kickoff = datetime.combine(date(year, int(mm), int(dd)), clock, tzinfo=SITE_TIMEZONE)
+            if not yyyy and kickoff < local_now - timedelta(days=180):
+                kickoff = kickoff.replace(year=year + 1)  # "02/01" read in late December
+        else:
+            kickoff = datetime.combine(local_now.date(), clock, tzinfo=SITE_TIMEZONE)
+            if kickoff < local_now - STARTED_GRACE:
+                kickoff += timedelta(days=1)
+    except ValueError:
+        return None
+    return kickoff.astimezone(timezone.utc)
+
+
+def kickoff_from(value, now=None):
+    """Kickoff of any form a scraper reads: datetime, epoch seconds/milliseconds, ISO string or site text."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if isinstance(value, (int, float)):
+        if value > 1e11:
+            value /= 1000
+        return datetime.fromtimestamp(value, timezone.utc) if value > 1e9 else None
+    text = str(value).strip()
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        return parse_kickoff(text, now=now)
+    return parsed.astimezone(timezone.utc) if parsed.tzinfo else parsed.replace(tzinfo=SITE_TIMEZONE).astimezone(timezone.utc)
+
+
+def cadence_factor(minutes):
+    """Multiplier on a base refresh interval for a fixture 'minutes' from kickoff (None = unknown)."""
+    if minutes is None:
+        return 1.0  # Fixtures without kickoff times keep the base cadence
+    for horizon, multiplier in KICKOFF_CADENCE:
+        if minutes <= horizon:
+            return multiplier
+    return 2.0
+
+
+def refresh_interval(kickoff, base_interval=BASE_INTERVAL, now=None):
+    """Seconds between two reads of a fixture kicking off at 'kickoff'."""
+    kickoff = kickoff_from(kickoff)
+    if kickoff is None:
+        return base_interval * cadence_factor(None)
+    now = now or datetime.now(timezone.utc)
+    return base_interval * cadence_factor((kickoff - now).total_seconds() / 60)
+
+
+class FixtureSchedule:
+    """
+    Decides, fixture by fixture, whether a crawl has to open its match page.
+
+    The documents of the live collection are loaded once, by 'key_field'
+    (vox: kodi, albbet: fixture_key). carry() returns the previous document
+    of a fixture read less than refresh_interval(kickoff) ago, to go into the
+    new snapshot unchanged (odds and their original updated_at), and None
+    when the fixture is due.
+    """
+
+    def __init__(self, collection, key_field, base_interval=BASE_INTERVAL):
+        self.key_field = key_field
+        self.base_interval = base_interval
+        self.previous = {}
+        self.carried = 0
+        try:
+            for doc in collection.find({key_field: {"$ne": None}}, {"_id": 0}):
+                self.previous[doc[key_field]] = doc
+        except Exception as e:
+            log.warning("⚠️ Could not load previous fixtures, refreshing all of them: %s", e)
+
+    def carry(self, key, kickoff=None, now=None):
+        doc = self.previous.get(key)
+        if doc is None or doc.get("updated_at") is None:
+            return None
+        now = now or datetime.now(timezone.utc)
+        updated_at = kickoff_from(doc["updated_at"])
+        if (now - updated_at).total_seconds() >= refresh_interval(kickoff or doc.get("kickoff"), self.base_interval, now):
+            return None
+        self.carried += 1
+        return {**doc, "kickoff": kickoff or doc.get("kickoff")}
+
+    def report(self, book):
+        if self.carried:
+            log.info("🗓️ %s: %d fixtures not due yet, kept from the previous crawl.", book, self.carried)
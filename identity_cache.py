@@ -0,0 +1,174 @@
+import sqlite3
+import time
+import uuid
+from collections import defaultdict
+
+# Entries not used for this long are dropped, and the tables are capped at
+# MAX_ENTRIES rows each (least recently used rows go first).
+DEFAULT_TTL_SECONDS = 14 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 50000
+IDENTITY_CACHE_PATH = "identity_cache.sqlite"
+
+
+class EventIdentityCache:
+    """
+    Persistent mapping of (book, home, away, league) -> canonical event ID and
+    (book, raw team name) -> canonical team ID, stored in a local SQLite file.
+
+    The scanner joins both books on these IDs first and only fuzzy-matches the
+    documents that could not be resolved, then feeds new matches back in.
+    """
+
+    def __init__(self, path, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        self.conn = sqlite3.connect(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS events (
+                book TEXT, home TEXT, away TEXT, league TEXT,
+                event_id TEXT NOT NULL, last_used REAL NOT NULL,
+                PRIMARY KEY (book, home, away, league)
+            );
+            CREATE TABLE IF NOT EXISTS teams (
+                book TEXT, name TEXT,
+                team_id TEXT NOT NULL, last_used REAL NOT NULL,
+                PRIMARY KEY (book, name)
+            );
+            CREATE INDEX IF NOT EXISTS events_last_used ON events (last_used);
+            CREATE INDEX IF NOT EXISTS teams_last_used ON teams (last_used);
+        """)
+
+    @staticmethod
+    def _event_key(doc):
+        return doc["home"].strip().lower(), doc["away"].strip().lower(), doc["league"].strip().lower()
+
+    def _load(self, book):
+        events = {
+            (home, away, league): event_id
+            for home, away, league, event_id in self.conn.execute(
+                "SELECT home, away, league, event_id FROM events WHERE book = ?", (book,))
+        }
+        teams = dict(self.conn.execute("SELECT name, team_id FROM teams WHERE book = ?", (book,)))
+        return events, teams
+
+    def _resolve(self, doc, events, teams):
+        """Returns the join key for 'doc': its event ID, else its (home, away) team IDs, else None."""
+        home, away, league = self._event_key(doc)
+        event_id = events.get((home, away, league))
+        if event_id:
+            return ("event", event_id)
+        if home in teams and away in teams:
+            return ("teams", teams[home], teams[away])
+        return None
+
+    def event_ids(self, book, docs):
+        """Canonical event ID of each of 'docs' on 'book' (None for events never paired across books)."""
+        events, _ = self._load(book)
+        return [events.get(self._event_key(doc)) for doc in docs]
+
+    def canonical_event(self, home, away, league):
+        """Canonical event ID of an event as any book names it, or None."""
+        row = self.conn.execute(
+            "SELECT event_id FROM events WHERE home = ? AND away = ? AND league = ?",
+            self._event_key({"home": home, "away": away, "league": league})).fetchone()
+        return row[0] if row else None
+
+    def event_names(self, event_id):
+        """Every (home, away, league) a book lists canonical event 'event_id' under."""
+        return self.conn.execute(
+            "SELECT DISTINCT home, away, league FROM events WHERE event_id = ?", (event_id,)).fetchall()
+
+    def join(self, docs1, book1, docs2, book2):
+        """
+        Exact-hash join of two books on cached identities.
+        Returns (pairs, unresolved_docs1, unresolved_docs2).
+        """
+        events1, teams1 = self._load(book1)
+        events2, teams2 = self._load(book2)
+
+        index = defaultdict(list)
+        for doc in docs2:
+            key = self._resolve(doc, events2, teams2)
+            if key:
+                index[key].append(doc)
+
+        pairs = []
+        joined2 = set()
+        unresolved1 = []
+        for doc in docs1:
+            partners = index.get(self._resolve(doc, events1, teams1), [])
+            if not partners:
+                unresolved1.append(doc)
+                continue
+            for partner in partners:
+                pairs.append((doc, partner))
+                joined2.add(id(partner))
+        unresolved2 = [doc for doc in docs2 if id(doc) not in joined2]
+
+        self._touch(pairs, book1, book2)
+        return pairs, unresolved1, unresolved2
+
+    def _touch(self, pairs, book1, book2):
+        now = time.time()
+        event_rows = []
+        team_rows = []
+        for doc1, doc2 in pairs:
+            for book, doc in ((book1, doc1), (book2, doc2)):
+                event_rows.append((now, book) + self._event_key(doc))
+                team_rows.append((now, book, doc["home"].strip().lower()))
+                team_rows.append((now, book, doc["away"].strip().lower()))
+        self.conn.executemany(
+            "UPDATE events SET last_used = ? WHERE book = ? AND home = ? AND away = ? AND league = ?", event_rows)
+        self.conn.executemany("UPDATE teams SET last_used = ? WHERE book = ? AND name = ?", team_rows)
+        self.conn.commit()
+
+    def _event_id(self, book1, key1, book2, key2):
+        """Canonical event ID shared by key1 on book1 and key2 on book2 (reused if either is known)."""
+        for book, key in ((book1, key1), (book2, key2)):
+            row = self.conn.execute(
+                "SELECT event_id FROM events WHERE book = ? AND home = ? AND away = ? AND league = ?",
+                (book,) + key).fetchone()
+            if row:
+                return row[0]
+        return uuid.uuid4().hex
+
+    def _team_id(self, book1, name1, book2, name2):
+        """Canonical team ID shared by name1 on book1 and name2 on book2 (reused if either is known)."""
+        for book, name in ((book1, name1), (book2, name2)):
+            row = self.conn.execute(
+                "SELECT team_id FROM teams WHERE book = ? AND name = ?", (book, name)).fetchone()
+            if row:
+                return row[0]
+        return uuid.uuid4().hex
+
+    def remember_pairs(self, pairs, book1, book2):
+        """Stores canonical event and team IDs for newly fuzzy-matched pairs."""
+        now = time.time()
+        for doc1, doc2 in pairs:
+            key1, key2 = self._event_key(doc1), self._event_key(doc2)
+            event_id = self._event_id(book1, key1, book2, key2)
+
+            self.conn.execute("INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?)",
+                              (book1,) + key1 + (event_id, now))
+            self.conn.execute("INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?)",
+                              (book2,) + key2 + (event_id, now))
+
+            for name1, name2 in ((key1[0], key2[0]), (key1[1], key2[1])):
+                team_id = self._team_id(book1, name1, book2, name2)
+                self.conn.execute("INSERT OR REPLACE INTO teams VALUES (?, ?, ?, ?)", (book1, name1, team_id, now))
+                self.conn.execute("INSERT OR REPLACE INTO teams VALUES (?, ?, ?, ?)", (book2, name2, team_id, now))
+        self.conn.commit()
+
+    def evict(self):
+        """Drops entries past their TTL, then trims each table to the newest max_entries rows."""
+        cutoff = time.time() - self.ttl_seconds
+        for table in ("events", "teams"):
+            self.conn.execute(f"DELETE FROM {table} WHERE last_used < ?", (cutoff,))
+            self.conn.execute(
+                f"DELETE FROM {table} WHERE rowid IN ("
+                f"SELECT rowid FROM {table} ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
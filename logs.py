@@ -0,0 +1,108 @@
+"""
+Leveled logging for the scrapers, the scanner and the orchestrator.
+
+Messages use logging's lazy %-style arguments, so a disabled level costs a
+level check and nothing else, even inside the scanner's N x M loops.
+Per-pair messages go through a sampled logger that only lets one in
+LOG_SAMPLE_EVERY records of each message through.
+
+    LOG_LEVEL=DEBUG python arbitrage_scanner.py      # everything, incl. sampled per-pair checks
+    LOG_FORMAT=json python arbitrage_scanner.py      # one JSON object per line, for production
+
+Every script calls configure() in its __main__ block; importing a module
+only creates its loggers.
+"""
+import json
+import logging
+import os
+import sys
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # "text" or "json"
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", "1000"))
+TEXT_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+
+_level = LOG_LEVEL
+_loggers = set()  # Top-level logger names handed out by get_logger
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, msg, plus exc when there is a traceback."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SampleFilter(logging.Filter):
+    """
+    Lets the first record and then every 'every'-th record of each message
+    template through; passed records note how many were seen so far.
+    """
+
+    def __init__(self, every=LOG_SAMPLE_EVERY):
+        super().__init__()
+        self.every = max(1, every)
+        self.seen = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        with self.lock:
+            count = self.seen[record.msg]
+            self.seen[record.msg] = count + 1
+        if count % self.every:
+            return False
+        if self.every > 1 and isinstance(record.args, tuple):
+            record.msg = f"{record.msg} [%d seen, 1 in %d logged]"
+            record.args = record.args + (count + 1, self.every)
+        return True
+
+
+def configure(level=LOG_LEVEL, fmt=LOG_FORMAT, stream=None):
+    """
+    Sets up the root handler (stdout, like the prints it replaces). The root
+    stays at WARNING so third-party loggers (pymongo, selenium) stay quiet;
+    'level' applies to the loggers handed out by get_logger.
+    """
+    global _level
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(JsonLinesFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+    root = logging.getLogger()
+    for old in list(root.handlers):
+        root.removeHandler(old)
+    root.addHandler(handler)
+    root.setLevel(logging.WARNING)
+    for name in _loggers:
+        logging.getLogger(name).setLevel(level)
+    _level = level
+
+
+def get_logger(name):
+    """
+    Logger at the configured level; dotted names (e.g. 'arbitrage_scanner.pairs')
+    inherit their parent's. Never touches handlers: importing a module keeps
+    the host application's logging setup, and only entry points call configure().
+    """
+    logger = logging.getLogger(name)
+    if "." not in name and name not in _loggers:
+        logger.setLevel(_level)
+        _loggers.add(name)
+    return logger
+
+
+def sampled_logger(name, every=LOG_SAMPLE_EVERY):
+    """Logger for per-pair / per-row messages: one in 'every' records per message gets through."""
+    logger = get_logger(name)
+    if not any(isinstance(f, SampleFilter) for f in logger.filters):
+        logger.addFilter(SampleFilter(every))
+    return logger
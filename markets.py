@@ -0,0 +1,90 @@
+import numpy as np
+
+# Markets shared by the scanner, the scrapers and the odds history store
+
+# Football market groups
+MARKETS = [
+    ("1", "1"),
+    ("X", "X"),
+    ("2", "2"),
+    ("DC_1X", "DC_1X"),
+    ("DC_12", "DC_12"),
+    ("DC_X2", "DC_X2"),
+    ("BTTS_Yes", "BTTS_Yes"),
+    ("BTTS_No", "BTTS_No"),
+    ("Over_2.5", "Over_2.5"),
+    ("Under_2.5", "Under_2.5"),
+]
+
+TWO_WAY_COMBOS = [
+    ("DC_1X", "2"),
+    ("DC_12", "X"),
+    ("DC_X2", "1"),
+    ("BTTS_Yes", "BTTS_No"),
+    ("Over_2.5", "Under_2.5")
+]
+
+# Football combos: each one covers every outcome of its market
+ARBITRAGE_COMBOS = [
+    ["1", "X", "2"],
+    ["DC_1X", "DC_12", "DC_X2"],
+] + [[k1, k2] for k1, k2 in TWO_WAY_COMBOS]
+
+# Sport registry: the markets each sport's documents carry and the combos
+# that cover all of its outcomes. A "1"/"2" pair is only an arbitrage where
+# there is no draw. Adding a sport is one entry here plus its collections in
+# arbitrage_scanner.SPORT_COLLECTIONS.
+DEFAULT_SPORT = "football"  # Documents without a 'sport' field
+SPORTS = {
+    "football": {"markets": [key for key, _ in MARKETS], "combos": ARBITRAGE_COMBOS},
+    "basketball": {"markets": ["1", "2"], "combos": [["1", "2"]]},  # Moneyline incl. overtime
+    "tennis": {"markets": ["1", "2"], "combos": [["1", "2"]]},
+}
+
+# Column layout of the best-odds matrix (markets of all sports) and every
+# combo checked per event; COMBO_MASK[sport, combo] says which apply to a sport
+MARKET_KEYS = list(dict.fromkeys(key for sport in SPORTS.values() for key in sport["markets"]))
+MARKET_INDEX = {key: col for col, key in enumerate(MARKET_KEYS)}
+ALL_COMBOS = [list(combo) for combo in dict.fromkeys(
+    tuple(combo) for sport in SPORTS.values() for combo in sport["combos"])]
+SPORT_INDEX = {sport: row for row, sport in enumerate(SPORTS)}
+COMBO_MASK = np.array([
+    [combo in sport["combos"] for combo in ALL_COMBOS]
+    for sport in SPORTS.values()
+])
+
+
+def parse_odd(value):
+    """Scraped price text ('2.10', '2,10', '', None) -> float, or None when there is no price."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if value == value else None  # NaN -> None
+    value = value.strip().replace(",", ".")
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def normalize_odds(odds):
+    """Parses every price of a scraped 'odds' dict once, at ingest, so Mongo stores real numbers."""
+    return {key: parse_odd(value) for key, value in odds.items()}
+
+
+def odds_row(odds):
+    """
+    Float row in MARKET_KEYS order (NaN = missing) from a normalized 'odds' dict.
+    None converts to NaN in the array constructor, so there is no per-value parsing.
+    """
+    return np.array([odds.get(key) for key in MARKET_KEYS], dtype=float)
+
+
+def odds_matrix(odds_list):
+    """
+    odds_row of every dict in 'odds_list' (None = a missing row, all NaN) with
+    a single array conversion. Raises TypeError/ValueError on untyped prices.
+    """
+    missing = [None] * len(MARKET_KEYS)
+    rows = [missing if odds is None else list(map(odds.get, MARKET_KEYS)) for odds in odds_list]
+    return np.array(rows, dtype=float).reshape(len(rows), len(MARKET_KEYS))
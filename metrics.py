@@ -0,0 +1,252 @@
+"""
+Counters, gauges and histograms shared by the scrapers and the scanner,
+exposed in the Prometheus text format.
+
+Each process keeps its own registry. Set METRICS_PORT to serve it on
+http://127.0.0.1:<port>/metrics while the process runs; every run also
+writes it to METRICS_DIR/<job>_<timestamp>.prom when it finishes (dump()).
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from logs import get_logger
+
+log = get_logger("metrics")
+
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # 0 = no HTTP endpoint
+METRICS_DIR = "metrics"
+
+# Seconds; covers both sub-second DOM waits and multi-minute crawls/scans
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_str(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in list(zip(names, values)) + list(extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, doc, labels=()):
+        self.name = name
+        self.doc = doc
+        self.label_names = tuple(labels)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} takes labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.label_names)
+
+    def samples(self):
+        """(suffix, label string, value) for every series."""
+        with self.lock:
+            return [("", _label_str(self.label_names, key), value) for key, value in sorted(self.values.items())]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        lines += [f"{self.name}{suffix}{labels} {_number(value)}" for suffix, labels, value in self.samples()]
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, doc, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, doc, labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            counts, total = self.values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self.values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observes how long the 'with' block took."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        samples = []
+        with self.lock:
+            for key, (counts, total) in sorted(self.values.items()):
+                for bound, count in zip(self.buckets, counts):
+                    samples.append(("_bucket", _label_str(self.label_names, key, [("le", _number(bound))]), count))
+                samples.append(("_sum", _label_str(self.label_names, key), total))
+                samples.append(("_count", _label_str(self.label_names, key), counts[-1]))
+        return samples
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def _get(self, cls, name, doc, labels, **kwargs):
+        with self.lock:
+            if name not in self.metrics:
+                self.metrics[name] = cls(name, doc, labels, **kwargs)
+            metric = self.metrics[name]
+        if not isinstance(metric, cls):
+            raise ValueError(f"{name} is already registered as a {metric.kind}")
+        return metric
+
+    def counter(self, name, doc, labels=()):
+        return self._get(Counter, name, doc, labels)
+
+    def gauge(self, name, doc, labels=()):
+        return self._get(Gauge, name, doc, labels)
+
+    def histogram(self, name, doc, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, doc, labels, buckets=buckets)
+
+    def render(self):
+        with self.lock:
+            metrics = list(self.metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# === SHARED METRICS ===
+
+# Scrapers
+WAIT_SECONDS = REGISTRY.histogram(
+    "scraper_wait_seconds", "Time spent in named page waits (page loads, settles, back navigation).",
+    ["site", "wait"])
+WAIT_TIMEOUTS = REGISTRY.counter(
+    "scraper_wait_timeouts_total", "Named page waits that hit their timeout.", ["site", "wait"])
+CLICK_RETRIES = REGISTRY.counter(
+    "scraper_click_retries_total", "Clicks that needed a fallback method.", ["site", "method"])
+GO_BACK_FAILURES = REGISTRY.counter(
+    "scraper_go_back_failures_total", "Back navigations that did not reach the expected page.", ["site", "level"])
+MATCHES_SCRAPED = REGISTRY.counter(
+    "scraper_matches_total", "Match documents produced.", ["site", "sport"])
+MATCH_ERRORS = REGISTRY.counter(
+    "scraper_match_errors_total", "Matches that could not be opened or read.", ["site", "sport"])
+CRAWL_SECONDS = REGISTRY.gauge(
+    "scraper_crawl_duration_seconds", "Wall time of the last crawl.", ["site", "sport"])
+MATCHES_PER_MINUTE = REGISTRY.gauge(
+    "scraper_matches_per_minute", "Throughput of the last crawl.", ["site", "sport"])
+
+# Scanner
+SCAN_STAGE_SECONDS = REGISTRY.histogram(
+    "scanner_stage_seconds", "Time per scan stage.", ["stage"])
+SCAN_PAIRS_CHECKED = REGISTRY.gauge(
+    "scanner_pairs_checked", "Fuzzy pairs scored in the last scan.")
+SCAN_EVENTS = REGISTRY.gauge(
+    "scanner_events_matched", "Events offered by at least two books in the last scan.")
+SCAN_ARBITRAGES = REGISTRY.gauge(
+    "scanner_arbitrages_found", "Arbitrage opportunities found by the last scan.")
+
+# Stream scanner
+STREAM_UPDATES = REGISTRY.counter(
+    "stream_updates_total", "Match documents received from the odds stream.", ["book", "sport"])
+STREAM_ALERT_LATENCY = REGISTRY.histogram(
+    "stream_alert_latency_seconds", "Odds captured by a scraper -> arbitrage reported.", ["sport"])
+
+# E-mail alerts
+ALERTS_QUEUED = REGISTRY.counter(
+    "alerts_queued_total", "Arbitrage alerts handed to the e-mail dispatcher.")
+ALERTS_DROPPED = REGISTRY.counter(
+    "alerts_dropped_total", "Alerts dropped because the dispatcher queue was full.")
+ALERTS_SENT = REGISTRY.counter(
+    "alerts_sent_total", "Alerts delivered to the SMTP server.")
+ALERT_EMAILS = REGISTRY.counter(
+    "alert_emails_total", "E-mail send attempts by outcome (sent, retried, failed).", ["status"])
+ALERT_QUEUE_DEPTH = REGISTRY.gauge(
+    "alert_queue_depth", "Alerts waiting in the dispatcher queue.")
+
+
+def record_crawl(site, sport, matches, seconds):
+    """Sets the per-crawl gauges once a crawl is done."""
+    CRAWL_SECONDS.set(round(seconds, 3), site=site, sport=sport)
+    MATCHES_PER_MINUTE.set(round(matches / seconds * 60, 2) if seconds else 0, site=site, sport=sport)
+
+
+# === EXPOSITION ===
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_http_server(port=METRICS_PORT):
+    """Serves /metrics on 127.0.0.1:'port' from a daemon thread; returns the server (None when off)."""
+    if not port:
+        return None
+    try:
+        server = ThreadingHTTPServer(("127.0.0.1", port), _MetricsHandler)
+    except OSError as e:
+        log.warning("⚠️ Metrics endpoint not started on port %s: %s", port, e)
+        return None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    log.info("📈 Metrics on http://127.0.0.1:%s/metrics", port)
+    return server
+
+
+def dump(job, directory=METRICS_DIR):
+    """Writes the current registry to <directory>/<job>_<timestamp>.prom and returns the path."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{job}_{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}.prom")
+    with open(path, "w") as f:
+        f.write(REGISTRY.render())
+    return path
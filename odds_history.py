@@ -0,0 +1,169 @@
+import hashlib
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timezone, timedelta
+
+import numpy as np
+
+from identity_cache import EventIdentityCache, IDENTITY_CACHE_PATH
+from logs import get_logger
+from markets import MARKET_KEYS, parse_odd
+
+log = get_logger("odds_history")
+
+ODDS_HISTORY_DIR = "odds_history"
+
+# One fixed-size record per (event, book, market) price seen: 24 bytes instead of a Mongo document
+RECORD_DTYPE = np.dtype([
+    ("ts", "<i8"),  # Unix seconds (UTC)
+    ("event", "<u8"),  # event_id(home, away, league, canonical ID)
+    ("book", "<u2"),  # Index into BOOKS
+    ("market", "<u2"),  # Index into MARKET_KEYS
+    ("odds", "<f4"),
+])
+
+# Append-only: new books go at the end so stored codes keep their meaning
+BOOKS = ["albbet", "vox"]
+
+
+def event_id(home, away, league, canonical=None):
+    """
+    Stable 64-bit ID of an event: from its canonical identity cache ID once
+    the scanner has paired it across books (the same on every book), else a
+    hash of the names as this book writes them.
+    """
+    if canonical:
+        return int(canonical[:16], 16)
+    key = "|".join(part.strip().lower() for part in (home, away, league))
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+
+
+def _timestamp(value):
+    if value is None:
+        return int(datetime.now(timezone.utc).timestamp())
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+class OddsHistory:
+    """
+    Columnar odds history as one append-only binary file of RECORD_DTYPE per
+    UTC day. Range queries memory-map only the day files they cover and filter
+    them column-wise, so the full history is never loaded into memory.
+    """
+
+    def __init__(self, directory=ODDS_HISTORY_DIR, identity_path=IDENTITY_CACHE_PATH):
+        self.directory = directory
+        self.identity_path = identity_path  # None: always key events by their names
+        os.makedirs(directory, exist_ok=True)
+
+    def _identities(self):
+        # Opened per call: the scanner writes the cache from another process
+        return closing(EventIdentityCache(self.identity_path))
+
+    def _canonical_ids(self, book, docs):
+        if self.identity_path and os.path.exists(self.identity_path):
+            try:
+                with self._identities() as identities:
+                    return identities.event_ids(book, docs)
+            except sqlite3.Error as e:
+                log.warning("⚠️ Identity cache unavailable, keying events by name: %s", e)
+        return [None] * len(docs)
+
+    def event_ids(self, home, away, league):
+        """
+        History IDs of one event: its canonical ID and the name hashes of every
+        book's naming of it (records written before it was first paired).
+        """
+        ids = {event_id(home, away, league)}
+        if self.identity_path and os.path.exists(self.identity_path):
+            with self._identities() as identities:
+                canonical = identities.canonical_event(home, away, league)
+                if canonical:
+                    ids.add(event_id(home, away, league, canonical))
+                    ids.update(event_id(*names) for names in identities.event_names(canonical))
+        return sorted(ids)
+
+    def _path(self, day):
+        return os.path.join(self.directory, f"{day.strftime('%Y-%m-%d')}.bin")
+
+    def append(self, book, docs):
+        """Appends every numeric price of 'docs' (scraper documents) for 'book'."""
+        book_code = BOOKS.index(book)
+        rows = []
+        for doc, canonical in zip(docs, self._canonical_ids(book, docs)):
+            ts = _timestamp(doc.get("updated_at"))
+            ev = event_id(doc["home"], doc["away"], doc["league"], canonical)
+            for market, value in doc["odds"].items():
+                if market not in MARKET_KEYS:
+                    continue
+                odds = parse_odd(value)
+                if odds is not None and odds > 1:
+                    rows.append((ts, ev, book_code, MARKET_KEYS.index(market), odds))
+        if not rows:
+            return 0
+
+        records = np.array(rows, dtype=RECORD_DTYPE)
+        days = records["ts"] // 86400
+        for day in np.unique(days):
+            path = self._path(datetime.fromtimestamp(int(day) * 86400, timezone.utc))
+            with open(path, "ab") as f:
+                records[days == day].tofile(f)
+        return len(records)
+
+    def query(self, since, until=None, event=None, book=None, markets=None):
+        """
+        Records with since <= ts < until, optionally for one event (an ID or a
+        list of IDs), one book and a list of markets, sorted by time.
+        """
+        until = until or datetime.now(timezone.utc)
+        since_ts, until_ts = _timestamp(since), _timestamp(until)
+        market_codes = [MARKET_KEYS.index(m) for m in markets] if markets else None
+
+        parts = []
+        day = datetime.fromtimestamp(since_ts - since_ts % 86400, timezone.utc)
+        while _timestamp(day) < until_ts:
+            path = self._path(day)
+            day += timedelta(days=1)
+            if not os.path.exists(path) or not os.path.getsize(path):
+                continue
+            data = np.memmap(path, dtype=RECORD_DTYPE, mode="r")
+            mask = (data["ts"] >= since_ts) & (data["ts"] < until_ts)
+            if event is not None:
+                mask &= np.isin(data["event"], np.atleast_1d(np.asarray(event, dtype=np.uint64)))
+            if book is not None:
+                mask &= data["book"] == BOOKS.index(book)
+            if market_codes is not None:
+                mask &= np.isin(data["market"], market_codes)
+            parts.append(np.array(data[mask]))
+
+        if not parts:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        records = np.concatenate(parts)
+        return records[np.argsort(records["ts"], kind="stable")]
+
+    def line_moves(self, home, away, league, markets=("1", "X", "2"), last=timedelta(hours=1)):
+        """
+        Price changes of one event over the 'last' period, e.g. all 1X2 moves in the
+        last hour: only records whose price differs from the previous one for the
+        same book and market are kept. Once the event is paired, every book's
+        prices are found whichever book's names are passed.
+        """
+        records = self.query(datetime.now(timezone.utc) - last, event=self.event_ids(home, away, league),
+                             markets=list(markets))
+        moves = []
+        last_price = {}
+        for rec in records:
+            key = (int(rec["book"]), int(rec["market"]))
+            price = float(rec["odds"])
+            if last_price.get(key) != price:
+                moves.append({
+                    "time": datetime.fromtimestamp(int(rec["ts"]), timezone.utc),
+                    "book": BOOKS[key[0]],
+                    "market": MARKET_KEYS[key[1]],
+                    "odds": round(price, 3),
+                })
+                last_price[key] = price
+        return moves
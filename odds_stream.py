@@ -0,0 +1,257 @@
+"""
+Streaming scrape-to-scan pipeline.
+
+Scrapers publish every match document as soon as it is read (publish()) as
+one JSON line on a local Unix socket. The stream scanner listens on that
+socket, keeps an in-memory event book per sport ({book: latest doc}
+clusters, paired with the same code as the batch scanner) and re-runs the
+arbitrage checks for an event the moment any of its books updates it, instead
+of after both crawls have finished.
+
+    python odds_stream.py      # run next to the scrapers
+
+Publishing is best effort: when no stream scanner is listening the scrapers
+carry on and retry the connection every RECONNECT_INTERVAL seconds.
+Alert latency (odds captured by the scraper -> arbitrage reported) is logged
+per alert and exported as stream_alert_latency_seconds.
+
+Pairing and evaluation run on one worker thread, so the event loop keeps
+reading every connection while an update is scored, and the event book is
+only ever touched by that thread.
+"""
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import email_alert
+import metrics
+from fixture_schedule import kickoff_from
+from logs import configure, get_logger
+from markets import SPORTS, DEFAULT_SPORT
+
+log = get_logger("odds_stream")
+
+ODDS_STREAM_SOCKET = os.getenv("ODDS_STREAM_SOCKET", "/tmp/arbitrage_odds.sock")
+RECONNECT_INTERVAL = 30
+SEND_TIMEOUT = 1.0
+STALE_EVENT_AGE = 6 * 3600  # Events without updates for this long are dropped from memory
+SWEEP_EVERY = 500  # Messages between stale-event sweeps
+STREAM_FIELDS = ("home", "away", "league", "sport", "kickoff", "odds", "updated_at")
+
+
+# === PUBLISHING (scrapers) ===
+
+class OddsPublisher:
+    """Sends match documents to the stream scanner; never raises into the crawl."""
+
+    def __init__(self, path=ODDS_STREAM_SOCKET):
+        self.path = path
+        self.sock = None
+        self.next_attempt = 0.0
+        self.lock = threading.Lock()
+
+    def _connect(self):
+        if time.time() < self.next_attempt:
+            return False
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(SEND_TIMEOUT)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            self.next_attempt = time.time() + RECONNECT_INTERVAL
+            return False
+        self.sock = sock
+        log.info("📡 Streaming odds to %s", self.path)
+        return True
+
+    def publish(self, book, doc):
+        updated_at = doc.get("updated_at")
+        message = {
+            "book": book,
+            "captured_at": updated_at.timestamp() if isinstance(updated_at, datetime) else time.time(),
+            "doc": {field: doc.get(field) for field in STREAM_FIELDS},
+        }
+        line = (json.dumps(message, default=str) + "\n").encode()
+        with self.lock:
+            if self.sock is None and not self._connect():
+                return False
+            try:
+                self.sock.sendall(line)
+            except OSError as e:
+                log.warning("⚠️ Odds stream disconnected: %s", e)
+                self.sock.close()
+                self.sock = None
+                self.next_attempt = time.time() + RECONNECT_INTERVAL
+                return False
+        return True
+
+
+_publisher = None
+
+
+def publish(book, doc):
+    """Publishes one scraped match document of 'book' (albbet, vox) to the stream scanner."""
+    global _publisher
+    if _publisher is None:
+        _publisher = OddsPublisher()
+    return _publisher.publish(book, doc)
+
+
+# === STREAM SCANNER ===
+
+class StreamScanner:
+    """
+    In-memory event book fed by the odds stream. Every update re-evaluates
+    only the event it belongs to; an event is reported again only when its
+    set of arbitrage opportunities changes.
+    """
+
+    def __init__(self, books=None, dispatcher=None, store=None):
+        import arbitrage_scanner as scanner  # Heavy imports only where the scanner runs
+
+        self.scanner = scanner
+        self.books = books or scanner.scan_books()
+        self.sports = set(scanner.scanned_sports())
+        self.dispatcher = dispatcher  # email_alert.AlertDispatcher, or None to only log alerts
+        self.store = store  # alert_store.AlertStore shared with the batch scanner, or None
+        self.clusters = defaultdict(list)  # sport -> [{book: doc}]
+        self.doc_clusters = {}  # (sport, book, doc_key) -> cluster
+        self.updated = {}  # id(cluster) -> last update time
+        self.reported = {}  # id(cluster) -> last reported opportunities
+        self.alerts = []
+        self.messages = 0
+        # One thread: updates stay in arrival order and never run concurrently
+        self.worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stream-scanner")
+
+    def _index(self, sport, cluster):
+        for book, doc in cluster.items():
+            self.doc_clusters[(sport, book, self.scanner.doc_key(doc))] = cluster
+        self.updated[id(cluster)] = time.time()
+
+    @staticmethod
+    def _signature(results):
+        return frozenset((arb["market"], arb["profit_percent"]) for arb in results)
+
+    def seed(self):
+        """Starts from the last complete crawls in Mongo; what they already contain is not re-reported."""
+        for sport, collections in self.scanner.scanned_sports().items():
+            book_docs = {book: list(collection.find()) for book, collection in collections.items()}
+            clusters, _ = self.scanner.cluster_events(book_docs)
+            self.clusters[sport] = clusters
+            for cluster in clusters:
+                self._index(sport, cluster)
+                if len(cluster) >= 2:
+                    results = self.scanner.evaluate_events([cluster], self.books, [sport])
+                    self.reported[id(cluster)] = self._signature(results)
+            log.info("🌱 Seeded %d %s events from Mongo.", len(clusters), sport)
+
+    def update(self, book, doc, captured_at):
+        """Applies one published document and returns the new arbitrage opportunities of its event."""
+        sport = doc.get("sport") or DEFAULT_SPORT
+        if sport not in SPORTS:
+            log.warning("⚠️ Ignoring %s document of unknown sport %r", book, sport)
+            return []
+        if sport not in self.sports:
+            return []  # Only one book scrapes it: nothing to pair with
+        metrics.STREAM_UPDATES.inc(book=book, sport=sport)
+        doc["kickoff"] = kickoff_from(doc.get("kickoff"))  # Sent as text; the alert store expires alerts at kickoff
+        cluster = self.doc_clusters.get((sport, book, self.scanner.doc_key(doc)))
+        if cluster is not None:
+            cluster[book] = doc
+        else:
+            touched, _ = self.scanner.add_book_to_clusters(self.clusters[sport], book, [doc])
+            cluster = touched[0]  # The event it joined, or its own new one
+        self._index(sport, cluster)
+
+        self.messages += 1
+        if self.messages % SWEEP_EVERY == 0:
+            self.sweep()
+
+        if len(cluster) < 2:
+            return []
+        results = self.scanner.evaluate_events([cluster], self.books, [sport])
+        signature = self._signature(results)
+        if signature == self.reported.get(id(cluster)):
+            return []
+        self.reported[id(cluster)] = signature
+
+        latency = time.time() - captured_at
+        for arb in results:
+            metrics.STREAM_ALERT_LATENCY.observe(latency, sport=sport)
+            log.info("⚡ %s: %s +%.2f%% (%.1fs after the odds were captured)",
+                     arb["match"], arb["market"], arb["profit_percent"], latency)
+        self.alerts.extend(results)
+        if self.dispatcher is not None:
+            if self.store is not None:
+                # Same de-duplication as the batch scanner: nothing it (or an earlier run) already e-mailed
+                self.dispatcher.submit_many(self.store.filter(results), ack=self.store.acknowledge)
+            else:
+                self.dispatcher.submit_many(results)
+        return results
+
+    def sweep(self, max_age=STALE_EVENT_AGE):
+        """Drops events nobody has updated for 'max_age' seconds (finished or delisted matches)."""
+        cutoff = time.time() - max_age
+        for sport, clusters in self.clusters.items():
+            stale = [cluster for cluster in clusters if self.updated.get(id(cluster), 0) < cutoff]
+            if not stale:
+                continue
+            stale_ids = {id(cluster) for cluster in stale}
+            self.clusters[sport] = [cluster for cluster in clusters if id(cluster) not in stale_ids]
+            self.doc_clusters = {key: c for key, c in self.doc_clusters.items() if id(c) not in stale_ids}
+            for cluster_id in stale_ids:
+                self.updated.pop(cluster_id, None)
+                self.reported.pop(cluster_id, None)
+            log.info("🧹 Dropped %d stale %s events.", len(stale), sport)
+
+    def _apply(self, line):
+        try:
+            message = json.loads(line)
+            self.update(message["book"], message["doc"], message["captured_at"])
+        except Exception as e:
+            log.warning("⚠️ Bad stream message: %s", e)
+
+    async def _handle(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        while line := await reader.readline():
+            await loop.run_in_executor(self.worker, self._apply, line)
+        writer.close()
+
+    async def serve(self, path=ODDS_STREAM_SOCKET):
+        if os.path.exists(path):
+            os.unlink(path)
+        server = await asyncio.start_unix_server(self._handle, path)
+        log.info("📡 Listening for odds on %s", path)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.worker.shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    configure()
+    import arbitrage_scanner
+
+    metrics.start_http_server()
+    stream_scanner = StreamScanner(dispatcher=email_alert.get_dispatcher(), store=arbitrage_scanner.get_alert_store())
+    try:
+        stream_scanner.seed()
+    except Exception as e:
+        log.warning("⚠️ Could not seed from Mongo, starting empty: %s", e)
+    try:
+        asyncio.run(stream_scanner.serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stream_scanner.dispatcher.close()
+        if stream_scanner.store is not None:
+            stream_scanner.store.close()
+        log.info("📈 Metrics written to %s", metrics.dump("odds_stream"))
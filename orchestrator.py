@@ -0,0 +1,209 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import schedule
+from pymongo import MongoClient
+
+from candidate_join import prepare_collections
+from fixture_schedule import cadence_factor
+from logs import configure, get_logger
+
+log = get_logger("orchestrator")
+
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+
+MAX_CONCURRENT_SCRAPERS = 2  # Crawler budget: browsers running at the same time
+MIN_INTERVAL = 60  # Never rerun a job more often than this (seconds)
+STATUS_INTERVAL = 30
+STATUS_PATH = "orchestrator_status.json"
+
+
+class Job:
+    def __init__(self, name, script, base_interval, collection=None, scraper=True):
+        self.name = name
+        self.script = script
+        self.base_interval = base_interval
+        self.collection = collection
+        self.scraper = scraper
+        self.interval = base_interval
+        self.due_at = None  # When the current/queued run became due
+        self.running = False
+        self.pending = False  # Became due again while running; runs once afterwards
+        self.coalesced = 0
+        self.last_started = None
+        self.last_duration = None
+        self.last_lag = None
+        self.last_exit_code = None
+        self.schedule_job = None
+        self.needs_reschedule = False
+
+
+JOBS = [
+    Job("albbet_football", "albbet_football_scraper.py", 15 * 60, "football_odds_albbet"),
+    Job("vox_football", "vox_football_scraper.py", 10 * 60, "football_odds_vox"),
+    Job("vox_basketball", "vox_basketball_scraper.py", 10 * 60, "basketball_odds_vox"),
+    Job("vox_tennis", "vox_tennis_scraper.py", 10 * 60, "tennis_odds_vox"),
+    Job("scanner", "arbitrage_scanner.py", 60, scraper=False),
+]
+
+
+class Orchestrator:
+    """
+    Long-running replacement for running each scraper and the scanner by hand.
+
+    Every job reruns on its own cadence, which tightens as its book's next
+    kickoff gets closer (fixture_schedule.KICKOFF_CADENCE). Scrapers get the
+    job's base interval as FIXTURE_BASE_INTERVAL and only re-open the match
+    pages of fixtures that are due by the same table, so frequent runs for
+    an imminent kickoff stay cheap. Runs that become due while the job is still running
+    are coalesced into one follow-up run, scrapers share a fixed concurrency
+    budget (earliest-due first), and the scanner is also kicked after every
+    finished crawl. Queue and lag are printed and written to STATUS_PATH.
+    """
+
+    def __init__(self, jobs=JOBS, mongo_uri=MONGO_URI):
+        self.jobs = {job.name: job for job in jobs}
+        self.db = MongoClient(mongo_uri)["arbitrage_db"]
+        self.queue = []  # Jobs due but waiting for a free slot
+        self.lock = threading.Lock()
+
+    def next_kickoff_minutes(self, job):
+        """Minutes until the earliest upcoming kickoff in the job's collection (None if unknown)."""
+        if not job.collection:
+            return None
+        try:
+            doc = self.db[job.collection].find_one(
+                {"kickoff": {"$gte": datetime.now(timezone.utc)}},
+                projection={"kickoff": 1},
+                sort=[("kickoff", 1)],
+            )
+        except Exception as e:
+            log.warning("⚠️ Could not read kickoffs for %s: %s", job.name, e)
+            return None
+        if not doc:
+            return None
+        kickoff = doc["kickoff"]
+        if kickoff.tzinfo is None:
+            kickoff = kickoff.replace(tzinfo=timezone.utc)
+        return (kickoff - datetime.now(timezone.utc)).total_seconds() / 60
+
+    def interval_for(self, job):
+        return max(MIN_INTERVAL, int(job.base_interval * cadence_factor(self.next_kickoff_minutes(job))))
+
+    def reschedule(self, job):
+        interval = self.interval_for(job)
+        if job.schedule_job is not None and interval == job.interval:
+            return
+        if job.schedule_job is not None:
+            schedule.cancel_job(job.schedule_job)
+        job.interval = interval
+        job.schedule_job = schedule.every(interval).seconds.do(self.trigger, job.name)
+
+    def trigger(self, name):
+        """Marks a job as due; overlapping triggers collapse into a single pending run."""
+        with self.lock:
+            job = self.jobs[name]
+            if job.running:
+                if job.pending:
+                    job.coalesced += 1
+                job.pending = True
+                return
+            if job in self.queue:
+                job.coalesced += 1
+                return
+            job.due_at = time.time()
+            self.queue.append(job)
+
+    def dispatch(self):
+        with self.lock:
+            self.queue.sort(key=lambda j: j.due_at)
+            running_scrapers = sum(1 for j in self.jobs.values() if j.running and j.scraper)
+            for job in list(self.queue):
+                if job.scraper and running_scrapers >= MAX_CONCURRENT_SCRAPERS:
+                    continue
+                self.queue.remove(job)
+                job.running = True
+                if job.scraper:
+                    running_scrapers += 1
+                threading.Thread(target=self.run_job, args=(job,), daemon=True).start()
+
+    def run_job(self, job):
+        job.last_started = time.time()
+        job.last_lag = job.last_started - job.due_at
+        log.info("▶️ Starting %s (lag %.1fs)", job.name, job.last_lag)
+        try:
+            env = {**os.environ, "FIXTURE_BASE_INTERVAL": str(job.base_interval)}
+            job.last_exit_code = subprocess.run(
+                [sys.executable, job.script], stdin=subprocess.DEVNULL, env=env).returncode
+        except Exception as e:
+            log.error("❌ %s failed to start: %s", job.name, e)
+            job.last_exit_code = -1
+        job.last_duration = time.time() - job.last_started
+        log.info("⏹️ %s finished in %.1fs (exit %s)", job.name, job.last_duration, job.last_exit_code)
+
+        with self.lock:
+            job.running = False
+            rerun = job.pending
+            job.pending = False
+        if rerun:
+            self.trigger(job.name)
+        if job.scraper and "scanner" in self.jobs:
+            self.trigger("scanner")  # Fresh odds: scan right away instead of waiting for the cadence
+        job.needs_reschedule = True  # Picked up by the main loop; schedule is not thread-safe
+
+    def status(self):
+        now = time.time()
+        return {
+            "queue": [{"job": job.name, "waiting": round(now - job.due_at, 1)} for job in self.queue],
+            "jobs": {
+                job.name: {
+                    "running": job.running,
+                    "pending": job.pending,
+                    "coalesced": job.coalesced,
+                    "interval": job.interval,
+                    "last_lag": job.last_lag and round(job.last_lag, 1),
+                    "last_duration": job.last_duration and round(job.last_duration, 1),
+                    "last_exit_code": job.last_exit_code,
+                    "next_run": job.schedule_job.next_run.isoformat() if job.schedule_job else None,
+                }
+                for job in self.jobs.values()
+            },
+        }
+
+    def report_status(self):
+        with self.lock:
+            status = self.status()
+        with open(STATUS_PATH, "w") as f:
+            json.dump(status, f, indent=2)
+        queued = ", ".join(item["job"] for item in status["queue"]) or "empty"
+        running = ", ".join(name for name, s in status["jobs"].items() if s["running"]) or "none"
+        log.info("📋 Queue: %s | Running: %s", queued, running)
+
+    def run_forever(self):
+        try:
+            prepare_collections(self.db)  # Pairing indexes and keys of collections written before they existed
+        except Exception as e:
+            log.warning("⚠️ Could not prepare the odds collections: %s", e)
+        for job in self.jobs.values():
+            self.reschedule(job)
+            self.trigger(job.name)  # Everything runs once at startup
+        schedule.every(STATUS_INTERVAL).seconds.do(self.report_status)
+
+        while True:
+            for job in self.jobs.values():
+                if job.needs_reschedule:
+                    job.needs_reschedule = False
+                    self.reschedule(job)
+            schedule.run_pending()
+            self.dispatch()
+            time.sleep(1)
+
+
+if __name__ == "__main__":
+    configure()
+    Orchestrator().run_forever()
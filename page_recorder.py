@@ -0,0 +1,392 @@
+"""
+Record/replay of the pages the scrapers read, so crawl performance can be
+measured offline and repeatably instead of against the live sites.
+
+Recording: run any scraper with PAGE_RECORD_DIR set. Every page state it
+parses (albbet match tabs and list pages, vox match lists and match pages)
+is saved as an HTML file plus a line in manifest.jsonl:
+
+    PAGE_RECORD_DIR=fixtures python albbet_football_scraper.py
+
+Browsers started with enable_network_log() also have the documents and
+XHR/fetch responses behind those pages saved to network.jsonl (method, URL,
+status, body); vox_http_client learns its endpoints from these, and
+SessionReplayServer serves them back as a stub of the site.
+
+Replay: serves a recording from a local HTTP server to a headless Chrome and
+runs the scrapers' own extraction on every page (the lxml parsers for albbet,
+the JS extractors for vox), then reports matches per second. Albbet
+recordings can also be replayed through the parsers alone, without a browser:
+
+    python page_recorder.py fixtures/albbet_20261018120000_1234
+    python page_recorder.py fixtures/albbet_20261018120000_1234 --parser-only
+"""
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler, BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+
+from logs import configure, get_logger
+
+log = get_logger("page_recorder")
+
+PAGE_RECORD_DIR = os.getenv("PAGE_RECORD_DIR")  # Set to record every page state the scrapers read
+MANIFEST = "manifest.jsonl"
+NETWORK_LOG = "network.jsonl"
+RECORDED_RESOURCES = {"Document", "XHR", "Fetch"}  # Chrome resource types saved to the network log
+
+# Recorded pages are frozen DOM snapshots: their scripts would re-render or navigate away
+SCRIPT_RE = re.compile(rb"<script\b.*?</script\s*>", re.I | re.S)
+
+_recorders = {}
+
+
+class PageRecorder:
+    """
+    Saves page states of one crawl under <directory>/<site>_<run id>/.
+
+    Pages are numbered in the order they were seen; pages of the same match
+    share a 'match' number (see next_match) so replay can rebuild documents.
+    """
+
+    def __init__(self, directory, site):
+        run_id = f"{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}_{os.getpid()}"
+        self.site = site
+        self.path = os.path.join(directory, f"{site}_{run_id}")
+        os.makedirs(self.path, exist_ok=True)
+        self.pages = 0
+        self.match = 0
+        self.lock = threading.Lock()
+        self.requests = {}  # Chrome request id -> request seen in the performance log
+        self.network = True  # Turned off when the driver has no performance log
+
+    def next_match(self):
+        with self.lock:
+            self.match += 1
+            return self.match
+
+    def record(self, kind, html, url=None, match=None, **meta):
+        """Saves one page state ('kind' = match, goals, list, details, ...) and returns its file name."""
+        with self.lock:
+            self.pages += 1
+            name = f"{self.pages:05d}_{kind}.html"
+            with open(os.path.join(self.path, name), "w", encoding="utf-8") as f:
+                f.write(html)
+            entry = {"file": name, "kind": kind, "url": url, "match": match,
+                     "ts": datetime.now(timezone.utc).isoformat(), **meta}
+            with open(os.path.join(self.path, MANIFEST), "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return name
+
+    def record_driver(self, driver, kind, match=None, **meta):
+        """Records the current page of 'driver'; failures never interrupt the crawl."""
+        if self.network:
+            try:
+                self.record_network(driver)
+            except Exception as e:
+                self.network = False
+                log.warning("⚠️ Network log not recorded (start the browser with enable_network_log): %s", e)
+        try:
+            return self.record(kind, driver.page_source, driver.current_url, match, **meta)
+        except Exception as e:
+            log.warning("⚠️ Failed to record %s page: %s", kind, e)
+            return None
+
+    def record_network(self, driver):
+        """
+        Drains the browser's performance log and appends every finished
+        document/XHR/fetch response to network.jsonl, tagged with the number of
+        the page recorded next. Request bodies are only kept for XHR/fetch, so
+        submitted login forms never end up in a recording.
+        """
+        finished = []
+        for item in driver.get_log("performance"):
+            message = json.loads(item["message"])["message"]
+            params = message.get("params", {})
+            request_id = params.get("requestId")
+            if message["method"] == "Network.requestWillBeSent" and params.get("type") in RECORDED_RESOURCES:
+                request = params["request"]
+                self.requests[request_id] = {
+                    "method": request["method"],
+                    "url": request["url"],
+                    "type": params["type"],
+                    "request_body": request.get("postData") if params["type"] != "Document" else None,
+                    "content_type": request.get("headers", {}).get("Content-Type"),
+                }
+            elif message["method"] == "Network.responseReceived" and request_id in self.requests:
+                response = params["response"]
+                self.requests[request_id].update(status=response["status"], mime=response.get("mimeType"))
+            elif message["method"] == "Network.loadingFinished" and request_id in self.requests:
+                finished.append(request_id)
+
+        lines = []
+        for request_id in finished:
+            entry = self.requests.pop(request_id)
+            if "status" not in entry:
+                continue
+            try:
+                body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+            except Exception:
+                continue  # Evicted from the browser's buffer or a redirect without body
+            if body.get("base64Encoded"):
+                continue
+            entry.update(body=body["body"], page=self.pages + 1)
+            lines.append(json.dumps(entry, ensure_ascii=False) + "\n")
+        if lines:
+            with self.lock, open(os.path.join(self.path, NETWORK_LOG), "a", encoding="utf-8") as f:
+                f.writelines(lines)
+
+
+def enable_network_log(options):
+    """Turns on Chrome's performance log when recording, so PageRecorder can save the site's network traffic."""
+    if PAGE_RECORD_DIR:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
+
+
+def recorder_for(site):
+    """The PageRecorder of this process for 'site', or None when recording is off."""
+    if not PAGE_RECORD_DIR:
+        return None
+    if site not in _recorders:
+        _recorders[site] = PageRecorder(PAGE_RECORD_DIR, site)
+    return _recorders[site]
+
+
+def load_manifest(path):
+    with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def load_network_log(path):
+    """Recorded responses of a recording directory, in the order they finished ([] when none were captured)."""
+    try:
+        with open(os.path.join(path, NETWORK_LOG), encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+# === REPLAY ===
+
+class _ReplayHandler(SimpleHTTPRequestHandler):
+    """Serves recorded pages with their scripts stripped."""
+
+    def do_GET(self):
+        path = self.translate_path(self.path)
+        if not path.endswith(".html") or not os.path.isfile(path):
+            return super().do_GET()
+        with open(path, "rb") as f:
+            body = SCRIPT_RE.sub(b"", f.read())
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ReplayServer:
+    """Local HTTP server for one recording directory, on a free port."""
+
+    def __init__(self, path):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), partial(_ReplayHandler, directory=path))
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, name):
+        return f"http://127.0.0.1:{self.server.server_port}/{name}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class _SessionHandler(BaseHTTPRequestHandler):
+    """Answers every request with the recorded response of the same method, URL and body (or, failing that, path)."""
+
+    def __init__(self, *args, responses, **kwargs):
+        self.responses = responses
+        super().__init__(*args, **kwargs)
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("utf-8") if length else None
+        url = urlsplit(self.path)
+        entry = (self.responses.get((self.command, f"{url.path}?{url.query}", body))
+                 or self.responses.get((self.command, url.path, None)))
+        if entry is None:
+            self.send_error(404, "Not in the recorded session")
+            return
+        body = entry["body"].encode("utf-8")
+        self.send_response(entry.get("status", 200))
+        self.send_header("Content-Type", f"{entry.get('mime') or 'text/html'}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+class SessionReplayServer(ReplayServer):
+    """
+    Stub of the recorded site: serves the responses of network.jsonl (the
+    last one recorded for each method and URL) on a free local port.
+    """
+
+    def __init__(self, path=None, entries=None):
+        responses = {}
+        for entry in entries if entries is not None else load_network_log(path):
+            url = urlsplit(entry["url"])
+            responses[(entry["method"], f"{url.path}?{url.query}", entry.get("request_body"))] = entry
+            responses[(entry["method"], url.path, None)] = entry
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), partial(_SessionHandler, responses=responses))
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+
+class _Pages:
+    """Page source per recorded page, either read from disk or loaded into a browser first."""
+
+    def __init__(self, path, driver=None, server=None):
+        self.path = path
+        self.driver = driver
+        self.server = server
+        self.load_time = 0.0
+
+    def open(self, entry):
+        if self.driver is None:
+            with open(os.path.join(self.path, entry["file"]), encoding="utf-8") as f:
+                return f.read()
+        started = time.perf_counter()
+        self.driver.get(self.server.url(entry["file"]))
+        self.load_time += time.perf_counter() - started
+        return self.driver.page_source
+
+
+def replay_albbet(entries, pages):
+    """Rebuilds football_odds_albbet documents with the same parsers AlbbetFootballScraper uses."""
+    from albbet_page_parser import parse_match_page, parse_goals_tab, parse_btts_tab, build_match_doc
+
+    by_match = defaultdict(dict)
+    for entry in entries:
+        if entry.get("match") is not None:
+            by_match[entry["match"]][entry["kind"]] = entry
+
+    docs = []
+    for match, tabs in sorted(by_match.items()):
+        if "match" not in tabs:
+            continue
+        try:
+            odds = parse_match_page(pages.open(tabs["match"]))
+            if "goals" in tabs:
+                odds["OverUnder2_5"] = parse_goals_tab(pages.open(tabs["goals"]))
+            if "btts" in tabs:
+                odds["BTTS"] = parse_btts_tab(pages.open(tabs["btts"]))
+            docs.append(build_match_doc(odds))
+        except Exception as e:
+            log.warning("⚠️ Could not replay match %s: %s", match, e)
+    return docs
+
+
+def replay_vox(entries, pages):
+    """Runs the vox JS extractors on every recorded match list and match page."""
+    from markets import normalize_odds
+    from utils import extract_match_list, read_match_details
+
+    docs = []
+    rows = 0
+    for entry in entries:
+        pages.open(entry)
+        if entry["kind"] == "list":
+            rows += len(extract_match_list(pages.driver))
+        elif entry["kind"] == "details":
+            docs.append({
+                "home": entry.get("home"),
+                "away": entry.get("away"),
+                "league": entry.get("league"),
+                "odds": normalize_odds(read_match_details(pages.driver)),
+            })
+    if not docs:
+        # Basketball/tennis crawls only read list pages: every row is a match
+        return [None] * rows
+    return docs
+
+
+REPLAYERS = {"albbet": replay_albbet, "vox": replay_vox}
+
+
+def start_replay_browser():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    return webdriver.Chrome(options=options)
+
+
+def replay(path, parser_only=False):
+    """Replays one recording and returns its throughput figures."""
+    entries = load_manifest(path)
+    site = os.path.basename(os.path.normpath(path)).split("_")[0]
+    if site not in REPLAYERS:
+        raise ValueError(f"Unknown site in recording name: {path}")
+    if parser_only and site != "albbet":
+        raise ValueError("Only albbet pages can be replayed without a browser (vox uses JS extractors)")
+
+    if parser_only:
+        pages = _Pages(path)
+        started = time.perf_counter()
+        docs = REPLAYERS[site](entries, pages)
+        elapsed = time.perf_counter() - started
+    else:
+        driver = start_replay_browser()
+        try:
+            with ReplayServer(path) as server:
+                pages = _Pages(path, driver, server)
+                started = time.perf_counter()
+                docs = REPLAYERS[site](entries, pages)
+                elapsed = time.perf_counter() - started
+        finally:
+            driver.quit()
+
+    return {
+        "site": site,
+        "pages": len(entries),
+        "matches": len(docs),
+        "seconds": round(elapsed, 3),
+        "page_load_seconds": round(pages.load_time, 3),
+        "matches_per_second": round(len(docs) / elapsed, 2) if elapsed else None,
+    }
+
+
+if __name__ == "__main__":
+    configure()
+    parser = argparse.ArgumentParser(description="Replay a recorded crawl and measure scraper throughput.")
+    parser.add_argument("recordings", nargs="+", help="recording directories (<site>_<run id>)")
+    parser.add_argument("--parser-only", action="store_true", help="albbet only: skip the browser")
+    args = parser.parse_args()
+
+    for path in args.recordings:
+        stats = replay(path, args.parser_only)
+        print(f"🎬 {path}: {stats['matches']} matches from {stats['pages']} pages in {stats['seconds']}s "
+              f"({stats['matches_per_second']} matches/s, {stats['page_load_seconds']}s loading pages)")
@@ -0,0 +1,94 @@
+import uuid
+from datetime import datetime, timezone, timedelta
+
+from candidate_join import add_match_keys, ensure_indexes
+from logs import get_logger
+from odds_history import OddsHistory, BOOKS
+
+log = get_logger("snapshot_writer")
+
+# Staging collections older than this are leftovers of crashed crawls
+STALE_SNAPSHOT_AGE = timedelta(hours=6)
+SNAPSHOT_TIME_FORMAT = "%Y%m%d%H%M%S"
+
+
+class SnapshotWriter:
+    """
+    Writes one crawl into a private staging collection in batches and swaps it
+    in place of the live collection when the crawl is done.
+
+    Readers keep seeing the previous complete snapshot for the whole crawl:
+    the swap is a single renameCollection with dropTarget, and an empty crawl
+    never replaces a non-empty book.
+
+    Every batch is also appended to the columnar odds history, since the
+    live collection only ever holds the latest crawl. Documents get their
+    normalized match keys on add(), and the staging collection is indexed
+    before the swap (renameCollection keeps the source's indexes).
+    """
+
+    def __init__(self, collection, batch_size=100, record_history=True):
+        self.collection = collection
+        self.db = collection.database
+        self.batch_size = batch_size
+        self.run_id = f"{datetime.now(timezone.utc).strftime(SNAPSHOT_TIME_FORMAT)}_{uuid.uuid4().hex[:6]}"
+        self.staging_prefix = f"{collection.name}__snapshot_"
+        self.staging = self.db[self.staging_prefix + self.run_id]
+        self.buffer = []
+        self.written = 0
+        self.book = collection.name.rsplit("_", 1)[-1]  # football_odds_vox -> vox
+        self.history = OddsHistory() if record_history and self.book in BOOKS else None
+
+    def add(self, doc):
+        self.buffer.append(add_match_keys(doc))
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def add_many(self, docs):
+        for doc in docs:
+            self.add(doc)
+
+    def flush(self):
+        if not self.buffer:
+            return
+        if self.history:
+            try:
+                self.history.append(self.book, self.buffer)
+            except Exception as e:
+                log.warning("⚠️ Failed to append to odds history: %s", e)
+        self.staging.insert_many(self.buffer, ordered=False)
+        self.written += len(self.buffer)
+        self.buffer = []
+
+    def commit(self):
+        """Flushes what is left and atomically replaces the live collection with this run."""
+        self.flush()
+        if not self.written:
+            log.warning("⚠️ Snapshot %s is empty, keeping the current %s.", self.run_id, self.collection.name)
+            self.staging.drop()
+            return False
+
+        # The incremental scan picks up documents by commit time: a match read
+        # early in a long crawl only becomes visible here, at the swap
+        self.staging.update_many({}, {"$set": {"written_at": datetime.now(timezone.utc)}})
+        ensure_indexes(self.staging)  # Built once on the full snapshot instead of per insert
+        self.staging.rename(self.collection.name, dropTarget=True)
+        log.info("💾 Swapped in snapshot %s (%d matches) as %s.", self.run_id, self.written, self.collection.name)
+        self.cleanup()
+        return True
+
+    def cleanup(self):
+        """Drops staging collections left behind by crawls that never committed."""
+        now = datetime.now(timezone.utc)
+        for name in self.db.list_collection_names():
+            if not name.startswith(self.staging_prefix) or name == self.staging.name:
+                continue
+            try:
+                started = datetime.strptime(
+                    name[len(self.staging_prefix):].split("_")[0], SNAPSHOT_TIME_FORMAT
+                ).replace(tzinfo=timezone.utc)
+            except ValueError:
+                continue
+            if now - started > STALE_SNAPSHOT_AGE:
+                self.db.drop_collection(name)
+                log.info("🧹 Dropped stale snapshot %s.", name)
@@ -0,0 +1,65 @@
+import os
+
+from albbet_page_parser import build_match_doc, parse_btts_tab, parse_goals_tab, parse_match_page
+from page_recorder import _Pages, load_manifest, replay, replay_albbet
+
+# Recording of one albbet match (PAGE_RECORD_DIR): the default tab, then the
+# Goals and Both Teams to Score tabs
+SESSION = os.path.join(os.path.dirname(__file__), "fixtures", "albbet_session")
+
+EXPECTED_DOC = {
+    "home": "AZ Alkmaar",
+    "away": "Ajax",
+    "league": "Netherlands Eredivisie",
+    "odds": {
+        "1": 2.15, "X": 3.6, "2": 3.25,
+        "DC_1X": 1.36, "DC_12": 1.29, "DC_X2": 1.7,
+        "BTTS_Yes": 1.57, "BTTS_No": 2.3,
+        "Over_2.5": 1.72, "Under_2.5": 2.05,
+    },
+}
+
+
+def page(kind):
+    entry = next(entry for entry in load_manifest(SESSION) if entry["kind"] == kind)
+    with open(os.path.join(SESSION, entry["file"]), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_match_tab():
+    odds = parse_match_page(page("match"))
+    assert odds["teams"] == {"home": "AZ Alkmaar", "away": "Ajax"}
+    assert odds["league"] == "Netherlands Eredivisie"
+    assert odds["1X2"] == {"1": "2.15", "X": "3.60", "2": "3.25"}  # Not the Half Time Result below it
+    assert odds["DoubleChance"] == {"1X": "1.36", "12": "1.29", "X2": "1.70"}
+
+
+def test_goals_tab_reads_the_2_5_line():
+    assert parse_goals_tab(page("goals")) == {"Over 2.5": "1.72", "Under 2.5": "2.05"}
+
+
+def test_btts_tab_reads_the_full_match_market():
+    assert parse_btts_tab(page("btts")) == {"Yes": "1.57", "No": "2.30"}
+
+
+def test_tabs_of_other_pages_parse_empty():
+    assert parse_goals_tab(page("match")) == {}
+    assert parse_btts_tab(page("goals")) == {}
+
+
+def test_build_match_doc():
+    odds = parse_match_page(page("match"))
+    odds["OverUnder2_5"] = parse_goals_tab(page("goals"))
+    odds["BTTS"] = parse_btts_tab(page("btts"))
+    assert build_match_doc(odds) == EXPECTED_DOC
+
+
+def test_match_doc_without_extra_tabs_has_missing_prices():
+    doc = build_match_doc(parse_match_page(page("match")))
+    assert doc["odds"]["1"] == 2.15
+    assert doc["odds"]["BTTS_Yes"] is None and doc["odds"]["Over_2.5"] is None
+
+
+def test_replay_rebuilds_the_recorded_match():
+    assert replay_albbet(load_manifest(SESSION), _Pages(SESSION)) == [EXPECTED_DOC]
+    assert replay(SESSION, parser_only=True)["matches"] == 1
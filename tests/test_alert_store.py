@@ -0,0 +1,58 @@
+from alert_store import AlertStore
+from email_alert import AlertDispatcher
+
+
+def arb(profit=2.0, odds_1=2.1):
+    return {
+        "match": "Arsenal vs Chelsea",
+        "market": "1X2",
+        "profit_percent": profit,
+        "odds": {"1": odds_1, "X": 3.6, "2": 4.2},
+        "books": {"1": "albbet", "X": "vox", "2": "vox"},
+    }
+
+
+def test_alert_is_recorded_only_after_delivery(tmp_path):
+    store = AlertStore(str(tmp_path / "alerts.sqlite"))
+    assert store.filter([arb()]) == [arb()]
+    assert store.filter([arb()]) == []  # Pending: not handed out twice
+
+    store.acknowledge([arb()], delivered=False)
+    assert store.filter([arb()]) == [arb()]  # Released after a failed delivery
+
+    store.acknowledge([arb()], delivered=True)
+    store.close()
+    reopened = AlertStore(str(tmp_path / "alerts.sqlite"))
+    assert reopened.filter([arb()]) == []
+    assert reopened.filter([arb(profit=2.1, odds_1=2.2)]) == []  # Not enough of an improvement
+    assert reopened.filter([arb(profit=2.5, odds_1=2.3)]) == [arb(profit=2.5, odds_1=2.3)]
+
+
+def test_undelivered_alert_is_not_recorded(tmp_path):
+    store = AlertStore(str(tmp_path / "alerts.sqlite"))
+    store.filter([arb()])
+    store.close()
+    assert AlertStore(str(tmp_path / "alerts.sqlite")).filter([arb()]) == [arb()]
+
+
+def test_dropped_alerts_are_released(tmp_path):
+    store = AlertStore(str(tmp_path / "alerts.sqlite"))
+    dispatcher = AlertDispatcher(queue_size=1)
+    dispatcher.closing.set()  # Refuses new alerts, as during shutdown
+
+    assert dispatcher.submit_many(store.filter([arb()]), ack=store.acknowledge) == 0
+    assert store.filter([arb()]) == [arb()]
+
+
+def test_started_event_is_not_notified_again(tmp_path):
+    from datetime import datetime, timezone, timedelta
+
+    store = AlertStore(str(tmp_path / "alerts.sqlite"))
+    started = {**arb(), "kickoff": datetime.now(timezone.utc) - timedelta(minutes=30)}
+    for _ in range(3):  # One per scan
+        alerts = store.filter([started])
+        store.acknowledge(alerts, delivered=True)
+        assert alerts == []
+
+    upcoming = {**arb(), "kickoff": datetime.now(timezone.utc) + timedelta(minutes=30)}
+    assert store.filter([upcoming]) == [upcoming]
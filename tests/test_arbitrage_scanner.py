@@ -0,0 +1,35 @@
+import arbitrage_scanner as scanner
+
+
+class Collection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query=None, projection=None):
+        return iter(self.docs)
+
+
+class Untouchable:
+    """A single-book sport's collection: the scan must not read it."""
+
+    def find(self, *args, **kwargs):
+        raise AssertionError("single-book sport was loaded")
+
+
+def match(odds):
+    return {"home": "Arsenal", "away": "Chelsea", "league": "Premier League", "odds": odds}
+
+
+def test_single_book_sports_are_skipped(monkeypatch):
+    monkeypatch.setattr(scanner, "SPORT_COLLECTIONS", {
+        "football": {"albbet": Collection([match({"1": 2.6, "X": 3.9, "2": 2.2})]),
+                     "vox": Collection([match({"1": 2.2, "X": 4.1, "2": 3.3})])},
+        "basketball": {"vox": Untouchable()},
+    })
+    monkeypatch.setattr(scanner, "USE_IDENTITY_CACHE", False)
+    monkeypatch.setattr(scanner, "ARBITRAGE_RESULTS", [])
+
+    assert list(scanner.scanned_sports()) == ["football"]
+    scanner.find_arbitrage_bets()
+    assert scanner.ARBITRAGE_RESULTS
+    assert {arb["market"] for arb in scanner.ARBITRAGE_RESULTS} >= {"1+X+2"}
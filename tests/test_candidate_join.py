@@ -0,0 +1,56 @@
+import pytest
+
+from arbitrage_scanner import candidate_positions, match_pairs_batch
+from candidate_join import blocking_keys, match_keys
+
+
+def match(home, away, league="Eredivisie"):
+    return {"home": home, "away": away, "league": league}
+
+
+@pytest.mark.parametrize("name1, name2", [
+    ("AZ Alkmaar", "AZ"),
+    ("Dynamo Kyiv", "Dinamo Kiev"),
+    ("FC Porto", "Porto"),
+    ("Crvena Zvezda", "Tsrvena Zvezda"),
+])
+def test_name_variants_share_a_blocking_key(name1, name2):
+    assert blocking_keys(name1) & blocking_keys(name2)
+
+
+def test_pairs_meet_on_team_keys_or_league():
+    alb = [
+        match("AZ Alkmaar", "Ajax"),
+        match("Dynamo Kyiv", "Shakhtar Donetsk", "Ukraine Premier League"),
+        match("Utrecht", "Heerenveen"),  # Away team renamed: only the league brings them together
+    ]
+    vox = [
+        match("AZ", "Ajax Amsterdam"),
+        match("Dinamo Kiev", "Shakhtar", "Ukraine. Premier Liga"),
+        match("FC Utrecht", "SC Heerenveen Friesland"),
+        match("Feyenoord", "PSV", "Serie A"),
+    ]
+    assert set(candidate_positions(alb, vox)) >= {(0, 0), (1, 1), (2, 2)}
+    assert all(j != 3 for _, j in candidate_positions(alb, vox))
+
+    pairs, _ = match_pairs_batch(alb, vox)
+    assert (alb[0], vox[0]) in pairs
+
+
+def test_match_keys_skip_generic_league_words():
+    keys = match_keys(match("AZ", "Ajax", "Ukraine Premier League"))
+    assert keys["league_keys"] == ["=ukrainepremierleague", "ukr", "~ukr"]
+    assert "az" in keys["home_keys"]
+
+
+def test_doc_goes_to_its_best_cluster():
+    from arbitrage_scanner import add_book_to_clusters
+
+    vox_u21 = match("Ajax U21", "PSV U21")
+    vox = match("Ajax", "PSV")
+    clusters = [{"vox": vox_u21}, {"vox": vox}]
+    alb = match("Ajax", "PSV")
+
+    add_book_to_clusters(clusters, "albbet", [alb])
+    assert clusters[1]["albbet"] is alb
+    assert "albbet" not in clusters[0]
@@ -0,0 +1,65 @@
+import os
+import uuid
+from datetime import datetime, timezone, timedelta
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from arbitrage_scanner import cluster_events_mongo
+from candidate_join import candidate_pairs, prepare_collections
+from snapshot_writer import SnapshotWriter
+
+
+@pytest.fixture
+def db():
+    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017"), serverSelectionTimeoutMS=500)
+    try:
+        version = client.server_info()["versionArray"]
+    except PyMongoError:
+        pytest.skip("no local mongod")
+    if version[0] < 5:
+        pytest.skip("the candidate $lookup needs MongoDB 5.0+")
+    name = f"test_candidate_join_{uuid.uuid4().hex[:8]}"
+    yield client[name]
+    client.drop_database(name)
+    client.close()
+
+
+def write(collection, matches):
+    writer = SnapshotWriter(collection, record_history=False)
+    now = datetime.now(timezone.utc)
+    writer.add_many([{**match, "odds": {"1": 2.0, "X": 3.3, "2": 3.9}, "updated_at": now,
+                      "kickoff": now + timedelta(hours=2)} for match in matches])
+    writer.commit()
+
+
+def test_mongo_join_pairs_name_variants(db):
+    write(db["football_odds_albbet"], [
+        {"home": "AZ Alkmaar", "away": "Ajax", "league": "Netherlands Eredivisie"},
+        {"home": "Dynamo Kyiv", "away": "Shakhtar Donetsk", "league": "Ukraine Premier League"},
+        {"home": "Arsenal", "away": "Chelsea", "league": "England Premier League"},
+    ])
+    write(db["football_odds_vox"], [
+        {"home": "AZ", "away": "Ajax Amsterdam", "league": "Netherlands. Eredivisie"},
+        {"home": "Dinamo Kiev", "away": "Shakhtar Donetsk", "league": "Ukraine. Premier League"},
+        {"home": "Real Madrid", "away": "Barcelona", "league": "Spain. La Liga"},
+    ])
+    collections = {"albbet": db["football_odds_albbet"], "vox": db["football_odds_vox"]}
+    assert "home_keys_1" in collections["vox"].index_information()  # Indexed at write time
+
+    pairs = {(doc["home"], other["home"]) for doc, other in candidate_pairs(collections["albbet"], collections["vox"])}
+    assert {("AZ Alkmaar", "AZ"), ("Dynamo Kyiv", "Dinamo Kiev")} <= pairs
+    assert not any(home == "Arsenal" for home, _ in pairs)
+
+    events, _ = cluster_events_mongo(collections)
+    assert sorted((event["albbet"]["home"], event["vox"]["home"]) for event in events) == [
+        ("AZ Alkmaar", "AZ"), ("Dynamo Kyiv", "Dinamo Kiev")]
+
+
+def test_prepare_collections_backfills_old_documents(db):
+    db["football_odds_vox"].insert_one({"home": "AZ", "away": "Ajax", "league": "Eredivisie"})
+    prepare_collections(db)
+    doc = db["football_odds_vox"].find_one()
+    assert "az" in doc["home_keys"] and doc["keys_version"]
+    assert "league_keys_1" in db["football_odds_vox"].index_information()
@@ -0,0 +1,112 @@
+import socket
+import threading
+import time
+from email import message_from_bytes, policy
+
+import pytest
+
+import email_alert
+from email_alert import AlertDispatcher, RateLimiter
+
+controller = pytest.importorskip("aiosmtpd.controller")
+
+
+def arb(i):
+    return {
+        "match": f"Home {i} vs Away {i}",
+        "market": "1X2",
+        "profit_percent": 1 + i / 10,
+        "odds": {"1": 2.1, "X": 3.6, "2": 4.2},
+        "books": {"1": "albbet", "X": "vox", "2": "vox"},
+        "stake_split": {"1": 48.5, "X": 28.3, "2": 23.2},
+    }
+
+
+class Inbox:
+    """aiosmtpd handler keeping every message; drops the connection instead of the first 'drop' ones."""
+
+    def __init__(self, drop=0):
+        self.messages = []
+        self.received_at = []
+        self.connections = set()
+        self.drop = drop
+
+    async def handle_DATA(self, server, session, envelope):
+        self.connections.add(session.peer)
+        if self.drop:
+            self.drop -= 1
+            server.transport.close()
+            return "421 Closing connection"
+        self.messages.append(message_from_bytes(envelope.content, policy=policy.default))
+        self.received_at.append(time.monotonic())
+        return "250 Message accepted for delivery"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    servers = []
+
+    def start(inbox):
+        server = controller.Controller(inbox, hostname="127.0.0.1", port=free_port())
+        server.start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def dispatcher_for(server, **kwargs):
+    return AlertDispatcher(host=server.hostname, port=server.port, security="none", user=None, password=None,
+                           recipient="alerts@localhost", **kwargs)
+
+
+def test_alerts_within_the_window_share_one_email(smtp_server):
+    inbox = Inbox()
+    dispatcher = dispatcher_for(smtp_server(inbox), batch_window=1, max_batch=3)
+    for i in range(5):
+        dispatcher.submit(arb(i))
+    dispatcher.close(timeout=10)
+
+    assert [len(message.get_content().split("Match: ")) - 1 for message in inbox.messages] == [3, 2]
+    assert inbox.messages[0]["Subject"] == "⚽ Arbitrage Opportunities Report (3)"
+    assert len(inbox.connections) == 1  # One pooled connection for both e-mails
+
+
+def test_emails_are_rate_limited(smtp_server):
+    inbox = Inbox()
+    dispatcher = dispatcher_for(smtp_server(inbox), batch_window=0, max_batch=1)
+    dispatcher.limiter = RateLimiter(2, per=1.0)  # Burst of 2, then one e-mail every 0.5s
+    for i in range(4):
+        dispatcher.submit(arb(i))
+    dispatcher.close(timeout=10)
+
+    assert len(inbox.messages) == 4
+    assert inbox.received_at[3] - inbox.received_at[0] >= 0.9
+
+
+def test_batch_is_retried_after_a_dropped_connection(smtp_server, monkeypatch):
+    monkeypatch.setattr(email_alert, "RETRY_BASE_DELAY", 0.05)
+    inbox = Inbox(drop=1)
+    dispatcher = dispatcher_for(smtp_server(inbox), batch_window=0.2)
+    acks = []
+    delivered = threading.Event()
+
+    def ack(alerts, ok):
+        acks.append((len(alerts), ok))
+        delivered.set()
+
+    dispatcher.submit_many([arb(0), arb(1)], ack=ack)
+    assert delivered.wait(10)
+    dispatcher.close(timeout=10)
+
+    assert len(inbox.messages) == 1
+    assert inbox.messages[0]["Subject"] == "⚽ Arbitrage Opportunities Report (2)"
+    assert acks == [(2, True)]
@@ -0,0 +1,52 @@
+from datetime import datetime, date, timedelta, timezone
+
+from fixture_schedule import FixtureSchedule, kickoff_from, parse_kickoff, refresh_interval
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)  # 14:00 in Tirana (CEST)
+
+
+class Collection:
+    """Just enough of a pymongo collection for FixtureSchedule."""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query, projection):
+        (field, _), = query.items()
+        return [dict(doc) for doc in self.docs if doc.get(field) is not None]
+
+
+def test_parse_kickoff_reads_site_local_time():
+    assert parse_kickoff("21:00", now=NOW) == datetime(2026, 10, 18, 19, 0, tzinfo=timezone.utc)
+    assert parse_kickoff("19/10 02:30", now=NOW) == datetime(2026, 10, 19, 0, 30, tzinfo=timezone.utc)
+    assert parse_kickoff("Arsenal v Chelsea 20:45 2.10", day=date(2026, 10, 18)) == \
+        datetime(2026, 10, 18, 18, 45, tzinfo=timezone.utc)
+    assert parse_kickoff("09:00", now=NOW) == datetime(2026, 10, 19, 7, 0, tzinfo=timezone.utc)  # Long past: tomorrow
+    assert parse_kickoff("Live", now=NOW) is None
+
+
+def test_kickoff_from_timestamps():
+    assert kickoff_from("2026-10-18T19:00:00Z") == datetime(2026, 10, 18, 19, 0, tzinfo=timezone.utc)
+    assert kickoff_from(1792350000000) == datetime.fromtimestamp(1792350000, timezone.utc)
+    assert kickoff_from(datetime(2026, 10, 18, 19, 0)) == datetime(2026, 10, 18, 19, 0, tzinfo=timezone.utc)
+
+
+def test_refresh_interval_tightens_towards_kickoff():
+    assert refresh_interval(NOW + timedelta(minutes=30), 600, NOW) == 150
+    assert refresh_interval(NOW + timedelta(hours=3), 600, NOW) == 300
+    assert refresh_interval(NOW + timedelta(hours=12), 600, NOW) == 600
+    assert refresh_interval(NOW + timedelta(days=3), 600, NOW) == 1200
+    assert refresh_interval(None, 600, NOW) == 600
+
+
+def test_only_due_fixtures_are_reopened():
+    read_5_minutes_ago = NOW - timedelta(minutes=5)
+    schedule = FixtureSchedule(Collection([
+        {"kodi": "1", "kickoff": NOW + timedelta(days=2), "updated_at": read_5_minutes_ago, "odds": {"1": 2.0}},
+        {"kodi": "2", "kickoff": NOW + timedelta(minutes=20), "updated_at": read_5_minutes_ago, "odds": {"1": 2.0}},
+    ]), "kodi", base_interval=600)
+
+    assert schedule.carry("1", now=NOW)["odds"] == {"1": 2.0}  # Days away: every 20 minutes
+    assert schedule.carry("2", now=NOW) is None  # 20 minutes away: every 2.5 minutes
+    assert schedule.carry("3", now=NOW) is None  # New fixture
+    assert schedule.carried == 1
@@ -0,0 +1,26 @@
+import io
+import logging
+
+import logs
+
+
+def test_get_logger_leaves_the_root_handlers_alone():
+    root = logging.getLogger()
+    handler = logging.NullHandler()
+    root.addHandler(handler)
+    try:
+        before = list(root.handlers)
+        logs.get_logger("test_logs_module")
+        logs.sampled_logger("test_logs_module.rows")
+        assert root.handlers == before
+    finally:
+        root.removeHandler(handler)
+
+
+def test_configure_sets_up_the_entry_point(monkeypatch):
+    root = logging.getLogger()
+    monkeypatch.setattr(root, "handlers", list(root.handlers))  # Restored after the test
+    stream = io.StringIO()
+    logs.configure(level="INFO", fmt="json", stream=stream)
+    logs.get_logger("test_logs_entry").info("hello %s", "world")
+    assert '"msg": "hello world"' in stream.getvalue()
@@ -0,0 +1,38 @@
+from datetime import datetime, timezone, timedelta
+
+from identity_cache import EventIdentityCache
+from odds_history import OddsHistory, event_id
+
+ALB = {"home": "AZ Alkmaar", "away": "Ajax", "league": "Netherlands Eredivisie"}
+VOX = {"home": "AZ", "away": "Ajax Amsterdam", "league": "Netherlands. Eredivisie"}
+
+
+def doc(names, price, minutes_ago):
+    return {**names, "odds": {"1": price}, "updated_at": datetime.now(timezone.utc) - timedelta(minutes=minutes_ago)}
+
+
+def test_paired_event_shares_its_canonical_id_across_books(tmp_path):
+    identity_path = str(tmp_path / "identity_cache.sqlite")
+    history = OddsHistory(str(tmp_path / "history"), identity_path)
+    history.append("albbet", [doc(ALB, 2.10, 50)])  # Before the scanner paired the books
+
+    cache = EventIdentityCache(identity_path)
+    cache.remember_pairs([(ALB, VOX)], "albbet", "vox")
+    canonical = cache.event_ids("albbet", [ALB])[0]
+    cache.close()
+
+    history.append("albbet", [doc(ALB, 2.20, 30)])
+    history.append("vox", [doc(VOX, 2.25, 20)])
+    records = history.query(datetime.now(timezone.utc) - timedelta(hours=1))
+    assert list(records["event"][1:]) == [event_id(**VOX, canonical=canonical)] * 2
+
+    for names in (ALB, VOX):
+        moves = history.line_moves(**names)
+        assert [(move["book"], move["odds"]) for move in moves] == [("albbet", 2.1), ("albbet", 2.2), ("vox", 2.25)]
+
+
+def test_unpaired_event_is_keyed_by_name(tmp_path):
+    history = OddsHistory(str(tmp_path / "history"), identity_path=None)
+    history.append("vox", [doc(VOX, 2.25, 5)])
+    assert list(history.query(datetime.now(timezone.utc) - timedelta(hours=1))["event"]) == [event_id(**VOX)]
+    assert len(history.line_moves(**VOX)) == 1
@@ -0,0 +1,53 @@
+import asyncio
+import json
+import threading
+import time
+
+from odds_stream import StreamScanner
+
+
+class SlowScanner(StreamScanner):
+    """Records which thread applied each update; every update takes 0.2s."""
+
+    def __init__(self):
+        super().__init__(books=["albbet", "vox"])
+        self.applied = []
+
+    def update(self, book, doc, captured_at):
+        time.sleep(0.2)
+        self.applied.append((doc["home"], threading.current_thread().name))
+        return []
+
+
+def test_updates_run_off_the_event_loop_in_order(tmp_path):
+    scanner = SlowScanner()
+    path = str(tmp_path / "odds.sock")
+
+    async def run():
+        server = await asyncio.start_unix_server(scanner._handle, path)
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        beat = asyncio.create_task(heartbeat())
+        _, writer = await asyncio.open_unix_connection(path)
+        for home in ("A", "B", "C"):
+            writer.write((json.dumps({"book": "vox", "doc": {"home": home}, "captured_at": time.time()}) + "\n").encode())
+        await writer.drain()
+        while len(scanner.applied) < 3:
+            await asyncio.sleep(0.05)
+        writer.close()
+        beat.cancel()
+        server.close()
+        await server.wait_closed()
+        return ticks
+
+    ticks = asyncio.run(run())
+    scanner.worker.shutdown()
+    assert [home for home, _ in scanner.applied] == ["A", "B", "C"]
+    assert all(thread.startswith("stream-scanner") for _, thread in scanner.applied)
+    assert ticks > 20  # The loop kept running during the 0.6s of updates
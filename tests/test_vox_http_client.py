@@ -0,0 +1,115 @@
+import asyncio
+import json
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+import vox_api_spec
+from fixture_schedule import kickoff_from
+from markets import normalize_odds, parse_odd
+from page_recorder import SessionReplayServer, load_manifest, load_network_log
+from utils import details_to_odds, parse_match_details_html, parse_match_list_html
+from vox_http_client import VoxHttpClient, VoxLoginError
+
+# Recording of a vox crawl (PAGE_RECORD_DIR) with its network log: a football
+# list with two match pages, then the basketball and tennis lists
+SESSION = os.path.join(os.path.dirname(__file__), "fixtures", "vox_session")
+RECORDED_AT = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)  # List pages show "dd/mm HH:MM" without a year
+
+
+@pytest.fixture(scope="module")
+def spec():
+    return vox_api_spec.learn([SESSION])
+
+
+def run_client(spec, scrape, entries=None, username="user", password="secret"):
+    async def run():
+        with SessionReplayServer(SESSION, entries) as server:
+            async with VoxHttpClient(server.base_url, spec) as client:
+                await client.login(username, password)
+                return await scrape(client)
+    return asyncio.run(run())
+
+
+def recorded_pages(kind):
+    for entry in load_manifest(SESSION):
+        if entry["kind"] == kind:
+            with open(os.path.join(SESSION, entry["file"]), encoding="utf-8") as f:
+                yield entry, f.read()
+
+
+def list_kickoffs():
+    """Kickoff per kodi as shown on the recorded list pages."""
+    return {row["kodi"]: kickoff_from(row["time"], RECORDED_AT)
+            for _, html in recorded_pages("list") for row in parse_match_list_html(html)}
+
+
+def without_timestamps(docs):
+    return [{k: v for k, v in doc.items() if k != "updated_at"} for doc in docs]
+
+
+def test_learns_endpoints_from_recorded_session(spec):
+    assert spec["login"] == "/client.aspx"
+    assert {sport: endpoint["url"] for sport, endpoint in spec["match_lists"].items()} == {
+        "football": "/Sport/GetEvents?sportId=1",
+        "basketball": "/Sport/GetEvents?sportId=2",
+        "tennis": "/Sport/GetEvents?sportId=3",
+    }
+    assert spec["markets"]["method"] == "POST"
+    assert json.loads(spec["markets"]["body"]) == {"eventCode": "{kodi}", "lang": "sq"}
+
+
+def test_list_fields_reproduce_recorded_list_pages(spec):
+    network = {entry["url"].split("=")[-1]: json.loads(entry["body"])
+               for entry in load_network_log(SESSION) if "GetEvents" in entry["url"]}
+    for entry, html in recorded_pages("list"):
+        sport_id = entry["url"].rsplit("/", 1)[-1]
+        rows = vox_api_spec.extract_rows(network[sport_id], spec["list_fields"])
+        assert [{**row, "odds": [parse_odd(odd) for odd in row["odds"]], "time": kickoff_from(row["time"], RECORDED_AT)}
+                for row in rows] == [
+            {**row, "odds": [parse_odd(odd) for odd in row["odds"]], "time": kickoff_from(row["time"], RECORDED_AT)}
+            for row in parse_match_list_html(html)]
+
+
+def test_football_matches_equal_the_recorded_match_pages(spec):
+    docs = run_client(spec, lambda client: client.scrape_football())
+
+    kickoffs = list_kickoffs()
+    expected = [{
+        "home": entry["home"],
+        "away": entry["away"],
+        "sport": "football",
+        "league": entry["league"],
+        "kodi": entry["kodi"],
+        "kickoff": kickoffs[entry["kodi"]],
+        "odds": normalize_odds(details_to_odds(parse_match_details_html(html))),
+    } for entry, html in recorded_pages("details")]
+    assert without_timestamps(docs) == expected
+    assert docs[0]["odds"]["1"] == 2.15  # Match page price, not the list-level 2.10
+
+
+def test_moneylines(spec):
+    docs = run_client(spec, lambda client: client.scrape_moneylines("basketball"))
+
+    assert without_timestamps(docs) == [
+        {"home": "Lakers", "away": "Celtics", "league": "NBA", "sport": "basketball", "kodi": "2001",
+         "kickoff": datetime(2026, 10, 19, 0, 30, tzinfo=timezone.utc), "odds": {"1": 1.85, "2": 1.95}},
+        {"home": "Bulls", "away": "Knicks", "league": "NBA", "sport": "basketball", "kodi": "2002",
+         "kickoff": datetime(2026, 10, 19, 1, 0, tzinfo=timezone.utc), "odds": {"1": 2.3, "2": 1.6}},
+    ]
+
+
+def test_rejected_login_raises(spec):
+    entries = load_network_log(SESSION)
+    login_page = next(entry for entry in entries if entry["method"] == "GET" and entry["type"] == "Document")
+    rejected = [{**entry, "body": login_page["body"]} if entry["method"] == "POST" and entry["type"] == "Document"
+                else entry for entry in entries]
+
+    with pytest.raises(VoxLoginError):
+        run_client(spec, lambda client: client.scrape_football(), entries=rejected)
+
+
+def test_missing_credentials_raise(spec):
+    with pytest.raises(VoxLoginError):
+        run_client(spec, lambda client: client.scrape_football(), password=None)
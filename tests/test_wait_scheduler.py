@@ -0,0 +1,37 @@
+import pytest
+
+pytest.importorskip("selenium")
+
+from wait_scheduler import AdaptiveWaiter
+
+
+class Condition:
+    """Fake expected condition: truthy once it has been polled 'after' times."""
+
+    def __init__(self, after):
+        self.after = after
+        self.polls = 0
+
+    def __call__(self, driver):
+        self.polls += 1
+        return self.polls > self.after
+
+
+def test_timeout_backs_off_after_a_timed_out_wait(tmp_path):
+    waiter = AdaptiveWaiter(driver=object(), site="test", stats_path=str(tmp_path / "wait_stats.json"))
+    for _ in range(10):
+        assert waiter.wait_for(Condition(0), "match_page", max_wait=2)
+    fast = waiter.timeout_for("match_page", 2)
+    assert fast < 2  # Adapted to the fast waits
+
+    assert waiter.wait_for(Condition(10 ** 9), "match_page", max_wait=2) is None
+    assert waiter.timeouts["match_page"] == 1
+    assert waiter.timeout_for("match_page", 2) == 2  # Full max_wait after a timeout
+    assert 2 in waiter.samples["match_page"]
+
+    assert waiter.wait_for(Condition(0), "match_page", max_wait=2)
+    assert waiter.timeout_for("match_page", 2) < 2  # Adapts again once the page is back to normal
+
+    waiter.save_stats()
+    reloaded = AdaptiveWaiter(driver=object(), site="test", stats_path=str(tmp_path / "wait_stats.json"))
+    assert 2 in reloaded.samples["match_page"]  # The timed-out wait is persisted
@@ -0,0 +1,144 @@
+# Shared helpers for the vox365 scrapers
+from lxml import html as lxml_html
+
+from albbet_page_parser import _cls
+from fixture_schedule import KICKOFF_TEXT_RE
+
+# Reads every league block and match row of a vox365 list page in one call.
+# Returns [{league, kodi, teams: [home, away], odds: [list-level odds], time}, ...]
+# where time is the row's kickoff text ("21:00" or "18/10 21:00", site local time)
+MATCH_LIST_JS = """
+const KICKOFF = /^(\\d{1,2}[./]\\d{1,2}([./]\\d{2,4})?\\s+)?\\d{1,2}:\\d{2}$/;  // Mirrors fixture_schedule.KICKOFF_TEXT_RE
+const rows = [];
+document.querySelectorAll('.leagueCont').forEach(block => {
+    const nameEl = block.querySelector('.lNameText');
+    const league = nameEl ? nameEl.innerText.trim() : 'Unknown League';
+    block.querySelectorAll('.matchRow').forEach(row => {
+        const kodi = row.querySelector('.kodi');
+        const oddsCont = row.querySelector('.ovDiteOddsCont');
+        rows.push({
+            league: league,
+            kodi: kodi ? kodi.innerText.trim() : null,
+            teams: Array.from(row.querySelectorAll('.matchNameHomeAway')).map(t => t.innerText.trim()),
+            odds: oddsCont ? Array.from(oddsCont.querySelectorAll('.odd')).map(o => o.innerText.trim()) : [],
+            time: Array.from(row.querySelectorAll('*')).filter(el => !el.children.length)
+                .map(el => el.innerText.trim()).find(text => KICKOFF.test(text)) || null
+        });
+    });
+});
+return rows;
+"""
+
+# Clicks into the match whose code is arguments[0]; returns false if it is no longer listed
+CLICK_MATCH_JS = """
+for (const row of document.querySelectorAll('.matchRow')) {
+    const kodi = row.querySelector('.kodi');
+    const team = row.querySelector('.matchNameHomeAway');
+    if (kodi && team && kodi.innerText.trim() === arguments[0]) {
+        team.parentElement.click();
+        return true;
+    }
+}
+return false;
+"""
+
+# Reads the first three oddVal prices (1X2) and every rubContainer market group of an open match
+MATCH_DETAILS_JS = """
+const text = el => el ? el.innerText.trim() : '';
+return {
+    main: Array.from(document.querySelectorAll('.oddVal')).slice(0, 3).map(text),
+    groups: Array.from(document.querySelectorAll('.rubContainer')).map(block => ({
+        name: text(block.querySelector('.rubNameDiteRub')),
+        odds: Array.from(block.querySelectorAll('.oddCont')).map(o => ({
+            desc: text(o.querySelector('.oddDesc')),
+            val: text(o.querySelector('.oddVal'))
+        }))
+    }))
+};
+"""
+
+
+def extract_match_list(driver):
+    """Snapshot of the current match list as plain data (no element handles to go stale)."""
+    return driver.execute_script(MATCH_LIST_JS) or []
+
+
+def click_match(driver, kodi):
+    return bool(driver.execute_script(CLICK_MATCH_JS, kodi))
+
+
+def read_match_details(driver):
+    """1X2 and market-group odds of the open match page, in one call."""
+    return details_to_odds(driver.execute_script(MATCH_DETAILS_JS))
+
+
+def details_to_odds(details):
+    """Football odds of a match page read as {main: [1, X, 2], groups: [...]} (MATCH_DETAILS_JS's shape)."""
+    main = details["main"]
+    odds = dict(zip(("1", "X", "2"), main)) if len(main) >= 3 and all(main) else {"1": None, "X": None, "2": None}
+    odds.update(parse_market_groups(details["groups"]))
+    return odds
+
+
+# lxml versions of the JS extractors, for saved pages (page_recorder recordings)
+
+def _first_text(el, name):
+    found = el.xpath(f".//*[{_cls(name)}]")
+    return found[0].text_content().strip() if found else ""
+
+
+def parse_match_list_html(page_source):
+    """Same rows as MATCH_LIST_JS, from the HTML of a list page."""
+    rows = []
+    for block in lxml_html.fromstring(page_source).xpath(f"//*[{_cls('leagueCont')}]"):
+        league = _first_text(block, "lNameText") or "Unknown League"
+        for row in block.xpath(f".//*[{_cls('matchRow')}]"):
+            odds_cont = row.xpath(f".//*[{_cls('ovDiteOddsCont')}]")
+            rows.append({
+                "league": league,
+                "kodi": _first_text(row, "kodi") or None,
+                "teams": [t.text_content().strip() for t in row.xpath(f".//*[{_cls('matchNameHomeAway')}]")],
+                "odds": [o.text_content().strip() for o in odds_cont[0].xpath(f".//*[{_cls('odd')}]")] if odds_cont else [],
+                "time": next((text for text in (leaf.text_content().strip() for leaf in row.xpath(".//*[not(*)]"))
+                              if KICKOFF_TEXT_RE.fullmatch(text)), None),
+            })
+    return rows
+
+
+def parse_match_details_html(page_source):
+    """Same {main, groups} as MATCH_DETAILS_JS, from the HTML of a match page."""
+    tree = lxml_html.fromstring(page_source)
+    return {
+        "main": [v.text_content().strip() for v in tree.xpath(f"//*[{_cls('oddVal')}]")[:3]],
+        "groups": [{
+            "name": _first_text(block, "rubNameDiteRub"),
+            "odds": [{"desc": _first_text(o, "oddDesc"), "val": _first_text(o, "oddVal")}
+                     for o in block.xpath(f".//*[{_cls('oddCont')}]")],
+        } for block in tree.xpath(f"//*[{_cls('rubContainer')}]")],
+    }
+
+
+def parse_market_groups(groups):
+    """
+    Maps vox365 market groups ([{"name": ..., "odds": [{"desc": ..., "val": ...}]}], the same
+    data as the rubContainer blocks of a match page) to the football odds keys.
+    """
+    odds = {key: None for key in ("BTTS_Yes", "BTTS_No", "DC_1X", "DC_12", "DC_X2", "Over_2.5", "Under_2.5")}
+    labels = {
+        "btts": {"Gol": "BTTS_Yes", "JGol": "BTTS_No"},
+        "dopio shans": {"1X": "DC_1X", "12": "DC_12", "X2": "DC_X2"},
+        "shuma e golave perfundimtare": {"3+": "Over_2.5", "0-2": "Under_2.5"},
+    }
+    for group in groups:
+        title = (group.get("name") or "").strip().lower()
+        descs = [(o.get("desc") or "").strip() for o in group.get("odds", [])]
+        if "gol" in title and "JGol" in descs:
+            mapping = labels["btts"]
+        else:
+            mapping = labels.get(title)
+        if not mapping:
+            continue
+        for desc, o in zip(descs, group.get("odds", [])):
+            if desc in mapping:
+                odds[mapping[desc]] = (o.get("val") or "").strip() or None
+    return odds
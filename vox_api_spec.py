@@ -0,0 +1,436 @@
+"""
+Endpoints and payload shapes of the vox365 JSON API, learned from a recorded
+browser session instead of guessed.
+
+A vox recording (PAGE_RECORD_DIR, see page_recorder) holds the list and match
+pages the Selenium scrapers read and, in network.jsonl, the responses the
+browser loaded to render them. learn() lines the two up: the JSON response
+that contains the match codes (kodi) of a list page is that sport's match
+list endpoint, and the places where each row's kodi, teams, league and odds
+sit in it become the list fields; the response whose URL carries a match's
+kodi and whose values reproduce its match page is the markets endpoint.
+
+    PAGE_RECORD_DIR=fixtures python vox_football_scraper.py
+    python vox_api_spec.py fixtures/vox_20261018120000_1234 [more recordings]
+
+Paths are lists of keys and "*" (every element of a list). A field is
+[up, path]: climb 'up' levels from the row before following 'path', so values
+stored on an enclosing object (the league of a block of rows) are found too.
+"""
+import argparse
+import json
+import os
+import re
+from collections import Counter
+from urllib.parse import urlsplit
+
+from fixture_schedule import SITE_TIMEZONE, kickoff_from, parse_kickoff
+from logs import configure, get_logger
+from markets import parse_odd
+from page_recorder import load_manifest, load_network_log
+from utils import parse_match_list_html, parse_match_details_html
+
+log = get_logger("vox_api_spec")
+
+SPEC_PATH = os.getenv("VOX_ENDPOINTS", "vox_endpoints.json")
+LOGIN_PATH = "/client.aspx"  # The page the Selenium scrapers log in on
+STAR = "*"
+
+
+# === JSON PATHS ===
+
+def select(data, pattern):
+    """(concrete path, node) of every node 'pattern' reaches from 'data', in document order."""
+    nodes = [((), data)]
+    for step in pattern:
+        reached = []
+        for path, node in nodes:
+            if step == STAR:
+                if isinstance(node, list):
+                    reached.extend((path + (i,), child) for i, child in enumerate(node))
+            elif isinstance(node, list) and isinstance(step, int):
+                if step < len(node):
+                    reached.append((path + (step,), node[step]))
+            elif isinstance(node, dict) and step in node:
+                reached.append((path + (step,), node[step]))
+        nodes = reached
+    return nodes
+
+
+def field_values(data, row_path, field):
+    """Values of 'field' ([up, path]) for the row at 'row_path' of 'data'."""
+    up, pattern = field
+    base = data
+    for step in row_path[:len(row_path) - up]:
+        base = base[step]
+    return [value for _, value in select(base, pattern)]
+
+
+def _first(node, pattern):
+    found = select(node, pattern)
+    return found[0][1] if found else None
+
+
+def _text(value):
+    return "" if value is None else str(value).strip()
+
+
+def _scalars(data, path=()):
+    """(concrete path, value) of every scalar in a JSON document; list positions are ints."""
+    if isinstance(data, dict):
+        for key, value in data.items():
+            yield from _scalars(value, path + (key,))
+    elif isinstance(data, list):
+        for i, value in enumerate(data):
+            yield from _scalars(value, path + (i,))
+    else:
+        yield path, data
+
+
+def _pattern(path):
+    return tuple(STAR if isinstance(step, int) else step for step in path)
+
+
+def _row_depth(pattern):
+    """Length of the pattern up to and including its last "*" (the repeated object it is a field of)."""
+    return max(i for i, step in enumerate(pattern) if step == STAR) + 1
+
+
+def _norm(value):
+    """Comparable form of a scalar: numbers by value ('2.10' == 2.1), text case- and whitespace-insensitive."""
+    if value is None or isinstance(value, bool):
+        return None
+    number = parse_odd(value) if isinstance(value, (int, float, str)) else None
+    if number is not None:
+        return round(number, 4)
+    return " ".join(str(value).split()).casefold() or None
+
+
+def _index(data):
+    """Normalized scalar value -> concrete paths it occurs at."""
+    by_value = {}
+    for path, value in _scalars(data):
+        key = _norm(value)
+        if key is not None:
+            by_value.setdefault(key, []).append(path)
+    return by_value
+
+
+def _relative(row_path, path, star=False):
+    """[up, path] leading from the row at 'row_path' to 'path', or None for a path inside another row."""
+    common = 0
+    while common < min(len(row_path), len(path)) and row_path[common] == path[common]:
+        common += 1
+    rest = path[common:]
+    if common < len(row_path) and rest and isinstance(rest[0], int):
+        return None
+    return len(row_path) - common, _pattern(rest) if star else rest
+
+
+def _repeated(by_value, values):
+    """The starred pattern most of 'values' occur under, with its hit count."""
+    votes = Counter()
+    for value in values:
+        for pattern in {_pattern(path) for path in by_value.get(_norm(value), ())}:
+            if STAR in pattern:
+                votes[pattern] += 1
+    return votes.most_common(1)[0] if votes else (None, 0)
+
+
+# === LEARNING ===
+
+def learn_list_fields(rows, data):
+    """
+    List fields of a match list response, given the rows the browser showed
+    for it (utils.parse_match_list_html), or None when it does not hold them.
+    """
+    rows = [row for row in rows if row["kodi"] and len(row["teams"]) == 2]
+    by_value = _index(data)
+    kodi_pattern, hits = _repeated(by_value, [row["kodi"] for row in rows])
+    if kodi_pattern is None or hits < max(1, len(rows) // 2):
+        return None
+    depth = _row_depth(kodi_pattern)
+    fields = {"rows": list(kodi_pattern[:depth]), "kodi": [0, list(kodi_pattern[depth:])]}
+
+    matched = []  # (row, concrete path of its JSON row)
+    for row in rows:
+        for path in by_value.get(_norm(row["kodi"]), ()):
+            if _pattern(path) == kodi_pattern:
+                matched.append((row, path[:depth]))
+                break
+
+    for name, value_of in (("home", lambda row: row["teams"][0]), ("away", lambda row: row["teams"][1]),
+                           ("league", lambda row: row["league"])):
+        votes = Counter()
+        for row, row_path in matched:
+            for path in by_value.get(_norm(value_of(row)), ()):
+                relative = _relative(row_path, path)
+                if relative is not None:
+                    votes[relative] += 1
+        if not votes:
+            return None
+        up, path = votes.most_common(1)[0][0]
+        fields[name] = [up, list(path)]
+
+    fields["odds"] = _learn_odds(data, by_value, [(row, row_path) for row, row_path in matched if row["odds"]])
+    kickoff = _learn_kickoff(data, matched)
+    if kickoff:
+        fields["kickoff"] = kickoff
+    return fields
+
+
+def _learn_kickoff(data, matched):
+    """The row field holding a timestamp that shows as the row's kickoff time on the page, if any."""
+    def local_time(kickoff):
+        return kickoff.astimezone(SITE_TIMEZONE).strftime("%H:%M")
+
+    votes = Counter()
+    for row, row_path in matched:
+        shown = parse_kickoff(row.get("time"))
+        if shown is None:
+            continue
+        node = data
+        for step in row_path:
+            node = node[step]
+        for path, value in _scalars(node):
+            if isinstance(value, str) and ":" not in value and not value.isdigit():
+                continue  # Only ISO timestamps, epoch numbers and times
+            kickoff = kickoff_from(value)
+            if kickoff is not None and local_time(kickoff) == local_time(shown):
+                votes[path] += 1
+    if not votes:
+        return None
+    return [0, list(votes.most_common(1)[0][0])]
+
+
+def _learn_odds(data, by_value, matched):
+    """
+    Fields whose values, concatenated, are a row's list-level odds: one
+    starred field when the prices are a JSON list, one field per price otherwise.
+    """
+    if not matched:
+        return []
+
+    def reproduces(fields, row, row_path):
+        values = [_norm(v) for field in fields for v in field_values(data, row_path, field)]
+        return values[:len(row["odds"])] == [_norm(odd) for odd in row["odds"]]
+
+    votes = Counter()
+    for row, row_path in matched:
+        for odd in row["odds"]:
+            for path in by_value.get(_norm(odd), ()):
+                relative = _relative(row_path, path, star=True)
+                if relative is not None and STAR in relative[1]:
+                    votes[relative] += 1
+    for (up, path), _ in votes.most_common(5):
+        fields = [[up, list(path)]]
+        if sum(reproduces(fields, row, row_path) for row, row_path in matched) * 2 >= len(matched):
+            return fields
+
+    fields = []
+    for position in range(max(len(row["odds"]) for row, _ in matched)):
+        position_votes = Counter()
+        for row, row_path in matched:
+            if position < len(row["odds"]):
+                for path in by_value.get(_norm(row["odds"][position]), ()):
+                    relative = _relative(row_path, path)
+                    if relative is not None:
+                        position_votes[relative] += 1
+        if not position_votes:
+            break
+        up, path = position_votes.most_common(1)[0][0]
+        fields.append([up, list(path)])
+    return fields
+
+
+def learn_market_fields(details, data):
+    """
+    Market fields of a markets response, given the match page the browser
+    showed for it (utils.parse_match_details_html), or None when it does not hold it.
+    """
+    groups = [group for group in details["groups"] if group["name"]]
+    main = details["main"][:3]
+    if not groups or len(main) < 3 or not all(main):
+        return None
+    by_value = _index(data)
+    name_pattern, hits = _repeated(by_value, [group["name"] for group in groups])
+    if name_pattern is None or hits < max(1, len(groups) // 2):
+        return None
+    depth = _row_depth(name_pattern)
+
+    matched = []  # (group, concrete path of its JSON group)
+    for group in groups:
+        for path in by_value.get(_norm(group["name"]), ()):
+            if _pattern(path) == name_pattern:
+                matched.append((group, path[:depth]))
+                break
+
+    def votes_for(key, prefix=()):
+        votes = Counter()
+        for group, group_path in matched:
+            for odd in group["odds"]:
+                for path in by_value.get(_norm(odd[key]), ()):
+                    if path[:len(group_path)] != group_path:
+                        continue
+                    relative = _pattern(path[len(group_path):])
+                    if STAR in relative and relative[:len(prefix)] == prefix:
+                        votes[relative[len(prefix):]] += 1
+        return votes.most_common(1)[0][0] if votes else None
+
+    desc = votes_for("desc")
+    if desc is None or STAR not in desc:
+        return None
+    entries = desc[:_row_depth(desc)]
+    val = votes_for("val", entries)
+    if not val:
+        return None
+
+    main_pattern = None
+    for path in by_value.get(_norm(main[0]), ()):
+        pattern = _pattern(path)
+        if [_norm(value) for _, value in select(data, pattern)][:3] == [_norm(value) for value in main]:
+            main_pattern = pattern
+            break
+    if main_pattern is None:
+        return None
+
+    return {
+        "groups": list(name_pattern[:depth]),
+        "name": list(name_pattern[depth:]),
+        "entries": list(entries),
+        "desc": list(desc[len(entries):]),
+        "val": list(val),
+        "main": list(main_pattern),
+    }
+
+
+def _json(entry):
+    try:
+        return json.loads(entry.get("body") or "")
+    except ValueError:
+        return None
+
+
+def _endpoint(entry, kodi=None):
+    """Method, path and body of a recorded request; the match code becomes '{kodi}'."""
+    url = urlsplit(entry["url"])
+    target = url.path + (f"?{url.query}" if url.query else "")
+    body = entry.get("request_body")
+    if kodi:
+        code = re.compile(rf"(?<![0-9A-Za-z]){re.escape(str(kodi))}(?![0-9A-Za-z])")
+        target = code.sub("{kodi}", target)
+        body = code.sub("{kodi}", body) if body else body
+    return {"method": entry["method"], "url": target, "body": body, "content_type": entry.get("content_type")}
+
+
+def _most_common(votes):
+    return json.loads(votes.most_common(1)[0][0]) if votes else None
+
+
+def learn(paths):
+    """Spec of the vox365 API from one or more vox recording directories."""
+    match_lists = {}
+    list_votes = Counter()
+    markets_votes = Counter()
+    market_field_votes = Counter()
+    login = None
+
+    for path in paths:
+        network = load_network_log(path)
+        if not network:
+            log.warning("⚠️ %s has no network.jsonl; record it with a browser started by enable_network_log()", path)
+            continue
+        responses = [(entry, _json(entry)) for entry in network]
+        for entry in network:
+            if entry["method"] == "GET" and 'id="username"' in (entry.get("body") or ""):
+                login = urlsplit(entry["url"]).path
+
+        for page in load_manifest(path):
+            number = int(page["file"].split("_")[0])
+            with open(os.path.join(path, page["file"]), encoding="utf-8") as f:
+                html = f.read()
+            loaded = [(entry, data) for entry, data in reversed(responses)
+                      if data is not None and entry.get("page", 0) <= number]
+
+            if page["kind"] == "list":
+                rows = parse_match_list_html(html)
+                for entry, data in loaded:
+                    fields = learn_list_fields(rows, data)
+                    if fields:
+                        match_lists[page.get("sport") or "football"] = _endpoint(entry)
+                        list_votes[json.dumps(fields)] += 1
+                        break
+            elif page["kind"] == "details" and page.get("kodi"):
+                details = parse_match_details_html(html)
+                for entry, data in loaded:
+                    endpoint = _endpoint(entry, page["kodi"])
+                    if "{kodi}" not in endpoint["url"] + (endpoint["body"] or ""):
+                        continue
+                    fields = learn_market_fields(details, data)
+                    if fields:
+                        markets_votes[json.dumps(endpoint)] += 1
+                        market_field_votes[json.dumps(fields)] += 1
+                        break
+
+    return {
+        "login": login or LOGIN_PATH,
+        "match_lists": match_lists,
+        "list_fields": _most_common(list_votes),
+        "markets": _most_common(markets_votes),
+        "market_fields": _most_common(market_field_votes),
+    }
+
+
+def load_spec(path=SPEC_PATH):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# === EXTRACTION ===
+
+def extract_rows(data, fields):
+    """Match list rows of a list response, in utils.extract_match_list's shape."""
+    rows = []
+    for row_path, _ in select(data, fields["rows"]):
+        def first(name):
+            values = field_values(data, row_path, fields[name])
+            return values[0] if values else None
+
+        kodi, home, away = first("kodi"), first("home"), first("away")
+        rows.append({
+            "time": first("kickoff") if fields.get("kickoff") else None,
+            "league": _text(first("league")) or "Unknown League",
+            "kodi": _text(kodi) or None,
+            "teams": [_text(team) for team in (home, away) if team is not None],
+            "odds": [_text(odd) for field in fields["odds"] for odd in field_values(data, row_path, field)],
+        })
+    return rows
+
+
+def extract_details(data, fields):
+    """{main, groups} of a markets response, in utils.MATCH_DETAILS_JS's shape."""
+    return {
+        "main": [_text(value) for _, value in select(data, fields["main"])][:3],
+        "groups": [{
+            "name": _text(_first(group, fields["name"])),
+            "odds": [{"desc": _text(_first(odd, fields["desc"])), "val": _text(_first(odd, fields["val"]))}
+                     for _, odd in select(group, fields["entries"])],
+        } for _, group in select(data, fields["groups"])],
+    }
+
+
+if __name__ == "__main__":
+    configure()
+    parser = argparse.ArgumentParser(description="Learn the vox365 API endpoints from recorded vox crawls.")
+    parser.add_argument("recordings", nargs="+", help="vox recording directories (vox_<run id>)")
+    parser.add_argument("-o", "--output", default=SPEC_PATH, help=f"spec file to write (default {SPEC_PATH})")
+    args = parser.parse_args()
+
+    spec = learn(args.recordings)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(spec, f, indent=2)
+    log.info("🗺️ Learned %d match list endpoints (%s), markets endpoint %s -> %s",
+             len(spec["match_lists"]), ", ".join(spec["match_lists"]) or "none",
+             (spec["markets"] or {}).get("url"), args.output)
+    if not spec["list_fields"] or not spec["markets"]:
+        log.warning("⚠️ Incomplete spec: record a vox crawl that opens match pages (football) as well as list pages")
@@ -1,4 +1,5 @@
 import json
+from datetime import datetime, timezone
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from dotenv import load_dotenv
@@ -8,6 +9,18 @@ from selenium.webdriver.support import expected_conditions as EC
 import time
 import os
 from pymongo import MongoClient
+from snapshot_writer import SnapshotWriter
+from wait_scheduler import waiter_for
+from page_recorder import recorder_for, enable_network_log
+import metrics
+import odds_stream
+from logs import configure, get_logger
+from utils import extract_match_list, click_match, read_match_details
+from collections import deque
+from markets import normalize_odds
+from fixture_schedule import FixtureSchedule, parse_kickoff
+
+log = get_logger("vox_football_scraper")
 
 # Replace this with your actual connection string (keep it secure!)
 # TODO
@@ -24,9 +37,13 @@ load_dotenv()
 USERNAME = os.getenv("BET_USERNAME")
 PASSWORD = os.getenv("BET_PASSWORD")
 
+TAB_POOL_SIZE = 1  # > 1 reads match detail pages through that many tabs at once
+MATCH_ODDS_TIMEOUT = 2  # Seconds a match page may take to show its 1X2 odds
+USE_FIXTURE_SCHEDULE = True  # Only re-open the match pages of fixtures due by their kickoff cadence
+
 
 def start_browser(headless=False):
-    chrome_options = Options()
+    chrome_options = enable_network_log(Options())  # Network traffic is recorded with the pages
     if headless:
         chrome_options.add_argument("--headless")
     driver = webdriver.Chrome(options=chrome_options)
@@ -34,26 +51,27 @@ def start_browser(headless=False):
 
 
 def login(driver):
-    print("[*] Opening login page...")
+    log.info("[*] Opening login page...")
     driver.get("https://vox365.co/client.aspx")
 
-    print("[*] Waiting for username field...")
+    log.info("[*] Waiting for username field...")
     WebDriverWait(driver, 15).until(
         EC.presence_of_element_located((By.ID, "username"))
     )
 
-    print("[*] Entering credentials...")
+    log.info("[*] Entering credentials...")
     driver.find_element(By.ID, "username").send_keys(USERNAME)
     driver.find_element(By.ID, "password").send_keys(PASSWORD)
     driver.find_element(By.ID, "submit").click()
 
-    time.sleep(3)
-    print("[+] Login attempted.")
+    # Wait for the login form to go away instead of a fixed 3 s
+    waiter_for(driver, "vox").wait_for(EC.invisibility_of_element_located((By.ID, "username")), "login", max_wait=15)
+    log.info("[+] Login attempted.")
 
 
 def click_back_button(driver):
     try:
-        print("[*] Clicking back button to return to match list...")
+        log.debug("[*] Clicking back button to return to match list...")
         back_btn = WebDriverWait(driver, 10).until(
             EC.element_to_be_clickable((By.CLASS_NAME, "backToWhereYouWhere"))
         )
@@ -63,174 +81,227 @@ def click_back_button(driver):
         WebDriverWait(driver, 15).until(
             EC.presence_of_element_located((By.CLASS_NAME, "matchRow"))
         )
-        print("[+] Successfully returned to match list.")
+        log.debug("[+] Successfully returned to match list.")
     except Exception as e:
-        print("[-] Failed to click back button:", e)
+        log.warning("[-] Failed to click back button: %s", e)
+
+
+def first_odds_loaded(driver):
+    texts = driver.execute_script(
+        "return Array.from(document.querySelectorAll('.oddVal')).slice(0, 3).map(e => e.innerText.trim());")
+    return len(texts) >= 3 and all(texts)
 
 
 def scrape_odds(driver):
-    print("[*] Scanning for leagues and matches...")
+    log.info("[*] Scanning for leagues and matches...")
 
     extracted_matches = []
     seen_codes = set()
-
-    # Build flat list of matches (league_name, match_row)
-    def build_match_list():
-        flat_matches = []
-        league_blocks = driver.find_elements(By.CLASS_NAME, "leagueCont")
-        print(f"[+] Found {len(league_blocks)} league sections.")
-        for block in league_blocks:
-            try:
-                league_name = block.find_element(By.CLASS_NAME, "lNameText").text.strip()
-            except:
-                league_name = "Unknown League"
-
-            match_rows = block.find_elements(By.CLASS_NAME, "matchRow")
-            print(f"    ↪ League '{league_name}': {len(match_rows)} matches found.")
-
-            for match in match_rows:
-                flat_matches.append((league_name, match))
-        return flat_matches
-
-    all_matches = build_match_list()
-    index = 0
-
-    while index < len(all_matches):
-        league_name, match_element = all_matches[index]
-        index += 1
-
-        try:
-            match_code = match_element.find_element(By.CLASS_NAME, "kodi").text.strip()
-        except:
-            print(f"[-] Match #{index} skipped: no match code")
+    waiter = waiter_for(driver, "vox")
+    recorder = recorder_for("vox")  # Saves every parsed page when PAGE_RECORD_DIR is set
+    schedule = FixtureSchedule(collection, "kodi") if USE_FIXTURE_SCHEDULE else None
+
+    # One-shot snapshot of every league and match row, keyed by match code (kodi)
+    all_matches = extract_match_list(driver)
+    if recorder:
+        recorder.record_driver(driver, "list", sport="football")
+    log.info("[+] Found %d match rows in %d league sections.",
+             len(all_matches), len({m["league"] for m in all_matches}))
+
+    for index, row in enumerate(all_matches, start=1):
+        league_name = row["league"]
+        match_code = row["kodi"]
+        if not match_code:
+            log.warning("[-] Match #%d skipped: no match code", index)
             continue
 
         if match_code in seen_codes:
             continue
         seen_codes.add(match_code)
 
-        try:
-            team_spans = match_element.find_elements(By.CLASS_NAME, "matchNameHomeAway")
-            if len(team_spans) != 2:
-                print(f"[-] Match #{index} skipped: bad team span")
-                continue
-            home = team_spans[0].text.strip()
-            away = team_spans[1].text.strip()
-            if home.startswith("(S)") or away.startswith("(S)"):
-                continue
-        except:
+        if len(row["teams"]) != 2:
+            log.warning("[-] Match #%d skipped: bad team span", index)
+            continue
+        home, away = row["teams"]
+        if home.startswith("(S)") or away.startswith("(S)"):
+            continue
+
+        kickoff = parse_kickoff(row.get("time"))
+        carried = schedule.carry(match_code, kickoff) if schedule else None
+        if carried:
+            extracted_matches.append(carried)  # Not due yet: keeps its last match page odds
             continue
 
         try:
-            clickable = team_spans[0].find_element(By.XPATH, "..")
-            driver.execute_script("arguments[0].click();", clickable)
-            print(f"[+] Clicked into {home} vs {away} ({league_name})")
+            if not click_match(driver, match_code):
+                log.warning("[-] Match %s no longer listed: %s vs %s", match_code, home, away)
+                metrics.MATCH_ERRORS.inc(site="vox", sport="football")
+                continue
+            log.debug("[+] Clicked into %s vs %s (%s)", home, away, league_name)
         except:
-            print(f"[-] Failed to click {home} vs {away}")
+            log.warning("[-] Failed to click %s vs %s", home, away)
+            metrics.MATCH_ERRORS.inc(site="vox", sport="football")
             continue
 
         # Wait for 1X2 odds
         start_time = time.time()
-        for _ in range(3):
-            odds_elems = driver.find_elements(By.CLASS_NAME, "oddVal")
-            if len(odds_elems) >= 3:
-                o1, ox, o2 = odds_elems[:3]
-                if all(el.text.strip() for el in [o1, ox, o2]):
-                    break
-            time.sleep(0.2)
+        waiter.wait_for(first_odds_loaded, "match_odds", max_wait=2)
         elapsed = time.time() - start_time
-        print(f"[~] Waited {round(elapsed, 2)}s for odds")
-
-        odds_texts = [el.text.strip() for el in odds_elems if el.text.strip()]
-        odds_1, odds_x, odds_2 = odds_texts[:3] if len(odds_texts) >= 3 else (None, None, None)
-
-        btts_yes = btts_no = dc_1x = dc_12 = dc_x2 = ou_over = ou_under = None
-
-        rub_blocks = driver.find_elements(By.CLASS_NAME, "rubContainer")
-        for block in rub_blocks:
-            try:
-                title = block.find_element(By.CLASS_NAME, "rubNameDiteRub").text.strip().lower()
-
-                if "gol" in title and "jgol" in block.text.lower():
-                    odds = block.find_elements(By.CLASS_NAME, "oddCont")
-                    for o in odds:
-                        label = o.find_element(By.CLASS_NAME, "oddDesc").text.strip()
-                        val = o.find_element(By.CLASS_NAME, "oddVal").text.strip()
-                        if label == "Gol":
-                            btts_yes = val
-                        elif label == "JGol":
-                            btts_no = val
-
-                if "dopio shans" == title:
-                    odds = block.find_elements(By.CLASS_NAME, "oddCont")
-                    for o in odds:
-                        label = o.find_element(By.CLASS_NAME, "oddDesc").text.strip()
-                        val = o.find_element(By.CLASS_NAME, "oddVal").text.strip()
-                        if label == "1X":
-                            dc_1x = val
-                        elif label == "12":
-                            dc_12 = val
-                        elif label == "X2":
-                            dc_x2 = val
-
-                if "shuma e golave perfundimtare" == title:
-                    odds = block.find_elements(By.CLASS_NAME, "oddCont")
-                    for o in odds:
-                        label = o.find_element(By.CLASS_NAME, "oddDesc").text.strip()
-                        val = o.find_element(By.CLASS_NAME, "oddVal").text.strip()
-                        if label == "3+":
-                            ou_over = val
-                        elif label == "0-2":
-                            ou_under = val
-            except:
-                continue
+        log.debug("[~] Waited %.2fs for odds", elapsed)
+        if recorder:
+            recorder.record_driver(driver, "details", recorder.next_match(),
+                                   home=home, away=away, league=league_name, kodi=match_code)
 
-        extracted_matches.append({
-            "home": home,
-            "away": away,
-            "sport": "football",
-            "league": league_name,
-            "odds": {
-                "1": odds_1,
-                "X": odds_x,
-                "2": odds_2,
-                "BTTS_Yes": btts_yes,
-                "BTTS_No": btts_no,
-                "DC_1X": dc_1x,
-                "DC_12": dc_12,
-                "DC_X2": dc_x2,
-                "Over_2.5": ou_over,
-                "Under_2.5": ou_under
-            }
-        })
+        try:
+            odds = read_match_details(driver)  # One script call, the same extractor as the tab pool
+        except Exception as e:
+            log.warning("[-] Failed to read odds of %s vs %s: %s", home, away, e)
+            metrics.MATCH_ERRORS.inc(site="vox", sport="football")
+            odds = None
+
+        if odds is not None:
+            extracted_matches.append({
+                "home": home,
+                "away": away,
+                "sport": "football",
+                "league": league_name,
+                "kodi": match_code,
+                "kickoff": kickoff,
+                "odds": normalize_odds(odds),
+                "updated_at": datetime.now(timezone.utc)
+            })
+            odds_stream.publish("vox", extracted_matches[-1])
 
         try:
             back_button = WebDriverWait(driver, 2).until(
                 EC.element_to_be_clickable((By.CLASS_NAME, "backToWhereYouWhere"))
             )
             driver.execute_script("arguments[0].click();", back_button)
-            time.sleep(1)
-            WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "matchRow"))
-            )
-            print("[+] Back to match list.")
+            waiter.settle("back", max_wait=1)
+            if not waiter.wait_for(EC.presence_of_element_located((By.CLASS_NAME, "matchRow")), "match_list", 5):
+                raise TimeoutError("match rows did not reappear")
+            log.debug("[+] Back to match list.")
         except Exception as e:
-            print(f"[-] Failed to return to match list: {e}")
+            log.warning("[-] Failed to return to match list: %s", e)
+            metrics.GO_BACK_FAILURES.inc(site="vox", level="match")
             return extracted_matches
 
-        # Rebuild match list from fresh DOM
-        all_matches = build_match_list()
+    if schedule:
+        schedule.report("vox football")
+    save_matches(extracted_matches)
+    return extracted_matches
+
 
-    # Save to MongoDB
-    for match in extracted_matches:
-        collection.insert_one(match)
-    print(f"[+] Stored {len(extracted_matches)} matches in MongoDB.")
+def save_matches(matches):
+    metrics.MATCHES_SCRAPED.inc(len(matches), site="vox", sport="football")
+    # Save to MongoDB as a new snapshot, swapped in once complete
+    snapshot = SnapshotWriter(collection)
+    snapshot.add_many(matches)
+    snapshot.commit()
+    log.info("[+] Stored %d matches in MongoDB.", len(matches))
+
+
+def scrape_odds_tab_pool(driver, tabs=TAB_POOL_SIZE):
+    """
+    Same output as scrape_odds, but match detail pages are worked through
+    'tabs' browser tabs of the same logged-in session as a pipeline: while one
+    tab is loading a match or navigating back to the list, the others are read.
+    Back-navigation and list reloads are no longer on the per-match critical path.
+    """
+    log.info("[*] Scanning matches with a pool of %d tabs...", tabs)
+    waiter = waiter_for(driver, "vox")
+    recorder = recorder_for("vox")
+    schedule = FixtureSchedule(collection, "kodi") if USE_FIXTURE_SCHEDULE else None
+
+    queue = deque()
+    extracted_matches = []
+    if recorder:
+        recorder.record_driver(driver, "list", sport="football")
+    seen_codes = set()
+    for row in extract_match_list(driver):
+        if not row["kodi"] or row["kodi"] in seen_codes or len(row["teams"]) != 2:
+            continue
+        seen_codes.add(row["kodi"])
+        if row["teams"][0].startswith("(S)") or row["teams"][1].startswith("(S)"):
+            continue
+        row["kickoff"] = parse_kickoff(row.get("time"))
+        carried = schedule.carry(row["kodi"], row["kickoff"]) if schedule else None
+        if carried:
+            extracted_matches.append(carried)  # Not due yet: keeps its last match page odds
+        else:
+            queue.append(row)
+    log.info("[+] %d matches queued.", len(queue))
+
+    # Open the other tabs on the same list page; they share the session cookies
+    list_url = driver.current_url
+    handles = [driver.current_window_handle]
+    for _ in range(tabs - 1):
+        driver.switch_to.new_window("tab")
+        driver.get(list_url)
+        handles.append(driver.current_window_handle)
+
+    loading = {}  # tab handle -> (row, time the match was clicked)
+    while queue or loading:
+        progressed = False
+        for handle in handles:
+            driver.switch_to.window(handle)
+
+            if handle in loading:
+                row, clicked_at = loading[handle]
+                if not first_odds_loaded(driver) and time.time() - clicked_at < MATCH_ODDS_TIMEOUT:
+                    continue  # still loading, look at the next tab
+                home, away = row["teams"]
+                if recorder:
+                    recorder.record_driver(driver, "details", recorder.next_match(),
+                                           home=home, away=away, league=row["league"], kodi=row["kodi"])
+                extracted_matches.append({
+                    "home": home,
+                    "away": away,
+                    "sport": "football",
+                    "league": row["league"],
+                    "kodi": row["kodi"],
+                    "kickoff": row["kickoff"],
+                    "odds": normalize_odds(read_match_details(driver)),
+                    "updated_at": datetime.now(timezone.utc)
+                })
+                odds_stream.publish("vox", extracted_matches[-1])
+                log.debug("[+] Read %s vs %s (%s)", home, away, row["league"])
+                del loading[handle]
+                # Start going back without waiting; the list is checked on the next visit
+                driver.execute_script(
+                    "const b = document.querySelector('.backToWhereYouWhere'); if (b) b.click();")
+                progressed = True
+                continue
 
+            if queue:
+                if not waiter.wait_for(EC.presence_of_element_located((By.CLASS_NAME, "matchRow")), "match_list", 5):
+                    metrics.GO_BACK_FAILURES.inc(site="vox", level="match")
+                    driver.get(list_url)
+                    continue
+                row = queue.popleft()
+                if click_match(driver, row["kodi"]):
+                    loading[handle] = (row, time.time())
+                else:
+                    log.warning("[-] Match %s no longer listed: %s vs %s", row["kodi"], *row["teams"])
+                    metrics.MATCH_ERRORS.inc(site="vox", sport="football")
+                progressed = True
+
+        if not progressed:
+            time.sleep(0.05)  # every tab is still loading
+
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+
+    if schedule:
+        schedule.report("vox football")
+    save_matches(extracted_matches)
     return extracted_matches
 
 
 def find_arbitrage(matches):
-    print("\n🔎 Searching for arbitrage opportunities...")
+    log.info("🔎 Searching for arbitrage opportunities...")
     opportunities = []
 
     for match in matches:
@@ -251,32 +322,36 @@ def find_arbitrage(matches):
                 })
 
         except Exception as e:
-            print(f"[-] Skipped one match (arbitrage calc error): {e}")
+            log.warning("[-] Skipped one match (arbitrage calc error): %s", e)
 
-    print(f"[+] Found {len(opportunities)} arbitrage opportunities.")
+    log.info("[+] Found %d arbitrage opportunities.", len(opportunities))
     return opportunities
 
 
 if __name__ == "__main__":
+    configure()
+    metrics.start_http_server()
     driver = start_browser(headless=False)
 
     try:
-        collection.delete_many({})
-        print("[*] Cleared old odds from MongoDB.")
-
         login(driver)
-        matches = scrape_odds(driver)
+        started = time.time()
+        matches = scrape_odds_tab_pool(driver) if TAB_POOL_SIZE > 1 else scrape_odds(driver)
+        metrics.record_crawl("vox", "football", len(matches), time.time() - started)
+        waiter_for(driver, "vox").report()
+        waiter_for(driver, "vox").save_stats()
 
-        print("\n🎯 Extracted Matches & Odds:")
+        log.info("🎯 Extracted Matches & Odds:")
         for m in matches:
-            print(f"{m['home']} vs {m['away']} => 1: {m['odds']['1']} | X: {m['odds']['X']} | 2: {m['odds']['2']}")
+            log.info("%s vs %s => 1: %s | X: %s | 2: %s",
+                     m["home"], m["away"], m["odds"]["1"], m["odds"]["X"], m["odds"]["2"])
 
         arbs = find_arbitrage(matches)
 
         for arb in arbs:
-            print(f"\n🔥 {arb['teams']}")
-            print(f"    Odds: 1 = {arb['odds']['1']} | X = {arb['odds']['X']} | 2 = {arb['odds']['2']}")
-            print(f"    Profit: {arb['profit']}%")
+            log.info("🔥 %s | Odds: 1 = %s | X = %s | 2 = %s | Profit: %s%%",
+                     arb["teams"], arb["odds"]["1"], arb["odds"]["X"], arb["odds"]["2"], arb["profit"])
 
     finally:
         driver.quit()
+        log.info("📈 Metrics written to %s", metrics.dump("vox_football"))
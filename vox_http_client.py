@@ -0,0 +1,222 @@
+"""
+Browserless vox365 client. The endpoints and payload shapes come from a spec
+learned from a recorded browser session (vox_api_spec.py, VOX_ENDPOINTS), and
+VOX_BASE_URL can point at page_recorder.SessionReplayServer to run it
+against that recording instead of the live site.
+"""
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from urllib.parse import urljoin, quote
+
+import aiohttp
+from dotenv import load_dotenv
+from lxml import html as lxml_html
+from pymongo import MongoClient
+
+import metrics
+import odds_stream
+from logs import configure, get_logger
+from markets import normalize_odds
+from snapshot_writer import SnapshotWriter
+from fixture_schedule import kickoff_from
+from utils import details_to_odds
+from vox_api_spec import LOGIN_PATH, load_spec, extract_rows, extract_details
+
+log = get_logger("vox_http_client")
+
+load_dotenv()
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+
+USERNAME = os.getenv("BET_USERNAME")
+PASSWORD = os.getenv("BET_PASSWORD")
+
+# The site can be swapped for a local stub server that replays recorded responses
+VOX_BASE_URL = os.getenv("VOX_BASE_URL", "https://vox365.co")
+
+MAX_CONNECTIONS = 20  # Pooled keep-alive connections shared by all requests
+REQUEST_TIMEOUT = 15
+
+
+class VoxLoginError(RuntimeError):
+    """The site did not accept the credentials, or none are configured."""
+
+
+def login_form(page_source, username, password):
+    """(action, fields) to post for the login page: its hidden inputs (ASP.NET view state etc.) plus the credentials."""
+    tree = lxml_html.fromstring(page_source)
+    found = tree.xpath("//*[@id='username']")
+    if not found:
+        raise VoxLoginError("No login form (#username) on the login page")
+    form = next(found[0].iterancestors("form"), tree)
+    fields = {el.get("name"): el.get("value", "") for el in form.xpath(".//input[@type='hidden'][@name]")}
+    for element_id, value in (("username", username), ("password", password), ("submit", None)):
+        found = tree.xpath(f"//*[@id='{element_id}']")
+        name = found[0].get("name") if found else None
+        if value is None:
+            value = (found[0].get("value") if found else None) or element_id
+        fields[name or element_id] = value
+    return form.get("action") or "", fields
+
+
+def shows_login_form(page_source):
+    """The same check the Selenium login waits for: the #username field is gone once logged in."""
+    return bool(lxml_html.fromstring(page_source or "<html/>").xpath("//*[@id='username']"))
+
+
+class VoxHttpClient:
+    """
+    Browserless vox365 client: logs in once and fetches match lists and
+    market payloads over one pooled aiohttp session, producing the same
+    documents as the Selenium scrape_odds functions.
+
+    Match list rows use the same shape as utils.extract_match_list
+    ({league, kodi, teams, odds}) and market payloads the same {main, groups}
+    as utils.MATCH_DETAILS_JS, read with the paths of the learned spec.
+    """
+
+    def __init__(self, base_url=VOX_BASE_URL, spec=None, max_connections=MAX_CONNECTIONS):
+        self.base_url = base_url.rstrip("/")
+        self.spec = spec or load_spec()
+        self.max_connections = max_connections
+        self.session = None
+
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    async def _request_json(self, endpoint, kodi=None):
+        """Sends a recorded request (method, path, body), with '{kodi}' filled in."""
+        url, body = endpoint["url"], endpoint.get("body")
+        if kodi is not None:
+            url = url.replace("{kodi}", quote(str(kodi)))
+            body = body.replace("{kodi}", str(kodi)) if body else body
+        headers = {"Content-Type": endpoint["content_type"]} if body and endpoint.get("content_type") else None
+        async with self.session.request(endpoint["method"], self.base_url + url,
+                                        data=body.encode("utf-8") if body else None, headers=headers) as resp:
+            resp.raise_for_status()
+            return await resp.json(content_type=None)
+
+    async def login(self, username=USERNAME, password=PASSWORD):
+        """Submits the login form like the Selenium login; raises VoxLoginError when it is not accepted."""
+        if not username or not password:
+            raise VoxLoginError("BET_USERNAME and BET_PASSWORD are not set")
+        log.info("[*] Logging in over HTTP...")
+        login_url = self.base_url + self.spec.get("login", LOGIN_PATH)
+        async with self.session.get(login_url) as resp:
+            resp.raise_for_status()
+            action, form = login_form(await resp.text(), username, password)
+        async with self.session.post(urljoin(login_url, action), data=form) as resp:
+            page = await resp.text()
+            if resp.status >= 400 or shows_login_form(page):
+                raise VoxLoginError(f"Login rejected (HTTP {resp.status}): the login form is still shown")
+        log.info("[+] Logged in.")
+
+    async def fetch_match_list(self, sport):
+        endpoint = self.spec["match_lists"].get(sport)
+        if endpoint is None:
+            raise ValueError(f"No {sport} match list endpoint learned; record a vox {sport} crawl and run vox_api_spec.py")
+        return extract_rows(await self._request_json(endpoint), self.spec["list_fields"])
+
+    async def fetch_markets(self, kodi):
+        if not self.spec.get("markets"):
+            raise ValueError("No markets endpoint learned; record a vox football crawl and run vox_api_spec.py")
+        return extract_details(await self._request_json(self.spec["markets"], kodi), self.spec["market_fields"])
+
+    async def scrape_football(self):
+        """Same documents as vox_football_scraper.scrape_odds, with all match markets fetched concurrently."""
+        rows = []
+        seen_codes = set()
+        for row in await self.fetch_match_list("football"):
+            if not row.get("kodi") or row["kodi"] in seen_codes or len(row.get("teams", [])) != 2:
+                continue
+            seen_codes.add(row["kodi"])
+            home, away = row["teams"]
+            if home.startswith("(S)") or away.startswith("(S)"):
+                continue
+            rows.append(row)
+        log.info("[+] Fetching markets for %d football matches...", len(rows))
+
+        async def fetch(row):
+            try:
+                return row, await self.fetch_markets(row["kodi"])
+            except Exception as e:
+                log.warning("[-] Failed to fetch markets for %s: %s", row["kodi"], e)
+                return row, {"main": [], "groups": []}
+
+        matches = []
+        for row, details in await asyncio.gather(*(fetch(row) for row in rows)):
+            matches.append({
+                "home": row["teams"][0],
+                "away": row["teams"][1],
+                "sport": "football",
+                "league": row["league"],
+                "kodi": row["kodi"],
+                "kickoff": kickoff_from(row["time"]),
+                "odds": normalize_odds(details_to_odds(details)),  # 1X2 from the match page, like read_match_details
+                "updated_at": datetime.now(timezone.utc)
+            })
+        return matches
+
+    async def scrape_moneylines(self, sport):
+        """Same documents as the basketball/tennis scrape_odds: list-level 1/2 odds only."""
+        matches = []
+        for row in await self.fetch_match_list(sport):
+            if len(row.get("teams", [])) != 2 or len(row.get("odds", [])) < 2:
+                continue
+            matches.append({
+                "home": row["teams"][0],
+                "away": row["teams"][1],
+                "league": row["league"],
+                "sport": sport,
+                "kodi": row["kodi"],
+                "kickoff": kickoff_from(row["time"]),
+                "odds": normalize_odds({"1": row["odds"][0], "2": row["odds"][1]}),
+                "updated_at": datetime.now(timezone.utc)
+            })
+        return matches
+
+
+async def scrape_all(base_url=VOX_BASE_URL, spec=None):
+    """Logs in once and returns {collection name: documents} for every vox sport."""
+    async with VoxHttpClient(base_url, spec) as client:
+        await client.login()
+        football, basketball, tennis = await asyncio.gather(
+            client.scrape_football(),
+            client.scrape_moneylines("basketball"),
+            client.scrape_moneylines("tennis"),
+        )
+    return {
+        "football_odds_vox": football,
+        "basketball_odds_vox": basketball,
+        "tennis_odds_vox": tennis,
+    }
+
+
+if __name__ == "__main__":
+    configure()
+    metrics.start_http_server()
+    started = time.time()
+    results = asyncio.run(scrape_all())
+    elapsed = time.time() - started
+    log.info("[~] Fetched all vox sports in %.1fs", elapsed)
+
+    db = MongoClient(MONGO_URI)["arbitrage_db"]
+    for name, matches in results.items():
+        for match in matches:
+            odds_stream.publish("vox", match)
+        snapshot = SnapshotWriter(db[name])
+        snapshot.add_many(matches)
+        snapshot.commit()
+        log.info("[+] Stored %d matches in %s.", len(matches), name)
+        sport = name.split("_")[0]
+        metrics.MATCHES_SCRAPED.inc(len(matches), site="vox", sport=sport)
+        metrics.record_crawl("vox", sport, len(matches), elapsed)
+    log.info("📈 Metrics written to %s", metrics.dump("vox_http"))
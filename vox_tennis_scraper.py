@@ -3,9 +3,21 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import os, time
+import os, sys, time
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 from pymongo import MongoClient
+from snapshot_writer import SnapshotWriter
+from wait_scheduler import waiter_for
+from page_recorder import recorder_for, enable_network_log
+import metrics
+import odds_stream
+from logs import configure, get_logger
+from utils import extract_match_list
+from markets import normalize_odds
+from fixture_schedule import parse_kickoff
+
+log = get_logger("vox_tennis_scraper")
 
 # Load from .env or hardcode (replace with your own URI)
 # TODO
@@ -22,105 +34,106 @@ USERNAME = os.getenv("BET_USERNAME")
 PASSWORD = os.getenv("BET_PASSWORD")
 
 def start_browser(headless=False):
-    chrome_options = Options()
+    chrome_options = enable_network_log(Options())  # Network traffic is recorded with the pages
     if headless:
         chrome_options.add_argument("--headless")
     return webdriver.Chrome(options=chrome_options)
 
 
 def login(driver):
-    print("[*] Opening login page...")
+    log.info("[*] Opening login page...")
     driver.get("https://vox365.co/client.aspx")
 
-    print("[*] Waiting for username field...")
+    log.info("[*] Waiting for username field...")
     WebDriverWait(driver, 15).until(
         EC.presence_of_element_located((By.ID, "username"))
     )
 
-    print("[*] Entering credentials...")
+    log.info("[*] Entering credentials...")
     driver.find_element(By.ID, "username").send_keys(USERNAME)
     driver.find_element(By.ID, "password").send_keys(PASSWORD)
     driver.find_element(By.ID, "submit").click()
 
-    time.sleep(3)
-    print("[+] Login attempted.")
+    # Wait for the login form to go away instead of a fixed 3 s
+    waiter_for(driver, "vox").wait_for(EC.invisibility_of_element_located((By.ID, "username")), "login", max_wait=15)
+    log.info("[+] Login attempted.")
 
 
 def scrape_odds(driver):
-    print("[*] Navigating to the Tennis section...")
+    log.info("[*] Navigating to the Tennis section...")
     tennis_button = WebDriverWait(driver, 10).until(
         EC.element_to_be_clickable((By.XPATH, "//span[@class='spNameLeftSports' and contains(text(), 'Tenis')]"))
     )
     driver.execute_script("arguments[0].click();", tennis_button)
-    time.sleep(2)
+    waiter_for(driver, "vox").settle("sport_switch", max_wait=2)
 
-    print("[*] Scanning for tennis league blocks...")
+    log.info("[*] Scanning for tennis league blocks...")
     league_blocks = WebDriverWait(driver, 10).until(
         EC.presence_of_all_elements_located((By.CLASS_NAME, "leagueCont"))
     )
-    print(f"[+] Found {len(league_blocks)} tennis leagues.")
+    log.info("[+] Found %d tennis leagues.", len(league_blocks))
 
     extracted_matches = []
 
-    for league_block in league_blocks:
-        try:
-            league_name = league_block.find_element(By.CLASS_NAME, "lNameText").text.strip()
-        except:
-            league_name = "Unknown League"
-
-        match_rows = league_block.find_elements(By.CLASS_NAME, "matchRow")
-        print(f"    ↪ League '{league_name}': {len(match_rows)} matches found.")
-
-        for i, match in enumerate(match_rows):
-            try:
-                team_spans = match.find_elements(By.CLASS_NAME, "matchNameHomeAway")
-                if len(team_spans) != 2:
-                    print(f"[-] Match #{i} skipped: bad team names")
-                    continue
-                home = team_spans[0].text.strip()
-                away = team_spans[1].text.strip()
-
-                odds_container = match.find_element(By.CLASS_NAME, "ovDiteOddsCont")
-                odds = odds_container.find_elements(By.CLASS_NAME, "odd")
-
-                if len(odds) < 2:
-                    print(f"[-] Match #{i} skipped: not enough odds")
-                    continue
-
-                odd_1 = odds[0].text.strip()
-                odd_2 = odds[1].text.strip()
-
-                print(f"[+] {home} vs {away} ({league_name}) => 1: {odd_1}, 2: {odd_2}")
-                extracted_matches.append({
-                    "home": home,
-                    "away": away,
-                    "league": league_name,
-                    "sport": "tennis",
-                    "odds": {
-                        "1": odd_1,
-                        "2": odd_2
-                    }
-                })
-
-            except Exception as e:
-                print(f"[-] Match #{i} failed: {e}")
-
-    # Save to MongoDB
-    for match in extracted_matches:
-        collection.insert_one(match)
-    print(f"[+] Stored {len(extracted_matches)} tennis matches in MongoDB.")
+    # All league names, teams and list-level odds in one call
+    rows = extract_match_list(driver)
+    recorder = recorder_for("vox")  # Saves the list page when PAGE_RECORD_DIR is set
+    if recorder:
+        recorder.record_driver(driver, "list", sport="tennis")
+    log.info("[+] Read %d tennis match rows.", len(rows))
+
+    for i, row in enumerate(rows):
+        home_away = row["teams"]
+        if len(home_away) != 2:
+            log.warning("[-] Match #%d skipped: bad team names", i)
+            continue
+        home, away = home_away
+        league_name = row["league"]
+
+        if len(row["odds"]) < 2:
+            log.warning("[-] Match #%d skipped: not enough odds", i)
+            continue
+        odd_1, odd_2 = row["odds"][:2]
+
+        log.debug("[+] %s vs %s (%s) => 1: %s, 2: %s", home, away, league_name, odd_1, odd_2)
+        extracted_matches.append({
+            "home": home,
+            "away": away,
+            "league": league_name,
+            "sport": "tennis",
+            "kodi": row["kodi"],
+            "kickoff": parse_kickoff(row.get("time")),
+            "odds": normalize_odds({
+                "1": odd_1,
+                "2": odd_2
+            }),
+            "updated_at": datetime.now(timezone.utc)
+        })
+        odds_stream.publish("vox", extracted_matches[-1])
+
+    # Save to MongoDB as a new snapshot, swapped in once complete
+    snapshot = SnapshotWriter(collection)
+    snapshot.add_many(extracted_matches)
+    snapshot.commit()
+    metrics.MATCHES_SCRAPED.inc(len(extracted_matches), site="vox", sport="tennis")
+    log.info("[+] Stored %d tennis matches in MongoDB.", len(extracted_matches))
 
     return extracted_matches
 
 
 if __name__ == "__main__":
+    configure()
+    metrics.start_http_server()
     driver = start_browser()
     try:
-        collection.delete_many({})
-        print("[*] Cleared old tennis odds from MongoDB.")
-
         login(driver)
-        scrape_odds(driver)
-        input("\nPress Enter to close the browser...")
+        started = time.time()
+        matches = scrape_odds(driver)
+        metrics.record_crawl("vox", "tennis", len(matches), time.time() - started)
+        waiter_for(driver, "vox").report()
+        waiter_for(driver, "vox").save_stats()
+        if sys.stdin.isatty():  # Not when started by the orchestrator
+            input("\nPress Enter to close the browser...")
     finally:
         driver.quit()
+        log.info("📈 Metrics written to %s", metrics.dump("vox_tennis"))
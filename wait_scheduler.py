@@ -0,0 +1,144 @@
+import json
+import time
+from collections import defaultdict, deque
+
+import numpy as np
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from logs import get_logger
+from metrics import WAIT_SECONDS, WAIT_TIMEOUTS
+
+log = get_logger("wait_scheduler")
+
+# Latency samples kept per (site, wait name); older ones fall out
+MAX_SAMPLES = 200
+# Timeout = this multiple of the p95 latency seen so far, within [MIN_TIMEOUT, the caller's max]
+TIMEOUT_FACTOR = 2.0
+MIN_TIMEOUT = 0.5
+POLL_INTERVAL = 0.05
+SETTLE_QUIET_MS = 100  # DOM counts as settled after this long without mutations
+WAIT_STATS_PATH = "wait_stats.json"
+
+# Resolves once no DOM mutation has happened for arguments[0] ms, or after arguments[1] ms
+SETTLE_JS = """
+const quietMs = arguments[0], maxMs = arguments[1], done = arguments[arguments.length - 1];
+const start = Date.now();
+let timer = null;
+const finish = () => { observer.disconnect(); clearTimeout(timer); clearTimeout(cap); done(Date.now() - start); };
+const observer = new MutationObserver(() => { clearTimeout(timer); timer = setTimeout(finish, quietMs); });
+observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+timer = setTimeout(finish, quietMs);
+const cap = setTimeout(finish, maxMs);
+"""
+
+_waiters = {}
+
+
+class AdaptiveWaiter:
+    """
+    Condition-based replacement for fixed sleeps in the scrapers.
+
+    Every wait is named; its latency is recorded per site and the timeout of
+    the next wait with that name adapts to the observed p95. A timed-out wait
+    counts as a sample of its full max_wait, and the next wait of that name
+    gets the full max_wait again, so the timeout grows back after a slowdown. It also keeps
+    track of how much of the crawl was spent waiting versus working.
+    """
+
+    def __init__(self, driver, site, stats_path=WAIT_STATS_PATH):
+        self.driver = driver
+        self.site = site
+        self.stats_path = stats_path
+        self.samples = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))
+        self.timeouts = defaultdict(int)
+        self.backed_off = set()  # Names whose last wait timed out
+        self.waited = 0.0
+        self.started = time.time()
+        self._load_stats()
+
+    def _load_stats(self):
+        try:
+            with open(self.stats_path) as f:
+                for name, samples in json.load(f).get(self.site, {}).items():
+                    self.samples[name].extend(samples)
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def save_stats(self):
+        try:
+            with open(self.stats_path) as f:
+                stats = json.load(f)
+        except (FileNotFoundError, ValueError):
+            stats = {}
+        stats[self.site] = {name: list(samples) for name, samples in self.samples.items()}
+        with open(self.stats_path, "w") as f:
+            json.dump(stats, f)
+
+    def timeout_for(self, name, max_wait):
+        """Adaptive timeout: TIMEOUT_FACTOR x p95 of past waits, capped at 'max_wait'."""
+        samples = self.samples[name]
+        if len(samples) < 5 or name in self.backed_off:
+            return max_wait
+        return min(max_wait, max(MIN_TIMEOUT, float(np.percentile(samples, 95)) * TIMEOUT_FACTOR))
+
+    def _record(self, name, elapsed):
+        self.samples[name].append(round(elapsed, 4))
+        self.waited += elapsed
+        WAIT_SECONDS.observe(elapsed, site=self.site, wait=name)
+
+    def wait_for(self, condition, name, max_wait=10):
+        """
+        Waits until 'condition(driver)' is truthy (e.g. an expected_conditions
+        instance). Returns its value, or None on timeout.
+        """
+        started = time.time()
+        try:
+            result = WebDriverWait(self.driver, self.timeout_for(name, max_wait), POLL_INTERVAL).until(condition)
+        except TimeoutException:
+            self.timeouts[name] += 1
+            WAIT_TIMEOUTS.inc(site=self.site, wait=name)
+            self.waited += time.time() - started
+            self.samples[name].append(max_wait)
+            self.backed_off.add(name)
+            return None
+        self.backed_off.discard(name)
+        self._record(name, time.time() - started)
+        return result
+
+    def settle(self, name="settle", max_wait=1.0):
+        """Waits until the DOM has stopped changing (MutationObserver), instead of a fixed sleep."""
+        started = time.time()
+        max_ms = int(self.timeout_for(name, max_wait) * 1000)
+        try:
+            self.driver.set_script_timeout(max_wait + 1)
+            self.driver.execute_async_script(SETTLE_JS, SETTLE_QUIET_MS, max_ms)
+        except Exception:
+            time.sleep(min(max_wait, 0.2))  # Page navigated away mid-script; fall back to a short pause
+        self._record(name, time.time() - started)
+
+    def dom_ready(self, name="dom_ready", max_wait=10):
+        return self.wait_for(lambda d: d.execute_script("return document.readyState") == "complete",
+                             name, max_wait)
+
+    def percentiles(self):
+        return {
+            name: {p: round(float(np.percentile(samples, p)), 3) for p in (50, 90, 99)}
+            for name, samples in self.samples.items() if samples
+        }
+
+    def report(self):
+        total = time.time() - self.started
+        log.info("⏱️ %s: %.1fs total, %.1fs waiting (%.0f%%), %.1fs working", self.site, total, self.waited,
+                 self.waited / total * 100 if total else 0, total - self.waited)
+        for name, pct in sorted(self.percentiles().items()):
+            log.info("    %s: p50=%ss p90=%ss p99=%ss timeouts=%d",
+                     name, pct[50], pct[90], pct[99], self.timeouts[name])
+
+
+def waiter_for(driver, site):
+    """One AdaptiveWaiter per (driver, site), shared by the module-level scraper functions."""
+    key = (id(driver), site)
+    if key not in _waiters:
+        _waiters[key] = AdaptiveWaiter(driver, site)
+    return _waiters[key]